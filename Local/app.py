@@ -0,0 +1,2175 @@
+import customtkinter as ctk
+import pandas as pd
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+import os
+from datetime import timedelta
+import tkinter as tk
+from tkinter import ttk
+from tkinter import font as tkfont
+from tkinter import messagebox
+import json
+import nasdaqdatalink
+from dotenv import load_dotenv
+import os
+from downloader import DownloadEngine
+from database import (ConnectionManager, AssetRegistry, QuoteWriter, PriceSnapshot, ensure_cotacoes_schema,
+                      load_price_matrix, merge_new_quotes, get_data_version, ensure_quality_cache_schema,
+                      load_quality_verdicts, save_quality_verdicts, ensure_incremental_state_schema,
+                      load_incremental_states, save_incremental_states, delete_incremental_states)
+from jobs import JobRunner, JobCancelled
+import engine
+
+# Carregar variáveis do .env
+load_dotenv()
+
+ctk.set_appearance_mode("Dark")
+ctk.set_default_color_theme("blue")
+
+# Filtros de mínimo/máximo da tabela: (prefixo da chave em filtros, campo do resultado)
+FILTROS_NUMERICOS = (
+    ('melao', 'indice_melao'),
+    ('hurst', 'hurst_dfa'),
+    ('rent', 'rentabilidade_anual'),
+    ('mdd', 'mdd'),
+)
+
+# Espera após a última tecla nos campos de filtro antes de refiltrar a tabela (ms)
+ATRASO_FILTRO_MS = 150
+
+class ToolTip:
+    def __init__(self, widget, text):
+        self.widget = widget
+        self.text = text
+        self.tipwindow = None
+        self.widget.bind("<Enter>", self.show_tip)
+        self.widget.bind("<Leave>", self.hide_tip)
+
+    def show_tip(self, event=None):
+        if self.tipwindow or not self.text:
+            return
+        x = self.widget.winfo_rootx() + 20
+        y = self.widget.winfo_rooty() + 20
+        self.tipwindow = tw = tk.Toplevel(self.widget)
+        tw.wm_overrideredirect(True)
+        tw.wm_geometry(f"+{x}+{y}")
+        label = tk.Label(tw, text=self.text, background="#333", foreground="white", relief="solid", borderwidth=1, font=("Arial", 9))
+        label.pack(ipadx=4, ipady=2)
+
+    def hide_tip(self, event=None):
+        if self.tipwindow:
+            self.tipwindow.destroy()
+            self.tipwindow = None
+
+class VirtualTreeview:
+    """
+    Treeview que materializa só as linhas visíveis de uma lista longa.
+
+    linhas são as chaves exibidas, em ordem (índices de current_results), e formatar(chave)
+    devolve os valores de uma linha. A barra de rolagem percorre a lista inteira, mas a
+    árvore só tem itens para a janela visível; quando a lista ou a posição mudam, os itens
+    são ajustados por diferença: saem os que deixaram a janela, entram os novos e os que
+    continuam são movidos para a nova posição.
+    """
+
+    def __init__(self, tree, scrollbar, formatar):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.formatar = formatar
+        self.linhas = np.arange(0)
+        self.topo = 0  # Posição em linhas da primeira linha visível
+        
+        # Altura de linha explícita, derivada da fonte (acompanha a escala da tela)
+        self.altura_linha = tkfont.nametofont("TkDefaultFont").metrics("linespace") + 6
+        estilo = f"Virtual{id(self)}.Treeview"
+        ttk.Style().configure(estilo, rowheight=self.altura_linha)
+        self.tree.configure(style=estilo)
+        
+        self.scrollbar.configure(command=self.on_scrollbar)
+        self.tree.bind("<Configure>", lambda event: self.refresh())
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Prior>", lambda event: self.scroll(-self.visible_rows()))
+        self.tree.bind("<Next>", lambda event: self.scroll(self.visible_rows()))
+        self.tree.bind("<Up>", lambda event: self.move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self.move_selection(1))
+        self.tree.bind("<Home>", lambda event: self.move_selection(-len(self.linhas)))
+        self.tree.bind("<End>", lambda event: self.move_selection(len(self.linhas)))
+
+    def visible_rows(self):
+        """Quantidade de linhas que cabem na altura atual da árvore"""
+        altura = self.tree.winfo_height()
+        if altura <= 1:  # Ainda não desenhada
+            return int(self.tree.cget("height"))
+        # Com itens desenhados, a caixa do primeiro dá a altura real do cabeçalho e da linha
+        itens = self.tree.get_children("")
+        caixa = self.tree.bbox(itens[0]) if itens else ""
+        if caixa:
+            cabecalho, altura_linha = caixa[1], caixa[3]
+        else:
+            cabecalho, altura_linha = self.altura_linha, self.altura_linha
+        return max(1, (altura - cabecalho) // max(altura_linha, 1))
+
+    def move_selection(self, passo):
+        """Move a seleção passo linhas na lista inteira (além da janela), rolando se preciso"""
+        if not len(self.linhas):
+            return "break"
+        selecionados = self.tree.selection()
+        if selecionados:
+            atual = self.topo + self.tree.index(selecionados[0])
+        else:
+            atual = self.topo - 1 if passo > 0 else self.topo
+        destino = max(0, min(len(self.linhas) - 1, atual + passo))
+        visiveis = self.visible_rows()
+        if destino < self.topo:
+            self.topo = destino
+        elif destino >= self.topo + visiveis:
+            self.topo = destino - visiveis + 1
+        self.refresh()
+        iid = str(self.linhas[destino])
+        self.tree.selection_set(iid)
+        self.tree.focus(iid)
+        return "break"
+
+    def set_rows(self, linhas, recriar=False):
+        """Exibe a lista de chaves linhas a partir do topo (recriar descarta os itens, se os valores mudaram)"""
+        self.linhas = np.asarray(linhas, dtype=np.int64)
+        self.topo = 0
+        if recriar and self.tree.get_children(""):
+            self.tree.delete(*self.tree.get_children(""))
+        self.refresh()
+
+    def scroll(self, quantidade):
+        """Rola quantidade linhas (negativo para cima)"""
+        self.topo += quantidade
+        self.refresh()
+        return "break"
+
+    def on_scrollbar(self, acao, valor, unidade=None):
+        if acao == "moveto":
+            self.topo = int(float(valor) * len(self.linhas))
+            self.refresh()
+        elif acao == "scroll":
+            passo = self.visible_rows() if unidade == "pages" else 1
+            self.scroll(int(valor) * passo)
+
+    def on_mousewheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def refresh(self):
+        """Ajusta os itens da árvore à janela visível e atualiza a barra de rolagem"""
+        total = len(self.linhas)
+        visiveis = self.visible_rows()
+        self.topo = max(0, min(self.topo, total - visiveis))
+        fim = min(total, self.topo + visiveis)
+        janela = [str(chave) for chave in self.linhas[self.topo:fim]]
+        
+        atuais = self.tree.get_children("")
+        na_janela = set(janela)
+        saem = [iid for iid in atuais if iid not in na_janela]
+        if saem:
+            self.tree.delete(*saem)
+        ficam = set(atuais).difference(saem)
+        for posicao, iid in enumerate(janela):
+            if iid not in ficam:
+                self.tree.insert("", posicao, iid=iid, values=self.formatar(int(iid)))
+            elif self.tree.index(iid) != posicao:
+                self.tree.move(iid, "", posicao)
+        
+        if total:
+            self.scrollbar.set(self.topo / total, fim / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+class MelaoIndexApp(ctk.CTk):
+    def __init__(self):
+        super().__init__()
+        self.title("Cálculo do Índice Melão")
+        self.geometry("1200x700")
+        self.df_cotacoes = None
+        self.cotacoes_do_banco = False  # df_cotacoes reflete o banco (e não um arquivo XLSX)
+        self.inflacao = {10: 0.0, 8: 0.0, 5: 0.0, 3: 0.0, 2: 0.0, 1: 0.0}
+        self.json_file = "inflation.json"
+        self.current_results = engine.ResultTable()  # Resultados numéricos do último cálculo
+        self.linhas_visiveis = np.arange(0)  # Índices das linhas exibidas na tabela, na ordem exibida
+        self.ordenacao = None  # (campo, decrescente) da última ordenação pelo cabeçalho
+        self.filtro_agendado = None  # after() pendente da filtragem ao digitar
+        self.inflation_window = None
+        self.crypto_window = None
+        self.after_ids = []
+        self.progress_bar = None 
+        
+        # Jobs em segundo plano (atualização, cálculo e exportação)
+        self.jobs = JobRunner()
+        self.job_poll_id = None
+        self.jobs_rodando = False  # Estado atual do botão de cancelar (começa desabilitado)
+        
+        # Configurações de qualidade dos dados
+        self.qualidade_config = dict(engine.QUALIDADE_PADRAO)
+        
+        self.period_vars = {
+            10: ctk.BooleanVar(value=True),
+            8: ctk.BooleanVar(value=True),
+            5: ctk.BooleanVar(value=True),
+            3: ctk.BooleanVar(value=True),
+            2: ctk.BooleanVar(value=True),
+            1: ctk.BooleanVar(value=True)
+        }
+        api_key = os.getenv('apikey')
+        if api_key:
+            nasdaqdatalink.ApiConfig.api_key = api_key  # type: ignore
+        # Configurações do download concorrente
+        self.download_config = {
+            'max_workers': 8,              # Requisições simultâneas à API
+            'requests_per_second': 5.0,    # Limite de requisições por segundo
+            'full_history': False,         # True: baixa todo o histórico (sem filtro de data na API)
+            'batch_size': 25               # Códigos por requisição (0 = uma requisição por código)
+        }
+        
+        # Configurações do cálculo dos índices
+        self.calculation_config = {
+            'max_workers': os.cpu_count() or 1,  # Processos de cálculo (1 = na própria thread do job)
+            'chunk_size': 4,                     # Ativos enviados a cada processo por tarefa
+            'indicadores': None,                 # Nomes do registro engine.INDICADORES (None = todos)
+            'incremental': True,                 # Triagem sem Hurst parte dos estados salvos no banco
+            'anos_historico': 3                  # Anos da série histórica do Índice Melão
+        }
+        self.predefined_cryptos = ['BTCUSD', 'ETHUSD', 'XRPUSD', 'LTCUSD', 'ZRXUSD', 'SOLUSD', 'ADAUSD', 'DOTUSD']
+
+        # Inicializar banco de dados
+        self.db_file = "crypto_cache.db"
+        self.db = ConnectionManager(self.db_file)
+        self.registry = AssetRegistry()
+        self.snapshot = PriceSnapshot(self.db_file)
+        # Vereditos de qualidade por (ativo, data final, configuração), persistidos no banco
+        self.quality_cache = engine.QualityVerdictCache()
+        # Log dos preços e retornos por ativo, reaproveitados entre cálculos
+        self.series_cache = engine.SeriesCache()
+        self.correlation_cache = engine.CorrelationCache()
+        # Contador de descartes dos estados incrementais (um cálculo em andamento não os regrava)
+        self.descartes_incrementais = 0
+        self.init_database()
+
+        self.create_widgets()
+        self.load_inflation()
+        
+        # Carregar dados salvos automaticamente
+        self.load_cached_data()
+        
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.poll_jobs()
+    
+    def poll_jobs(self):
+        """Processa progresso e resultados dos jobs em segundo plano (loop do Tk)"""
+        try:
+            self.jobs.poll()
+            # Reconfigurar o botão só quando o estado (algum job rodando ou nenhum) mudar
+            rodando = bool(self.jobs.running_kinds())
+            if rodando != self.jobs_rodando:
+                self.jobs_rodando = rodando
+                self.btn_cancel_jobs.configure(state="normal" if rodando else "disabled")
+        finally:
+            self.job_poll_id = self.after(50, self.poll_jobs)
+    
+    def cancel_jobs(self):
+        """Cancela os jobs em execução"""
+        self.jobs.cancel()
+        self.update_status("Cancelando...")
+    
+    def show_progress(self, value=0.0):
+        """Exibe a barra de progresso"""
+        if self.progress_bar is not None:
+            self.progress_bar.pack(fill="x", padx=5, pady=(0,5))
+            self.progress_bar.set(value)
+    
+    def hide_progress(self):
+        """Esconde a barra de progresso se nenhum job estiver em execução"""
+        if self.progress_bar is not None and not self.jobs.running_kinds():
+            self.progress_bar.pack_forget()
+    
+    def on_close(self):
+        """Fechamento seguro da aplicação"""
+        self.jobs.cancel()
+        if self.job_poll_id is not None:
+            self.after_cancel(self.job_poll_id)
+        for id in self.after_ids:
+            self.after_cancel(id)
+        
+        if self.inflation_window and self.inflation_window.winfo_exists():
+            self.inflation_window.destroy()
+        
+        if self.crypto_window and self.crypto_window.winfo_exists():
+            self.crypto_window.destroy()
+        
+        self.db.close_all()
+            
+        self.destroy()
+        self.quit()
+    
+    def init_database(self):
+        """Inicializa o banco de dados SQLite"""
+        try:
+            conn = self.db.connection()
+            cursor = conn.cursor()
+            
+            # Criar tabela de ativos com IDs fixos
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS ativos (
+                    id INTEGER PRIMARY KEY,
+                    codigo TEXT UNIQUE NOT NULL,
+                    nome TEXT
+                )
+            ''')
+            
+            # Criar tabela de metadados
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS metadados (
+                    chave TEXT PRIMARY KEY,
+                    valor TEXT
+                )
+            ''')
+            
+            # Criar tabela de cotações (usando ID do ativo e dia inteiro), migrando bancos antigos
+            ensure_cotacoes_schema(conn)
+            
+            # Criar tabela do cache de vereditos de qualidade
+            ensure_quality_cache_schema(conn)
+            
+            # Criar tabela dos estados do cálculo incremental
+            ensure_incremental_state_schema(conn)
+            
+            # Inserir ativos com IDs fixos (lista limpa - apenas criptomoedas reais)
+            ativos_data = [
+                (1, '1INCHUSD', '1inch'),
+                (2, 'AAVEUSD', 'Aave'),
+                (3, 'ABSUSD', 'Absorber'),
+                (4, 'AGIUSD', 'SingularityNET'),
+                (5, 'AIDUSD', 'AidCoin'),
+                (6, 'AIOUSD', 'AIOZ Network'),
+                (7, 'AIXUSD', 'Aigang'),
+                (8, 'ALBTUSD', 'AllianceBlock'),
+                (9, 'ALGUSD', 'Algorand'),
+                (10, 'ALT2612USD', 'Altcoin'),
+                (11, 'AMPUSD', 'Amp'),
+                (12, 'ANCUSD', 'Anchor Protocol'),
+                (13, 'ANTUSD', 'Aragon'),
+                (14, 'APENFTUSD', 'APENFT'),
+                (15, 'APEUSD', 'ApeCoin'),
+                (16, 'APPUSD', 'AppCoins'),
+                (17, 'APTUSD', 'Aptos'),
+                (18, 'ARBUSD', 'Arbitrum'),
+                (19, 'ASTUSD', 'AirSwap'),
+                (20, 'ATLASUSD', 'Star Atlas'),
+                (21, 'ATMUSD', 'Atletico Madrid Fan Token'),
+                (22, 'ATOUSD', 'ATO'),
+                (23, 'AUCUSD', 'Auctus'),
+                (24, 'AUSDTUSD', 'AUSDT'),
+                (25, 'AVAXUSD', 'Avalanche'),
+                (26, 'AVTUSD', 'Aventus'),
+                (27, 'AXSUSD', 'Axie Infinity'),
+                (28, 'AZEROUSD', 'Aleph Zero'),
+                (29, 'B21XUSD', 'B21'),
+                (30, 'B2MUSD', 'Bit2Me'),
+                (31, 'BABUSD', 'BAB'),
+                (32, 'BALUSD', 'Balancer'),
+                (33, 'BANDUSD', 'Band Protocol'),
+                (34, 'BATUSD', 'Basic Attention Token'),
+                (35, 'BBNUSD', 'BBN'),
+                (36, 'BCCUSD', 'BitConnect'),
+                (37, 'BCHABCUSD', 'Bitcoin Cash ABC'),
+                (38, 'BCHNUSD', 'Bitcoin Cash Node'),
+                (39, 'BCHUSD', 'Bitcoin Cash'),
+                (40, 'BCIUSD', 'BCI'),
+                (41, 'BCUUSD', 'BCU'),
+                (42, 'BESTUSD', 'Bitpanda Ecosystem Token'),
+                (43, 'BFTUSD', 'BnkToTheFuture'),
+                (44, 'BFXUSD', 'BFX'),
+                (45, 'BG1USD', 'BG1'),
+                (46, 'BG2USD', 'BG2'),
+                (47, 'BGBUSD', 'Bitget Token'),
+                (48, 'BLURUSD', 'Blur'),
+                (49, 'BMIUSD', 'Bridge Mutual'),
+                (50, 'BMNUSD', 'BMN'),
+                (51, 'BNTUSD', 'Bancor'),
+                (52, 'BOBAUSD', 'Boba Network'),
+                (53, 'BONKUSD', 'Bonk'),
+                (54, 'BOOUSD', 'SpookySwap'),
+                (55, 'BORGUSD', 'Borg'),
+                (56, 'BOSONUSD', 'Boson Protocol'),
+                (57, 'BOXUSD', 'BOX'),
+                (58, 'BRISEUSD', 'Bitgert'),
+                (59, 'BSVUSD', 'Bitcoin SV'),
+                (60, 'BT1USD', 'BT1'),
+                (61, 'BT2USD', 'BT2'),
+                (62, 'BTCUSD', 'Bitcoin'),
+                (63, 'BTGUSD', 'Bitcoin Gold'),
+                (64, 'BTSEUSD', 'BTSE Token'),
+                (65, 'BTTUSD', 'BitTorrent'),
+                (66, 'CBTUSD', 'CommerceBlock'),
+                (67, 'CCDUSD', 'Concordium'),
+                (68, 'CELOUSD', 'Celo'),
+                (69, 'CELUSD', 'Celsius'),
+                (70, 'CFIUSD', 'Cofound.it'),
+                (71, 'CHEXUSD', 'CHEX'),
+                (72, 'CHSBUSD', 'SwissBorg'),
+                (73, 'CHZUSD', 'Chiliz'),
+                (74, 'CLOUSD', 'Callisto Network'),
+                (75, 'CNDUSD', 'Cindicator'),
+                (76, 'CNNUSD', 'CNN'),
+                (77, 'COMPUSD', 'Compound'),
+                (78, 'CONVUSD', 'Convergence'),
+                (79, 'CRVUSD', 'Curve DAO Token'),
+                (80, 'CSTBCHABCUSD', 'CST BCH ABC'),
+                (81, 'CSTBCHNUSD', 'CST BCH Node'),
+                (82, 'CSXUSD', 'CSX'),
+                (83, 'CTKUSD', 'CertiK'),
+                (84, 'CTXUSD', 'Cryptex'),
+                (85, 'DADUSD', 'DAD'),
+                (86, 'DAIUSD', 'Dai'),
+                (87, 'DAPPUSD', 'Dapp.com'),
+                (88, 'DATUSD', 'Datum'),
+                (89, 'DCRUSD', 'Decred'),
+                (90, 'DGBUSD', 'DigiByte'),
+                (91, 'DGXUSD', 'Digix Gold'),
+                (92, 'DOGEUSD', 'Dogecoin'),
+                (93, 'DOGUSD', 'DOG'),
+                (94, 'DORAUSD', 'Dora Factory'),
+                (95, 'DOTUSD', 'Polkadot'),
+                (96, 'DRKUSD', 'DRK'),
+                (97, 'DRNUSD', 'DRN'),
+                (98, 'DSHUSD', 'Dash'),
+                (99, 'DTAUSD', 'Data'),
+                (100, 'DTHUSD', 'DTH'),
+                (101, 'DTXUSD', 'DTX'),
+                (102, 'DUSKUSD', 'Dusk Network'),
+                (103, 'DVFUSD', 'DeversiFi'),
+                (104, 'DYMUSD', 'Dymension'),
+                (105, 'EDOUSD', 'Eidoo'),
+                (106, 'EGLDUSD', 'MultiversX'),
+                (107, 'ELFUSD', 'aelf'),
+                (108, 'ENJUSD', 'Enjin Coin'),
+                (109, 'EOSDTUSD', 'EOSDT'),
+                (110, 'EOSUSD', 'EOS'),
+                (111, 'ESSUSD', 'Essentia'),
+                (112, 'ETCUSD', 'Ethereum Classic'),
+                (113, 'ETH2XUSD', 'ETH 2x Flexible Leverage Index'),
+                (114, 'ETHUSD', 'Ethereum'),
+                (115, 'ETHWUSD', 'EthereumPoW'),
+                (116, 'ETPUSD', 'Metaverse ETP'),
+                (117, 'EUSUSD', 'EUS'),
+                (118, 'EUTUSD', 'EUT USD'),
+                (119, 'EVTUSD', 'Everitoken'),
+                (120, 'EXOUSD', 'Exosis'),
+                (121, 'EXRDUSD', 'e-Radix'),
+                (122, 'FBTUSD', 'FBT'),
+                (123, 'FCLUSD', 'Fractal'),
+                (124, 'FETUSD', 'Fetch.ai'),
+                (125, 'FILUSD', 'Filecoin'),
+                (126, 'FLOKIUSD', 'FLOKI'),
+                (127, 'FLRUSD', 'Flare'),
+                (128, 'FOAUSD', 'FOA'),
+                (129, 'FORTHUSD', 'Ampleforth Governance Token'),
+                (130, 'FSNUSD', 'Fusion'),
+                (131, 'FTMUSD', 'Fantom'),
+                (132, 'FTTUSD', 'FTX Token'),
+                (133, 'FUNUSD', 'FunFair'),
+                (134, 'GALAUSD', 'Gala'),
+                (135, 'GENUSD', 'DAOstack'),
+                (136, 'GMMTUSD', 'GMMT'),
+                (137, 'GMTUSD', 'STEPN'),
+                (138, 'GNOUSD', 'Gnosis'),
+                (139, 'GNTUSD', 'Golem'),
+                (140, 'GOCUSD', 'GOC'),
+                (141, 'GOMININGUSD', 'GoMining'),
+                (142, 'GOTUSD', 'GOT'),
+                (143, 'GPTUSD', 'GPT'),
+                (144, 'GRTUSD', 'The Graph'),
+                (145, 'GSDUSD', 'GSD'),
+                (146, 'GSTUSD', 'GST'),
+                (147, 'GTXUSD', 'GTX'),
+                (148, 'GXTUSD', 'GXT'),
+                (149, 'HECUSD', 'HEC'),
+                (150, 'HEZUSD', 'Hermez Network'),
+                (151, 'HILSVUSD', 'HILS'),
+                (152, 'HIXUSD', 'HIX'),
+                (153, 'HMTUSD', 'Human Protocol'),
+                (154, 'HOTUSD', 'Holo'),
+                (155, 'HTXUSD', 'HTX'),
+                (156, 'ICEUSD', 'ICE'),
+                (157, 'ICPUSD', 'Internet Computer'),
+                (158, 'IDXUSD', 'IDX'),
+                (159, 'IMPUSD', 'Imperium'),
+                (160, 'INJUSD', 'Injective'),
+                (161, 'INTUSD', 'Internet Node Token'),
+                (162, 'IOSUSD', 'IOS'),
+                (163, 'IOTUSD', 'IOTA'),
+                (164, 'IQXUSD', 'IQX'),
+                (165, 'JASMYUSD', 'JasmyCoin'),
+                (166, 'JSTUSD', 'JUST'),
+                (167, 'JUPUSD', 'Jupiter'),
+                (168, 'KAIUSD', 'KardiaChain'),
+                (169, 'KANUSD', 'BitKan'),
+                (170, 'KARATEUSD', 'Karate Combat'),
+                (171, 'KAVAUSD', 'Kava'),
+                (172, 'KNCUSD', 'Kyber Network Crystal'),
+                (173, 'KSMUSD', 'Kusama'),
+                (174, 'LAIUSD', 'LAI'),
+                (175, 'LDOUSD', 'Lido DAO'),
+                (176, 'LEOUSD', 'LEO Token'),
+                (177, 'LIFIIIUSD', 'LIF III'),
+                (178, 'LINKUSD', 'Chainlink'),
+                (179, 'LOOUSD', 'LOO'),
+                (180, 'LRCUSD', 'Loopring'),
+                (181, 'LTCUSD', 'Litecoin'),
+                (182, 'LUNA2USD', 'Terra 2.0'),
+                (183, 'LUNAUSD', 'Terra'),
+                (184, 'LUXOUSD', 'LUXO'),
+                (185, 'LYMUSD', 'Lympo'),
+                (186, 'MANUSD', 'MAN'),
+                (187, 'MATICUSD', 'Polygon'),
+                (188, 'MEMEUSD', 'MEME'),
+                (189, 'MGOUSD', 'MGO'),
+                (190, 'MIMUSD', 'Magic Internet Money'),
+                (191, 'MIRUSD', 'Mirror Protocol'),
+                (192, 'MITUSD', 'MIT'),
+                (193, 'MKRUSD', 'Maker'),
+                (194, 'MLNUSD', 'Enzyme'),
+                (195, 'MNAUSD', 'MNA'),
+                (196, 'MOBUSD', 'MobileCoin'),
+                (197, 'MTNUSD', 'MTN'),
+                (198, 'MXNTUSD', 'MXNT'),
+                (199, 'NCAUSD', 'NCA'),
+                (200, 'NEARUSD', 'NEAR Protocol'),
+                (201, 'NECUSD', 'Nectar'),
+                (202, 'NEOUSD', 'NEO'),
+                (203, 'NEXOUSD', 'NEXO'),
+                (204, 'NIOUSD', 'NIO'),
+                (205, 'NOMUSD', 'NOM'),
+                (206, 'NUTUSD', 'NUT'),
+                (207, 'NXRAUSD', 'NXRA'),
+                (208, 'OCEANUSD', 'Ocean Protocol'),
+                (209, 'ODEUSD', 'ODE'),
+                (210, 'OGNUSD', 'Origin Protocol'),
+                (211, 'OKBUSD', 'OKB'),
+                (212, 'OMGUSD', 'OMG Network'),
+                (213, 'OMNUSD', 'OMN'),
+                (214, 'ONEUSD', 'Harmony'),
+                (215, 'ONLUSD', 'ONL'),
+                (216, 'ONUSUSD', 'ONUS'),
+                (217, 'OPXUSD', 'OPX'),
+                (218, 'ORSUSD', 'ORS'),
+                (219, 'OXYUSD', 'Oxygen'),
+                (220, 'PAIUSD', 'PCHAIN'),
+                (221, 'PASUSD', 'PAS'),
+                (222, 'PAXUSD', 'Paxos Standard'),
+                (223, 'PEPEUSD', 'Pepe'),
+                (224, 'PLANETSUSD', 'PlanetWatch'),
+                (225, 'PLUUSD', 'Pluton'),
+                (226, 'PNGUSD', 'Pangolin'),
+                (227, 'PNKUSD', 'Kleros'),
+                (228, 'POAUSD', 'POA Network'),
+                (229, 'POLCUSD', 'PolkaCity'),
+                (230, 'POLISUSD', 'Polis'),
+                (231, 'POYUSD', 'POY'),
+                (232, 'PRMXUSD', 'PRMX'),
+                (233, 'QRDOUSD', 'Qredo'),
+                (234, 'QSHUSD', 'QASH'),
+                (235, 'QTFUSD', 'QTF'),
+                (236, 'QTMUSD', 'QTM'),
+                (237, 'RBTUSD', 'RBT'),
+                (238, 'RCNUSD', 'Ripio Credit Network'),
+                (239, 'RDNUSD', 'Raiden Network Token'),
+                (240, 'REEFUSD', 'Reef'),
+                (241, 'REPUSD', 'Augur'),
+                (242, 'REQUSD', 'Request'),
+                (243, 'RIFUSD', 'RSK Infrastructure Framework'),
+                (244, 'RINGXUSD', 'RINGX'),
+                (245, 'RLCUSD', 'iExec RLC'),
+                (246, 'RLYUSD', 'Rally'),
+                (247, 'ROSEUSD', 'Oasis Network'),
+                (248, 'RRBUSD', 'RRB'),
+                (249, 'RRTUSD', 'RRT'),
+                (250, 'RTEUSD', 'RTE'),
+                (251, 'SANDUSD', 'The Sandbox'),
+                (252, 'SANUSD', 'Santiment Network Token'),
+                (253, 'SCRUSD', 'SCR'),
+                (254, 'SEEUSD', 'SEE'),
+                (255, 'SEIUSD', 'Sei'),
+                (256, 'SENATEUSD', 'SENATE'),
+                (257, 'SENUSD', 'SEN'),
+                (258, 'SGBUSD', 'SGB'),
+                (259, 'SHFTUSD', 'SHFT'),
+                (260, 'SHIBUSD', 'Shiba Inu'),
+                (261, 'SIDUSUSD', 'SIDUS'),
+                (262, 'SMRUSD', 'SMR'),
+                (263, 'SNGUSD', 'SNG'),
+                (264, 'SNTUSD', 'Status'),
+                (265, 'SNXUSD', 'Synthetix'),
+                (266, 'SOLUSD', 'Solana'),
+                (267, 'SPELLUSD', 'Spell Token'),
+                (268, 'SPKUSD', 'SPK'),
+                (269, 'SRMUSD', 'Serum'),
+                (270, 'STGUSD', 'Stargate Finance'),
+                (271, 'STJUSD', 'STJ'),
+                (272, 'STRKUSD', 'Strike'),
+                (273, 'SUIUSD', 'Sui'),
+                (274, 'SUKUUSD', 'SUKU'),
+                (275, 'SUNUSD', 'SUN'),
+                (276, 'SUSHIUSD', 'SushiSwap'),
+                (277, 'SWEATUSD', 'Sweat Economy'),
+                (278, 'SWMUSD', 'SWM'),
+                (279, 'SXXUSD', 'SXX'),
+                (280, 'TENETUSD', 'TENET'),
+                (281, 'TERRAUSTUSD', 'TerraUSD'),
+                (282, 'THETAUSD', 'Theta Network'),
+                (283, 'TIAUSD', 'Celestia'),
+                (284, 'TKNUSD', 'Monolith'),
+                (285, 'TLOSUSD', 'Telos'),
+                (286, 'TNBUSD', 'TNB'),
+                (287, 'TOMIUSD', 'TOMI'),
+                (288, 'TONUSD', 'Toncoin'),
+                (289, 'TRADEUSD', 'TRADE'),
+                (290, 'TREEBUSD', 'TREEB'),
+                (291, 'TRIUSD', 'TRI'),
+                (292, 'TRXUSD', 'TRON'),
+                (293, 'TSDUSD', 'TSD'),
+                (294, 'TURBOUSD', 'TURBO'),
+                (295, 'UDCUSD', 'UDC'),
+                (296, 'UFRUSD', 'UFR'),
+                (297, 'UNIUSD', 'Uniswap'),
+                (298, 'UOPUSD', 'UOP'),
+                (299, 'UOSUSD', 'Ultra'),
+                (300, 'USKUSD', 'USK'),
+                (301, 'USTUSD', 'TerraUSD'),
+                (302, 'UTKUSD', 'Utrust'),
+                (303, 'UTNUSD', 'UTN'),
+                (304, 'VEEUSD', 'BLOCKv'),
+                (305, 'VELOUSD', 'VELO'),
+                (306, 'VENUSD', 'VeChain'),
+                (307, 'VETUSD', 'VeChain'),
+                (308, 'VLDUSD', 'VLD'),
+                (309, 'VRAUSD', 'Verasity'),
+                (310, 'VSYUSD', 'VSY'),
+                (311, 'WAVESUSD', 'Waves'),
+                (312, 'WAXUSD', 'WAX'),
+                (313, 'WBTUSD', 'WBT'),
+                (314, 'WHBTUSD', 'WHBT'),
+                (315, 'WIFUSD', 'dogwifhat'),
+                (316, 'WILDUSD', 'WILD'),
+                (317, 'WLOUSD', 'WLO'),
+                (318, 'WMINIMAUSD', 'WMINIMA'),
+                (319, 'WNCGUSD', 'Wrapped NCG'),
+                (320, 'WOOUSD', 'WOO Network'),
+                (321, 'WPRUSD', 'WePower'),
+                (322, 'WTCUSD', 'Waltonchain'),
+                (323, 'XAUTUSD', 'Tether Gold'),
+                (324, 'XCADUSD', 'XCAD Network'),
+                (325, 'XCHUSD', 'Chia'),
+                (326, 'XCNUSD', 'XCN'),
+                (327, 'XDCUSD', 'XDC Network'),
+                (328, 'XLMUSD', 'Stellar'),
+                (329, 'XMRUSD', 'Monero'),
+                (330, 'XRAUSD', 'XRA'),
+                (331, 'XRDUSD', 'Radix'),
+                (332, 'XRPUSD', 'XRP'),
+                (333, 'XSNUSD', 'Stakenet'),
+                (334, 'XTPUSD', 'XTP'),
+                (335, 'XTZUSD', 'Tezos'),
+                (336, 'XVGUSD', 'Verge'),
+                (337, 'YFIUSD', 'yearn.finance'),
+                (338, 'YGGUSD', 'Yield Guild Games'),
+                (339, 'YYWUSD', 'YYW'),
+                (340, 'ZBTUSD', 'ZBT'),
+                (341, 'ZCNUSD', '0chain'),
+                (342, 'ZECUSD', 'Zcash'),
+                (343, 'ZETAUSD', 'ZetaChain'),
+                (344, 'ZILUSD', 'Zilliqa'),
+                (345, 'ZMTUSD', 'ZMT'),
+                (346, 'ZRXUSD', '0x')
+            ]
+            
+            cursor.executemany('''
+                INSERT OR IGNORE INTO ativos (id, codigo, nome)
+                VALUES (?, ?, ?)
+            ''', ativos_data)
+            
+            conn.commit()
+            
+            # Carregar cadastro de ativos em memória (o resumo das cotações vem da matriz de preços)
+            self.registry.load(conn, with_summary=False)
+            print("Banco de dados inicializado com sucesso!")
+            
+        except Exception as e:
+            print(f"Erro ao inicializar banco de dados: {str(e)}")
+    
+    def get_row_counts(self):
+        """Obtém o número de cotações salvas por ativo ({codigo: linhas})"""
+        return self.registry.row_counts()
+    
+    def create_quote_writer(self):
+        """Cria o gravador em lote de cotações"""
+        return QuoteWriter(self.db, self.registry)
+    
+    def load_cached_data(self):
+        """Carrega dados salvos do banco de dados"""
+        try:
+            conn = self.db.connection()
+            versao = get_data_version(conn)
+            
+            # Usar o snapshot colunar se ainda corresponder ao banco; senão reconstruí-lo
+            df_cotacoes = self.snapshot.load(versao)
+            if df_cotacoes is None:
+                # Carregar todas as cotações já no formato de colunas (uma por ativo)
+                df_cotacoes = load_price_matrix(conn, self.registry)
+                if df_cotacoes is not None:
+                    self.snapshot.save(df_cotacoes, versao)
+            
+            # Resumo por ativo (primeira/última data, quantidade) a partir da matriz
+            self.registry.load_summary_from_matrix(df_cotacoes)
+            
+            if df_cotacoes is not None:
+                self.df_cotacoes = df_cotacoes
+                self.cotacoes_do_banco = True
+                self.series_cache.invalidate()
+                self.correlation_cache.invalidate()
+                
+                # Atualizar interface
+                self.update_asset_combobox()
+                self.btn_calculate.configure(state="normal")
+                self.btn_plot.configure(state="normal")
+                self.btn_historico.configure(state="normal")
+                self.btn_correlacoes.configure(state="normal")
+                
+                # Atualizar contador de dados
+                total_ativos = len(self.df_cotacoes.columns) - 1  # -1 para excluir coluna 'Data'
+                self.update_status(f"Dados carregados: {total_ativos} ativos salvos")
+                
+                print(f"Dados carregados do cache: {total_ativos} ativos")
+            else:
+                self.update_status("Nenhum dado salvo encontrado")
+                
+        except Exception as e:
+            print(f"Erro ao carregar dados do cache: {str(e)}")
+            self.update_status("Erro ao carregar dados salvos")
+            try:
+                # Manter o resumo das cotações consistente para a próxima atualização
+                self.registry.load(self.db.connection())
+            except Exception as e_registry:
+                print(f"Erro ao carregar resumo das cotações: {str(e_registry)}")
+    
+    def update_status(self, message):
+        """Atualiza a barra de status"""
+        if hasattr(self, 'status_bar') and self.status_bar:
+            self.status_bar.configure(text=message)
+
+    def create_widgets(self):
+        # Instrução no topo
+        instruction_label = ctk.CTkLabel(self, text="1. Carregue os dados | 2. Configure inflação | 3. Calcule | 4. Visualize/Exporte", font=("Arial", 14, "bold"), anchor="center")
+        instruction_label.pack(fill="x", pady=(10, 0))
+
+        # Frame principal
+        main_frame = ctk.CTkFrame(self)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        # --- Seção: Carregamento e Configuração ---
+        top_section = ctk.CTkFrame(main_frame)
+        top_section.pack(fill="x", padx=10, pady=(10, 5))
+
+        # Título da seção
+        ctk.CTkLabel(top_section, text="Carregamento e Configuração", font=("Arial", 12, "bold")).pack(anchor="nw", pady=(0, 5), padx=5)
+
+        # Frame dos botões
+        buttons_frame = ctk.CTkFrame(top_section)
+        buttons_frame.pack(fill="x", padx=5, pady=(0, 5))
+
+        self.btn_load = ctk.CTkButton(
+            buttons_frame, 
+            text="Carregar Arquivo XLSX",
+            command=self.load_file,
+            width=180
+        )
+        self.btn_load.pack(side="left", padx=5, pady=5)
+        ToolTip(self.btn_load, "Carregue um arquivo de cotações em Excel")
+
+        self.btn_inflation = ctk.CTkButton(
+            buttons_frame, 
+            text="Configurar Inflação",
+            command=self.open_inflation_window,
+            width=180
+        )
+        self.btn_inflation.pack(side="left", padx=5, pady=5)
+        ToolTip(self.btn_inflation, "Defina as taxas de inflação para cada período")
+
+        self.btn_qualidade = ctk.CTkButton(
+            buttons_frame,
+            text="⚙️ Qualidade dos Dados",
+            command=self.open_quality_window,
+            width=180
+        )
+        self.btn_qualidade.pack(side="left", padx=5, pady=5)
+        ToolTip(self.btn_qualidade, "Configure os critérios de qualidade dos dados")
+
+        # Botão para buscar Criptomoedas (agora atualiza dados)
+        self.btn_crypto = ctk.CTkButton(
+            buttons_frame,
+            text="🔄 Atualizar Criptomoedas",
+            command=self.fetch_predefined_cryptos,
+            width=180
+        )
+        self.btn_crypto.pack(side="left", padx=5, pady=5)
+        ToolTip(self.btn_crypto, "Atualiza dados das criptomoedas da API")
+
+        self.btn_calculate = ctk.CTkButton(
+            buttons_frame, 
+            text="Calcular Índices",
+            command=self.calculate_indexes,
+            state="disabled",
+            width=180
+        )
+        self.btn_calculate.pack(side="left", padx=10, pady=5)
+        ToolTip(self.btn_calculate, "Calcule os índices para os ativos carregados")
+
+        self.calcular_hurst = ctk.BooleanVar(value=True)
+        chk_hurst = ctk.CTkCheckBox(buttons_frame, text="Hurst (DFA)", variable=self.calcular_hurst)
+        chk_hurst.pack(side="left", padx=5, pady=5)
+        ToolTip(chk_hurst, "Desmarque para uma triagem rápida sem o expoente de Hurst (DFA)")
+
+        self.btn_export = ctk.CTkButton(
+            buttons_frame,
+            text="Exportar Resultados",
+            command=self.export_results,
+            state="disabled",
+            width=180
+        )
+        self.btn_export.pack(side="left", padx=5, pady=5)
+        ToolTip(self.btn_export, "Exporte os resultados para Excel")
+
+        self.btn_cancel_jobs = ctk.CTkButton(
+            buttons_frame,
+            text="⏹ Cancelar",
+            command=self.cancel_jobs,
+            state="disabled",
+            width=100,
+            fg_color="red"
+        )
+        self.btn_cancel_jobs.pack(side="left", padx=5, pady=5)
+        ToolTip(self.btn_cancel_jobs, "Cancela a atualização, o cálculo ou a exportação em andamento")
+
+        # Frame da barra de progresso
+        progress_frame = ctk.CTkFrame(top_section)
+        progress_frame.pack(fill="x", padx=5, pady=(0, 5))
+        self.progress_bar = ctk.CTkProgressBar(progress_frame, height=16)
+        self.progress_bar.pack(fill="x", padx=5, pady=(0, 5))
+        self.progress_bar.set(0)
+        self.progress_bar.grid_remove = self.progress_bar.pack_forget  # compatibilidade com chamadas existentes
+        self.progress_bar.grid = self.progress_bar.pack  # compatibilidade com chamadas existentes
+
+        # Separador visual
+        sep1 = ctk.CTkLabel(main_frame, text="", height=2)
+        sep1.pack(fill="x", pady=(0, 5))
+
+        # --- Tabview principal ---
+        tabview = ctk.CTkTabview(main_frame)
+        tabview.pack(fill="both", expand=True, padx=10, pady=10)
+        tabview.add("Resultados")
+        tabview.add("Gráfico")
+
+        # --- Aba de Resultados ---
+        results_section = ctk.CTkFrame(tabview.tab("Resultados"))
+        results_section.pack(fill="both", expand=True, padx=10, pady=(0,10))
+        
+        # Título e contador de resultados
+        header_frame = ctk.CTkFrame(results_section)
+        header_frame.pack(fill="x", pady=(0, 5))
+        ctk.CTkLabel(header_frame, text="Resultados dos Índices", font=("Arial", 12, "bold")).pack(side="left", padx=5, pady=5)
+        self.result_count_label = ctk.CTkLabel(header_frame, text="", font=("Arial", 10))
+        self.result_count_label.pack(side="right", padx=5, pady=5)
+
+        # Frame de filtros
+        filters_frame = ctk.CTkFrame(results_section)
+        filters_frame.pack(fill="x", pady=(0, 5))
+        
+        # Título dos filtros
+        ctk.CTkLabel(filters_frame, text="🔍 Filtros Avançados", font=("Arial", 11, "bold")).pack(anchor="w", padx=10, pady=(5, 10))
+        
+        # Grid de filtros (2 colunas)
+        filters_grid = ctk.CTkFrame(filters_frame)
+        filters_grid.pack(fill="x", padx=10, pady=(0, 10))
+        
+        # Coluna 1 - Filtros numéricos
+        col1 = ctk.CTkFrame(filters_grid)
+        col1.pack(side="left", fill="both", expand=True, padx=(0, 5))
+        
+        # Índice Melão
+        melao_frame = ctk.CTkFrame(col1)
+        melao_frame.pack(fill="x", pady=2)
+        ctk.CTkLabel(melao_frame, text="Índice Melão:", width=100).pack(side="left", padx=5)
+        self.filtro_melao_min = ctk.CTkEntry(melao_frame, placeholder_text="Mín", width=80)
+        self.filtro_melao_min.pack(side="left", padx=2)
+        self.filtro_melao_max = ctk.CTkEntry(melao_frame, placeholder_text="Máx", width=80)
+        self.filtro_melao_max.pack(side="left", padx=2)
+        
+        # Hurst
+        hurst_frame = ctk.CTkFrame(col1)
+        hurst_frame.pack(fill="x", pady=2)
+        ctk.CTkLabel(hurst_frame, text="Hurst (DFA):", width=100).pack(side="left", padx=5)
+        self.filtro_hurst_min = ctk.CTkEntry(hurst_frame, placeholder_text="Mín", width=80)
+        self.filtro_hurst_min.pack(side="left", padx=2)
+        self.filtro_hurst_max = ctk.CTkEntry(hurst_frame, placeholder_text="Máx", width=80)
+        self.filtro_hurst_max.pack(side="left", padx=2)
+        
+        # Rentabilidade
+        rent_frame = ctk.CTkFrame(col1)
+        rent_frame.pack(fill="x", pady=2)
+        ctk.CTkLabel(rent_frame, text="Rentabilidade (%):", width=100).pack(side="left", padx=5)
+        self.filtro_rent_min = ctk.CTkEntry(rent_frame, placeholder_text="Mín", width=80)
+        self.filtro_rent_min.pack(side="left", padx=2)
+        self.filtro_rent_max = ctk.CTkEntry(rent_frame, placeholder_text="Máx", width=80)
+        self.filtro_rent_max.pack(side="left", padx=2)
+        
+        # MDD
+        mdd_frame = ctk.CTkFrame(col1)
+        mdd_frame.pack(fill="x", pady=2)
+        ctk.CTkLabel(mdd_frame, text="MDD (%):", width=100).pack(side="left", padx=5)
+        self.filtro_mdd_min = ctk.CTkEntry(mdd_frame, placeholder_text="Mín", width=80)
+        self.filtro_mdd_min.pack(side="left", padx=2)
+        self.filtro_mdd_max = ctk.CTkEntry(mdd_frame, placeholder_text="Máx", width=80)
+        self.filtro_mdd_max.pack(side="left", padx=2)
+        
+        # Coluna 2 - Filtros de texto e períodos
+        col2 = ctk.CTkFrame(filters_grid)
+        col2.pack(side="left", fill="both", expand=True, padx=(5, 0))
+        
+        # Ativo
+        ativo_frame = ctk.CTkFrame(col2)
+        ativo_frame.pack(fill="x", pady=2)
+        ctk.CTkLabel(ativo_frame, text="Ativo:", width=80).pack(side="left", padx=5)
+        self.filtro_ativo = ctk.CTkEntry(ativo_frame, placeholder_text="Nome do ativo...", width=200)
+        self.filtro_ativo.pack(side="left", padx=5, fill="x", expand=True)
+        
+        # Períodos
+        periodos_frame = ctk.CTkFrame(col2)
+        periodos_frame.pack(fill="x", pady=2)
+        ctk.CTkLabel(periodos_frame, text="Períodos:", width=80).pack(side="left", padx=5)
+        
+        self.filtro_periodos = {
+            1: ctk.BooleanVar(value=True),
+            2: ctk.BooleanVar(value=True),
+            3: ctk.BooleanVar(value=True),
+            5: ctk.BooleanVar(value=True),
+            8: ctk.BooleanVar(value=True),
+            10: ctk.BooleanVar(value=True)
+        }
+        
+        for period in [1, 2, 3, 5, 8, 10]:
+            chk = ctk.CTkCheckBox(
+                periodos_frame,
+                text=f"{period}a",
+                variable=self.filtro_periodos[period],
+                command=self.aplicar_filtros,
+                width=40
+            )
+            chk.pack(side="left", padx=2)
+        
+        # Filtragem enquanto se digita, refeita só após uma pausa entre as teclas
+        for entrada in (self.filtro_melao_min, self.filtro_melao_max, self.filtro_hurst_min,
+                        self.filtro_hurst_max, self.filtro_rent_min, self.filtro_rent_max,
+                        self.filtro_mdd_min, self.filtro_mdd_max, self.filtro_ativo):
+            entrada.bind("<KeyRelease>", self.agendar_filtros)
+        
+        # Botões de filtro
+        buttons_filters_frame = ctk.CTkFrame(filters_frame)
+        buttons_filters_frame.pack(fill="x", padx=10, pady=(0, 10))
+        
+        self.btn_aplicar_filtros = ctk.CTkButton(
+            buttons_filters_frame,
+            text="✅ Aplicar Filtros",
+            command=self.aplicar_filtros,
+            width=120,
+            fg_color="green"
+        )
+        self.btn_aplicar_filtros.pack(side="left", padx=5, pady=5)
+        
+        self.btn_limpar_filtros = ctk.CTkButton(
+            buttons_filters_frame,
+            text="🗑️ Limpar Filtros",
+            command=self.limpar_filtros,
+            width=120,
+            fg_color="red"
+        )
+        self.btn_limpar_filtros.pack(side="left", padx=5, pady=5)
+        
+        self.btn_exportar_filtrados = ctk.CTkButton(
+            buttons_filters_frame,
+            text="📊 Exportar Filtrados",
+            command=self.exportar_resultados_filtrados,
+            width=150,
+            fg_color="blue"
+        )
+        self.btn_exportar_filtrados.pack(side="right", padx=5, pady=5)
+        
+        # Tabela de resultados (uma coluna por campo do registro de indicadores)
+        columns = engine.result_titles()
+        self.tree = ttk.Treeview(
+            master=results_section,
+            columns=columns,
+            show="headings",
+            height=12
+        )
+        for campo, col in zip(engine.result_fields(), columns):
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by_column(c, False))
+            if campo in engine.CAMPOS_FIXOS:
+                self.tree.column(col, width=90, anchor="center")
+            elif campo == 'r_squared':
+                self.tree.column(col, width=80, anchor="center")
+            else:
+                self.tree.column(col, width=120, anchor="center")
+        # Só as linhas visíveis viram itens da árvore; a barra rola sobre linhas_visiveis
+        scrollbar = ttk.Scrollbar(results_section, orient="vertical")
+        self.results_view = VirtualTreeview(self.tree, scrollbar,
+                                            lambda indice: self.current_results.format_row(indice))
+        self.tree.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+
+        # --- Aba de Gráfico ---
+        graph_section = ctk.CTkFrame(tabview.tab("Gráfico"), height=420)
+        graph_section.pack(fill="both", expand=True, padx=10, pady=(10,10))
+        ctk.CTkLabel(graph_section, text="Visualização Gráfica do Ativo", font=("Arial", 12, "bold")).pack(anchor="w", pady=(0, 5))
+
+        controls_frame = ctk.CTkFrame(graph_section)
+        controls_frame.pack(fill="x", padx=10, pady=5)
+        ctk.CTkLabel(controls_frame, text="Selecionar Ativo:").pack(side="left", padx=(10,5))
+
+        # Frame para seleção de ativos com scroll
+        self.asset_selection_frame = ctk.CTkFrame(controls_frame)
+        self.asset_selection_frame.pack(side="left", padx=5, pady=5)
+        
+        # Configurar tamanho fixo para o frame de seleção
+        self.asset_selection_frame.configure(width=220, height=200)
+        
+        ctk.CTkLabel(self.asset_selection_frame, text="Ativos:", font=("Arial", 10, "bold")).pack(anchor="w", padx=5, pady=(5,0))
+        
+        # Frame scrollável para os ativos
+        self.assets_scroll_frame = ctk.CTkScrollableFrame(
+            self.asset_selection_frame,
+            width=200,
+            height=140,
+            orientation="vertical"
+        )
+        self.assets_scroll_frame.pack(fill="both", padx=5, pady=5)
+        
+        # Variável para armazenar o ativo selecionado
+        self.asset_var = ctk.StringVar()
+        
+        # Dicionário para armazenar os botões dos ativos
+        self.asset_buttons = {}
+
+        self.btn_plot = ctk.CTkButton(
+            controls_frame,
+            text="Plotar Cotação",
+            command=self.plot_asset,
+            state="disabled",
+            width=120
+        )
+        self.btn_plot.pack(side="left", padx=5, pady=5)
+        ToolTip(self.btn_plot, "Exibe o gráfico do ativo selecionado")
+
+        self.btn_historico = ctk.CTkButton(
+            controls_frame,
+            text="Histórico Melão",
+            command=self.plot_melao_history,
+            state="disabled",
+            width=120
+        )
+        self.btn_historico.pack(side="left", padx=5, pady=5)
+        ToolTip(self.btn_historico, "Índice Melão do ativo selecionado em cada dia dos últimos anos")
+
+        self.btn_correlacoes = ctk.CTkButton(
+            controls_frame,
+            text="Correlações",
+            command=self.show_correlations,
+            state="disabled",
+            width=120
+        )
+        self.btn_correlacoes.pack(side="left", padx=5, pady=5)
+        ToolTip(self.btn_correlacoes, "Ativos mais e menos correlacionados com o ativo selecionado")
+
+        # Checkboxes de visualização
+        self.show_cotacao = ctk.BooleanVar(value=True)
+        self.show_maximas = ctk.BooleanVar(value=True)
+        self.show_drawdown = ctk.BooleanVar(value=True)
+        self.show_regressao = ctk.BooleanVar(value=True)
+
+        ctk.CTkCheckBox(controls_frame, text="Cotação", variable=self.show_cotacao, command=self.plot_asset).pack(side="left", padx=5)
+        ctk.CTkCheckBox(controls_frame, text="Máximas", variable=self.show_maximas, command=self.plot_asset).pack(side="left", padx=5)
+        ctk.CTkCheckBox(controls_frame, text="Drawdown", variable=self.show_drawdown, command=self.plot_asset).pack(side="left", padx=5)
+
+        periods_frame = ctk.CTkFrame(controls_frame)
+        periods_frame.pack(side="left", padx=5)
+        ctk.CTkLabel(periods_frame, text="Períodos:").pack(side="left", padx=(0, 5))
+        for period in [10, 8, 5, 3, 2, 1]:
+            chk = ctk.CTkCheckBox(
+                periods_frame,
+                text=f"{period}a",
+                variable=self.period_vars[period],
+                command=self.plot_asset,
+                width=50
+            )
+            chk.pack(side="left", padx=(0, 2))
+
+        # Canvas para o gráfico (mais espaçoso)
+        self.figure, self.ax = plt.subplots(figsize=(12, 5))
+        self.canvas = FigureCanvasTkAgg(self.figure, master=graph_section)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=(0,10))
+
+        # --- Barra de status fixa no rodapé ---
+        self.status_bar = ctk.CTkLabel(self, text="Pronto.", anchor="w")
+        self.status_bar.pack(side="bottom", fill="x", padx=10, pady=(0, 5))
+
+    def test_crypto_codes(self):
+        """Testa quais códigos de criptomoedas são válidos na API"""
+        # Lista apenas com códigos válidos confirmados
+        valid_codes = [
+            'BTCUSD', 'ETHUSD', 'SOLUSD', 'XRPUSD', 'DOGEUSD', 'TONUSD', 'ADAUSD', 
+            'SHIBUSD', 'AVAXUSD', 'DOTUSD', 'TRXUSD', 'LINKUSD', 'MATICUSD', 'BCHUSD', 
+            'UNIUSD', 'NEARUSD', 'LTCUSD', 'ICPUSD', 'APTUSD', 'DAIUSD', 'LEOUSD', 
+            'XLMUSD', 'ETCUSD', 'OKBUSD', 'FILUSD', 'ARBUSD', 'VETUSD', 'MKRUSD', 
+            'INJUSD', 'GRTUSD', 'XMRUSD', 'TIAUSD', 'SEIUSD'
+        ]
+        
+        return valid_codes, []
+
+    def fetch_predefined_cryptos(self):
+        """Busca todas as criptomoedas pré-definidas (atualização incremental em segundo plano)"""
+        if self.jobs.is_running('fetch'):
+            self.update_status("Atualização de criptomoedas já em andamento...")
+            return
+        
+        api_key = os.getenv('apikey')
+        if (not hasattr(nasdaqdatalink.ApiConfig, 'api_key') or not nasdaqdatalink.ApiConfig.api_key) and api_key:
+            nasdaqdatalink.ApiConfig.api_key = api_key  # type: ignore
+        
+        self.show_progress(0)
+        self.update_status("Iniciando atualização de criptomoedas...")
+        self.btn_crypto.configure(state="disabled")
+        
+        # Matriz em memória a que as cotações novas serão mescladas (só se veio do banco)
+        df_base = self.df_cotacoes if self.cotacoes_do_banco else None
+        self.jobs.submit(
+            'fetch',
+            lambda job: self.fetch_cryptos_job(job, df_base),
+            on_progress=self.on_fetch_progress,
+            on_done=self.on_fetch_done,
+            on_error=self.on_fetch_error
+        )
+    
+    def fetch_cryptos_job(self, job, df_base=None):
+        """
+        Executa a atualização das criptomoedas (thread de trabalho).
+
+        Com df_base (matriz carregada do banco), as cotações novas já são mescladas e o
+        snapshot em disco regravado aqui, fora da thread da interface.
+        """
+        # Lista limpa de 346 criptomoedas reais (sem pares de moedas tradicionais)
+        cryptos = [
+            '1INCHUSD', 'AAVEUSD', 'ABSUSD', 'AGIUSD', 'AIDUSD', 'AIOUSD', 'AIXUSD', 'ALBTUSD', 'ALGUSD', 'ALT2612USD',
+            'AMPUSD', 'ANCUSD', 'ANTUSD', 'APENFTUSD', 'APEUSD', 'APPUSD', 'APTUSD', 'ARBUSD', 'ASTUSD', 'ATLASUSD',
+            'ATMUSD', 'ATOUSD', 'AUCUSD', 'AUSDTUSD', 'AVAXUSD', 'AVTUSD', 'AXSUSD', 'AZEROUSD', 'B21XUSD', 'B2MUSD',
+            'BABUSD', 'BALUSD', 'BANDUSD', 'BATUSD', 'BBNUSD', 'BCCUSD', 'BCHABCUSD', 'BCHNUSD', 'BCHUSD', 'BCIUSD',
+            'BCUUSD', 'BESTUSD', 'BFTUSD', 'BFXUSD', 'BG1USD', 'BG2USD', 'BGBUSD', 'BLURUSD', 'BMIUSD', 'BMNUSD',
+            'BNTUSD', 'BOBAUSD', 'BONKUSD', 'BOOUSD', 'BORGUSD', 'BOSONUSD', 'BOXUSD', 'BRISEUSD', 'BSVUSD', 'BT1USD',
+            'BT2USD', 'BTCUSD', 'BTGUSD', 'BTSEUSD', 'BTTUSD', 'CBTUSD', 'CCDUSD', 'CELOUSD', 'CELUSD', 'CFIUSD',
+            'CHEXUSD', 'CHSBUSD', 'CHZUSD', 'CLOUSD', 'CNDUSD', 'CNNUSD', 'COMPUSD', 'CONVUSD', 'CRVUSD', 'CSTBCHABCUSD',
+            'CSTBCHNUSD', 'CSXUSD', 'CTKUSD', 'CTXUSD', 'DADUSD', 'DAIUSD', 'DAPPUSD', 'DATUSD', 'DCRUSD', 'DGBUSD',
+            'DGXUSD', 'DOGEUSD', 'DOGUSD', 'DORAUSD', 'DOTUSD', 'DRKUSD', 'DRNUSD', 'DSHUSD', 'DTAUSD', 'DTHUSD',
+            'DTXUSD', 'DUSKUSD', 'DVFUSD', 'DYMUSD', 'EDOUSD', 'EGLDUSD', 'ELFUSD', 'ENJUSD', 'EOSDTUSD', 'EOSUSD',
+            'ESSUSD', 'ETCUSD', 'ETH2XUSD', 'ETHUSD', 'ETHWUSD', 'ETPUSD', 'EUSUSD', 'EUTUSD', 'EVTUSD', 'EXOUSD',
+            'EXRDUSD', 'FBTUSD', 'FCLUSD', 'FETUSD', 'FILUSD', 'FLOKIUSD', 'FLRUSD', 'FOAUSD', 'FORTHUSD', 'FSNUSD',
+            'FTMUSD', 'FTTUSD', 'FUNUSD', 'GALAUSD', 'GENUSD', 'GMMTUSD', 'GMTUSD', 'GNOUSD', 'GNTUSD', 'GOCUSD',
+            'GOMININGUSD', 'GOTUSD', 'GPTUSD', 'GRTUSD', 'GSDUSD', 'GSTUSD', 'GTXUSD', 'GXTUSD', 'HECUSD', 'HEZUSD',
+            'HILSVUSD', 'HIXUSD', 'HMTUSD', 'HOTUSD', 'HTXUSD', 'ICEUSD', 'ICPUSD', 'IDXUSD', 'IMPUSD', 'INJUSD',
+            'INTUSD', 'IOSUSD', 'IOTUSD', 'IQXUSD', 'JASMYUSD', 'JSTUSD', 'JUPUSD', 'KAIUSD', 'KANUSD', 'KARATEUSD',
+            'KAVAUSD', 'KNCUSD', 'KSMUSD', 'LAIUSD', 'LDOUSD', 'LEOUSD', 'LIFIIIUSD', 'LINKUSD', 'LOOUSD', 'LRCUSD',
+            'LTCUSD', 'LUNA2USD', 'LUNAUSD', 'LUXOUSD', 'LYMUSD', 'MANUSD', 'MATICUSD', 'MEMEUSD', 'MGOUSD', 'MIMUSD',
+            'MIRUSD', 'MITUSD', 'MKRUSD', 'MLNUSD', 'MNAUSD', 'MOBUSD', 'MTNUSD', 'MXNTUSD', 'NCAUSD', 'NEARUSD',
+            'NECUSD', 'NEOUSD', 'NEXOUSD', 'NIOUSD', 'NOMUSD', 'NUTUSD', 'NXRAUSD', 'OCEANUSD', 'ODEUSD', 'OGNUSD',
+            'OKBUSD', 'OMGUSD', 'OMNUSD', 'ONEUSD', 'ONLUSD', 'ONUSUSD', 'OPXUSD', 'ORSUSD', 'OXYUSD', 'PAIUSD',
+            'PASUSD', 'PAXUSD', 'PEPEUSD', 'PLANETSUSD', 'PLUUSD', 'PNGUSD', 'PNKUSD', 'POAUSD', 'POLCUSD', 'POLISUSD',
+            'POYUSD', 'PRMXUSD', 'QRDOUSD', 'QSHUSD', 'QTFUSD', 'QTMUSD', 'RBTUSD', 'RCNUSD', 'RDNUSD', 'REEFUSD',
+            'REPUSD', 'REQUSD', 'RIFUSD', 'RINGXUSD', 'RLCUSD', 'RLYUSD', 'ROSEUSD', 'RRBUSD', 'RRTUSD', 'RTEUSD',
+            'SANDUSD', 'SANUSD', 'SCRUSD', 'SEEUSD', 'SEIUSD', 'SENATEUSD', 'SENUSD', 'SGBUSD', 'SHFTUSD', 'SHIBUSD',
+            'SIDUSUSD', 'SMRUSD', 'SNGUSD', 'SNTUSD', 'SNXUSD', 'SOLUSD', 'SPELLUSD', 'SPKUSD', 'SRMUSD', 'STGUSD',
+            'STJUSD', 'STRKUSD', 'SUIUSD', 'SUKUUSD', 'SUNUSD', 'SUSHIUSD', 'SWEATUSD', 'SWMUSD', 'SXXUSD', 'TENETUSD',
+            'TERRAUSTUSD', 'THETAUSD', 'TIAUSD', 'TKNUSD', 'TLOSUSD', 'TNBUSD', 'TOMIUSD', 'TONUSD', 'TRADEUSD', 'TREEBUSD',
+            'TRIUSD', 'TRXUSD', 'TSDUSD', 'TURBOUSD', 'UDCUSD', 'UFRUSD', 'UNIUSD', 'UOPUSD', 'UOSUSD', 'USKUSD',
+            'USTUSD', 'UTKUSD', 'UTNUSD', 'VEEUSD', 'VELOUSD', 'VENUSD', 'VETUSD', 'VLDUSD', 'VRAUSD', 'VSYUSD',
+            'WAVESUSD', 'WAXUSD', 'WBTUSD', 'WHBTUSD', 'WIFUSD', 'WILDUSD', 'WLOUSD', 'WMINIMAUSD', 'WNCGUSD', 'WOOUSD',
+            'WPRUSD', 'WTCUSD', 'XAUTUSD', 'XCADUSD', 'XCHUSD', 'XCNUSD', 'XDCUSD', 'XLMUSD', 'XMRUSD', 'XRAUSD',
+            'XRDUSD', 'XRPUSD', 'XSNUSD', 'XTPUSD', 'XTZUSD', 'XVGUSD', 'YFIUSD', 'YGGUSD', 'YYWUSD', 'ZBTUSD',
+            'ZCNUSD', 'ZECUSD', 'ZETAUSD', 'ZILUSD', 'ZMTUSD', 'ZRXUSD'
+        ]
+        
+        try:
+            # Datas da última atualização (consulta ao cadastro em memória)
+            last_dates = self.registry.last_dates(cryptos)
+            job.check_cancelled()
+            
+            download_engine = self.create_download_engine()
+            writer = self.create_quote_writer()
+            try:
+                stats = download_engine.run(cryptos, writer.add, last_dates=last_dates,
+                                   progress_callback=job.progress, known_rows=self.get_row_counts(),
+                                   cancel_event=job.cancel_event)
+            finally:
+                # Gravar o último lote, mesmo em caso de cancelamento
+                writer.close()
+            stats['novas_cotacoes'] = writer.novas_cotacoes
+            stats['df_base'] = df_base
+            stats['df_mesclado'] = None
+            if df_base is not None and writer.novas_cotacoes:
+                try:
+                    stats['df_mesclado'], stats['ativos_novos'] = merge_new_quotes(df_base, writer.novas_cotacoes)
+                    self.snapshot.save(stats['df_mesclado'], get_data_version(self.db.connection()))
+                except Exception as e:
+                    # A mesclagem é refeita (ou o banco recarregado) na thread da interface
+                    print(f"Erro ao mesclar cotações novas na thread de trabalho: {str(e)}")
+                    stats['df_mesclado'] = None
+        finally:
+            # Conexão própria desta thread de trabalho
+            self.db.release_thread_connection()
+        job.check_cancelled()
+        return stats
+    
+    def on_fetch_progress(self, concluidos, total, crypto_code):
+        """Atualiza o progresso da atualização de criptomoedas"""
+        self.update_status(f"Atualizando {crypto_code} ({concluidos}/{total})...")
+        if self.progress_bar is not None:
+            self.progress_bar.set(concluidos/total)
+    
+    def on_fetch_done(self, stats):
+        """Finaliza a atualização de criptomoedas"""
+        self.btn_crypto.configure(state="normal")
+        self.hide_progress()
+        
+        # Mesclar apenas as cotações novas na matriz em memória
+        self.merge_refreshed_quotes(stats['novas_cotacoes'], stats)
+        
+        self.update_status(
+            f"Atualização concluída! {stats['total']} criptomoedas processadas. "
+            f"{stats['linhas']} novas cotações, ~{stats['linhas_economizadas']} linhas "
+            f"(~{stats['bytes_economizados'] / 1024:.0f} KB) poupadas pelo filtro de data."
+        )
+    
+    def merge_refreshed_quotes(self, novas_cotacoes, stats=None):
+        """
+        Mescla as cotações recém-gravadas em df_cotacoes, sem recarregar o banco.
+
+        Se o job já mesclou sobre a mesma matriz que ainda está em memória (stats do
+        fetch_cryptos_job), o resultado dele é adotado e o snapshot já está gravado.
+        """
+        if self.df_cotacoes is None or not self.cotacoes_do_banco:
+            # Sem matriz do banco em memória (primeira carga ou arquivo XLSX): carregar tudo
+            self.discard_incremental_states()
+            self.load_cached_data()
+            return
+        
+        try:
+            # Cotações até a data final atual preenchem lacunas antigas: os estados
+            # incrementais desses ativos (de todos, se for o BTCUSD) deixam de valer
+            data_final = np.datetime64(self.df_cotacoes['Data'].max(), 'D')
+            retroativos = [ticker for ticker, dias, _ in novas_cotacoes if len(dias) and dias.min() <= data_final]
+            if retroativos:
+                self.discard_incremental_states(None if 'BTCUSD' in retroativos else retroativos)
+                # Mesma data final com cotações antigas alteradas: a matriz guardada não vale mais
+                self.correlation_cache.invalidate()
+            
+            if stats and stats.get('df_mesclado') is not None and stats['df_base'] is self.df_cotacoes:
+                self.df_cotacoes, ativos_novos = stats['df_mesclado'], stats['ativos_novos']
+            else:
+                self.df_cotacoes, ativos_novos = merge_new_quotes(self.df_cotacoes, novas_cotacoes)
+                if novas_cotacoes:
+                    self.snapshot.save(self.df_cotacoes, get_data_version(self.db.connection()))
+            # Só os ativos com cotações novas perdem os intermediários (todos, se houver datas novas)
+            self.series_cache.replace_frame(self.df_cotacoes, [ticker for ticker, _, _ in novas_cotacoes])
+            if ativos_novos:
+                self.update_asset_combobox()
+            print(f"Cotações mescladas em memória: {sum(len(d) for _, d, _ in novas_cotacoes)} linhas, "
+                  f"{len(ativos_novos)} ativos novos")
+        except Exception as e:
+            print(f"Erro ao mesclar cotações novas, recarregando do banco: {str(e)}")
+            self.discard_incremental_states()
+            self.load_cached_data()
+    
+    def discard_incremental_states(self, ativos=None):
+        """Descarta estados incrementais que podem não corresponder mais às cotações do banco"""
+        self.descartes_incrementais += 1
+        try:
+            with self.db.transaction() as conn:
+                delete_incremental_states(conn, ativos)
+        except Exception as e:
+            print(f"Erro ao descartar estados incrementais: {str(e)}")
+    
+    def on_fetch_error(self, error):
+        """Trata falha ou cancelamento da atualização de criptomoedas"""
+        self.btn_crypto.configure(state="normal")
+        self.hide_progress()
+        
+        if isinstance(error, JobCancelled):
+            # Manter o que já foi salvo antes do cancelamento
+            self.discard_incremental_states()
+            self.load_cached_data()
+            self.update_status("Atualização de criptomoedas cancelada.")
+            return
+        messagebox.showerror("Erro", f"Falha geral ao atualizar criptomoedas:\n{str(error)}")
+
+    def create_download_engine(self):
+        """Cria o motor de download com as configurações atuais"""
+        return DownloadEngine(
+            max_workers=self.download_config['max_workers'],
+            requests_per_second=self.download_config['requests_per_second'],
+            full_history=self.download_config['full_history'],
+            batch_size=self.download_config['batch_size']
+        )
+
+    def update_asset_combobox(self):
+        """Atualiza a lista de ativos, criando ou removendo apenas os botões que mudaram."""
+        if self.df_cotacoes is not None:
+            # Obter todos os nomes de colunas exceto 'Data'
+            ativos = [col for col in self.df_cotacoes.columns if col != 'Data']
+            
+            # Remover botões de ativos que não existem mais
+            ativos_set = set(ativos)
+            for ativo in [a for a in self.asset_buttons if a not in ativos_set]:
+                self.asset_buttons.pop(ativo).destroy()
+            
+            # Criar botões só para os ativos novos, na posição correta da lista
+            for i, ativo in enumerate(ativos):
+                if ativo in self.asset_buttons:
+                    continue
+                btn = ctk.CTkButton(
+                    self.assets_scroll_frame,
+                    text=ativo,
+                    width=180,
+                    height=30,
+                    font=("Arial", 10),
+                    command=lambda a=ativo: self.select_asset(a)
+                )
+                proximo = next((self.asset_buttons[a] for a in ativos[i+1:] if a in self.asset_buttons), None)
+                if proximo is not None:
+                    btn.pack(fill="x", padx=2, pady=1, before=proximo)
+                else:
+                    btn.pack(fill="x", padx=2, pady=1)
+                self.asset_buttons[ativo] = btn
+            
+            if ativos:
+                # Configurar seleção inicial
+                current_value = self.asset_var.get()
+                if current_value not in ativos:
+                    self.asset_var.set(ativos[0])
+                    self.highlight_selected_asset(ativos[0])
+                else:
+                    self.highlight_selected_asset(current_value)
+                
+                self.btn_plot.configure(state="normal")
+                self.btn_historico.configure(state="normal")
+                self.btn_correlacoes.configure(state="normal")
+            else:
+                self.btn_plot.configure(state="disabled")
+                self.btn_historico.configure(state="disabled")
+                self.btn_correlacoes.configure(state="disabled")
+    
+    def select_asset(self, ativo):
+        """Seleciona um ativo e atualiza a interface"""
+        self.asset_var.set(ativo)
+        self.highlight_selected_asset(ativo)
+    
+    def highlight_selected_asset(self, ativo):
+        """Destaca visualmente o ativo selecionado"""
+        # Resetar todos os botões para cor padrão
+        for btn in self.asset_buttons.values():
+            btn.configure(fg_color=("gray75", "gray25"))  # Cor padrão
+        
+        # Destacar o botão selecionado
+        if ativo in self.asset_buttons:
+            self.asset_buttons[ativo].configure(fg_color=("lightblue", "darkblue"))
+                
+    def load_file(self):
+        file_path = ctk.filedialog.askopenfilename(
+            filetypes=[("Excel files", "*.xlsx")]
+        )
+        
+        if file_path:
+            try:
+                self.df_cotacoes = pd.read_excel(file_path, parse_dates=[0])
+                self.cotacoes_do_banco = False
+                self.series_cache.invalidate()
+                self.correlation_cache.invalidate()
+                first_col = self.df_cotacoes.columns[0]
+                self.df_cotacoes.rename(columns={str(first_col): 'Data'}, inplace=True)
+                
+                # Atualizar combobox de ativos usando o novo método
+                self.update_asset_combobox()
+                
+                self.btn_calculate.configure(state="normal")
+                messagebox.showinfo("Sucesso", f"Arquivo carregado: {os.path.basename(file_path)}")
+            except Exception as e:
+                messagebox.showerror("Falha", f"Erro ao carregar arquivo: {str(e)}")
+    
+    def open_inflation_window(self):
+        if self.inflation_window and self.inflation_window.winfo_exists():
+            self.inflation_window.lift()
+            return
+            
+        self.inflation_window = ctk.CTkToplevel(self)
+        self.inflation_window.title("Configurar Taxas de Inflação")
+        self.inflation_window.geometry("400x400")
+        self.inflation_window.transient(self)
+        self.inflation_window.grab_set()
+        self.inflation_window.protocol("WM_DELETE_WINDOW", self.close_inflation_window)
+        
+        # Frame principal
+        main_frame = ctk.CTkFrame(self.inflation_window)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Título
+        ctk.CTkLabel(
+            main_frame, 
+            text="Configurar Taxas de Inflação Acumulada (%)",
+            font=("Arial", 14, "bold")
+        ).pack(pady=(5, 15))
+        
+        # Frame para as entradas
+        entries_frame = ctk.CTkFrame(main_frame)
+        entries_frame.pack(fill="x", padx=20, pady=5)
+        
+        # Dicionário para armazenar as entradas
+        self.inflation_entries = {}
+        
+        # Períodos desejados
+        periods = [10, 8, 5, 3, 2, 1]
+        
+        # Criar entradas para cada período
+        for i, period in enumerate(periods):
+            row_frame = ctk.CTkFrame(entries_frame)
+            row_frame.pack(fill="x", padx=5, pady=5)
+            
+            ctk.CTkLabel(
+                row_frame, 
+                text=f"{period} anos:",
+                width=80
+            ).pack(side="left", padx=(10, 5))
+            
+            entry = ctk.CTkEntry(row_frame, width=100)
+            entry.pack(side="left", padx=(0, 10))
+            self.inflation_entries[period] = entry
+        
+        # Carregar valores atuais
+        self.load_inflation_to_entries()
+        
+        # Frame para botões
+        buttons_frame = ctk.CTkFrame(main_frame)
+        buttons_frame.pack(fill="x", padx=10, pady=20)
+        
+        # Botão Salvar
+        btn_save = ctk.CTkButton(
+            buttons_frame,
+            text="Salvar Inflação",
+            command=self.save_inflation_from_window
+        )
+        btn_save.pack(side="right", padx=10)
+        
+        # Botão Cancelar
+        btn_cancel = ctk.CTkButton(
+            buttons_frame,
+            text="Cancelar",
+            command=self.close_inflation_window
+        )
+        btn_cancel.pack(side="right", padx=10)
+    
+    def close_inflation_window(self):
+        if self.inflation_window and self.inflation_window.winfo_exists():
+            self.inflation_window.grab_release()
+            self.inflation_window.destroy()
+        self.inflation_window = None
+    
+    def open_quality_window(self):
+        """Abre janela para configurar critérios de qualidade dos dados"""
+        if hasattr(self, 'quality_window') and self.quality_window and self.quality_window.winfo_exists():
+            self.quality_window.lift()
+            return
+            
+        self.quality_window = ctk.CTkToplevel(self)
+        self.quality_window.title("Configurar Critérios de Qualidade dos Dados")
+        self.quality_window.geometry("500x600")
+        self.quality_window.transient(self)
+        self.quality_window.grab_set()
+        self.quality_window.protocol("WM_DELETE_WINDOW", self.close_quality_window)
+        
+        # Frame principal
+        main_frame = ctk.CTkFrame(self.quality_window)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        
+        # Título
+        ctk.CTkLabel(
+            main_frame, 
+            text="Critérios de Qualidade dos Dados",
+            font=("Arial", 16, "bold")
+        ).pack(pady=(10, 20))
+        
+        # Descrição
+        desc_text = """
+        Configure os critérios para determinar se um ativo tem dados suficientes 
+        para cálculo dos índices. Ativos que não atendam aos critérios serão 
+        automaticamente rejeitados.
+        """
+        ctk.CTkLabel(
+            main_frame,
+            text=desc_text,
+            font=("Arial", 11),
+            wraplength=450,
+            justify="left"
+        ).pack(pady=(0, 20))
+        
+        # Frame para as configurações
+        config_frame = ctk.CTkFrame(main_frame)
+        config_frame.pack(fill="x", padx=20, pady=10)
+        
+        # Dicionário para armazenar as entradas
+        self.quality_entries = {}
+        
+        # Configurações
+        configs = [
+            ('max_dias_atraso', 'Máximo de dias de atraso:', '7', 'Dias'),
+            ('min_cobertura_ultimo_ano', 'Cobertura mínima no último ano:', '0.8', '% (0.8 = 80%)'),
+            ('max_lacuna_consecutiva', 'Máximo de dias consecutivos sem dados:', '10', 'Dias'),
+            ('min_dias_disponiveis', 'Mínimo de dias disponíveis no último ano:', '200', 'Dias'),
+            ('max_outliers_percent', 'Máximo de outliers permitidos:', '0.05', '% (0.05 = 5%)')
+        ]
+        
+        for key, label, default_value, unit in configs:
+            row_frame = ctk.CTkFrame(config_frame)
+            row_frame.pack(fill="x", padx=10, pady=5)
+            
+            ctk.CTkLabel(
+                row_frame, 
+                text=label,
+                width=300,
+                anchor="w"
+            ).pack(side="left", padx=(10, 5))
+            
+            entry = ctk.CTkEntry(row_frame, width=100)
+            entry.pack(side="left", padx=(0, 5))
+            entry.insert(0, str(self.qualidade_config[key]))
+            self.quality_entries[key] = entry
+            
+            ctk.CTkLabel(
+                row_frame,
+                text=unit,
+                width=80,
+                anchor="w"
+            ).pack(side="left", padx=(0, 10))
+        
+        # Frame para botões
+        buttons_frame = ctk.CTkFrame(main_frame)
+        buttons_frame.pack(fill="x", padx=10, pady=20)
+        
+        # Botão Salvar
+        btn_save = ctk.CTkButton(
+            buttons_frame,
+            text="Salvar Configurações",
+            command=self.save_quality_config
+        )
+        btn_save.pack(side="right", padx=10)
+        
+        # Botão Restaurar Padrões
+        btn_default = ctk.CTkButton(
+            buttons_frame,
+            text="Restaurar Padrões",
+            command=self.restore_default_quality
+        )
+        btn_default.pack(side="right", padx=10)
+        
+        # Botão Cancelar
+        btn_cancel = ctk.CTkButton(
+            buttons_frame,
+            text="Cancelar",
+            command=self.close_quality_window
+        )
+        btn_cancel.pack(side="right", padx=10)
+    
+    def close_quality_window(self):
+        """Fecha a janela de configuração de qualidade"""
+        if hasattr(self, 'quality_window') and self.quality_window and self.quality_window.winfo_exists():
+            self.quality_window.grab_release()
+            self.quality_window.destroy()
+        self.quality_window = None
+    
+    def save_quality_config(self):
+        """Salva as configurações de qualidade dos dados"""
+        try:
+            for key, entry in self.quality_entries.items():
+                try:
+                    value = float(entry.get())
+                    if key == 'min_cobertura_ultimo_ano' or key == 'max_outliers_percent':
+                        if value < 0 or value > 1:
+                            raise ValueError(f"Valor deve estar entre 0 e 1 para {key}")
+                    else:
+                        if value <= 0:
+                            raise ValueError(f"Valor deve ser positivo para {key}")
+                    
+                    self.qualidade_config[key] = value
+                    
+                except ValueError as e:
+                    messagebox.showerror("Erro", f"Valor inválido para {key}: {str(e)}")
+                    return
+            
+            messagebox.showinfo("Sucesso", "Configurações de qualidade salvas com sucesso!")
+            self.close_quality_window()
+            
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao salvar configurações: {str(e)}")
+    
+    def restore_default_quality(self):
+        """Restaura as configurações padrão de qualidade"""
+        try:
+            default_config = dict(engine.QUALIDADE_PADRAO)
+            
+            self.qualidade_config = default_config.copy()
+            
+            # Atualizar campos da interface
+            for key, entry in self.quality_entries.items():
+                entry.delete(0, 'end')
+                entry.insert(0, str(default_config[key]))
+            
+            messagebox.showinfo("Sucesso", "Configurações padrão restauradas!")
+            
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao restaurar padrões: {str(e)}")
+    
+    def load_inflation_to_entries(self):
+        for period, entry in self.inflation_entries.items():
+            value = self.inflacao.get(period, 0.0) * 100
+            entry.delete(0, 'end')
+            entry.insert(0, str(round(value, 2)))
+    
+    def save_inflation_main(self):
+        try:
+            inflation_to_save = {str(k): v * 100 for k, v in self.inflacao.items()}
+            
+            with open(self.json_file, 'w') as f:
+                json.dump(inflation_to_save, f, indent=4)
+            
+            messagebox.showinfo("Sucesso", "Inflação salva com sucesso!")
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao salvar inflação: {str(e)}")
+    
+    def save_inflation_from_window(self):
+        try:
+            for period, entry in self.inflation_entries.items():
+                try:
+                    value = float(entry.get())
+                    self.inflacao[period] = value / 100.0
+                except ValueError:
+                    pass
+            
+            self.save_inflation_main()
+            self.close_inflation_window()
+            
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao salvar inflação: {str(e)}")
+    
+    def load_inflation(self):
+        try:
+            if os.path.exists(self.json_file):
+                with open(self.json_file, 'r') as f:
+                    saved_inflation = json.load(f)
+                    for period in self.inflacao.keys():
+                        if str(period) in saved_inflation:
+                            value = float(saved_inflation[str(period)])
+                            self.inflacao[period] = value / 100.0
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao carregar inflação: {str(e)}")
+             
+    def export_results(self):
+        if not self.current_results:
+            messagebox.showerror("Erro", "Nenhum resultado para exportar")
+            return
+            
+        try:
+            file_path = ctk.filedialog.asksaveasfilename(
+                defaultextension=".xlsx",
+                filetypes=[("Excel files", "*.xlsx")]
+            )
+            
+            if file_path:
+                self.start_export_job(None, file_path,
+                                      f"Resultados exportados para {os.path.basename(file_path)}")
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao exportar resultados: {str(e)}")
+    
+    def start_export_job(self, indices, file_path, mensagem_sucesso):
+        """Grava as linhas de resultados (todas, se indices for None) em Excel em segundo plano"""
+        tabela = self.current_results
+        
+        def export_job(job):
+            df = tabela.to_frame(indices)
+            job.check_cancelled()
+            df.to_excel(file_path, index=False)
+        
+        def on_done(_):
+            self.update_status(mensagem_sucesso)
+            messagebox.showinfo("Sucesso", mensagem_sucesso)
+        
+        def on_error(error):
+            if isinstance(error, JobCancelled):
+                self.update_status("Exportação cancelada.")
+                return
+            messagebox.showerror("Erro", f"Erro ao exportar resultados: {str(error)}")
+        
+        if self.jobs.submit('export', export_job, on_done=on_done, on_error=on_error) is None:
+            messagebox.showerror("Erro", "Já existe uma exportação em andamento")
+            return
+        self.update_status("Exportando resultados...")
+    
+    def plot_asset(self):
+        if self.df_cotacoes is None or self.asset_var.get() == "":
+            return
+            
+        try:
+            ativo = self.asset_var.get()
+            df_ativo = self.df_cotacoes[['Data', ativo]].dropna(subset=[ativo]).copy()  # type: ignore
+            
+            if len(df_ativo) < 1:
+                return
+                
+            min_data = df_ativo['Data'].min()
+            max_data = df_ativo['Data'].max()
+            
+            self.ax.clear()
+            
+            if self.show_cotacao.get():
+                self.ax.plot(df_ativo['Data'], df_ativo[ativo], color='#1f77b4', linewidth=1.5, label='Cotação')
+            
+            if self.show_regressao.get():
+                period_colors = {10: 'red', 8: 'gray', 5: 'purple', 3: 'cyan', 2: 'orange', 1: 'green'}
+                
+                for periodo in [10, 8, 5, 3, 2, 1]:
+                    if not self.period_vars[periodo].get():
+                        continue  # Pula períodos não selecionados
+                    data_inicio = max_data - timedelta(days=periodo*365)
+                    df_periodo = df_ativo[(df_ativo['Data'] >= data_inicio) & (df_ativo['Data'] <= max_data)]
+                    
+                    if len(df_periodo) < 3:
+                        continue
+                        
+                    try:
+                        df_reg = df_periodo.copy()
+                        df_reg['Dias'] = (df_reg['Data'] - df_reg['Data'].min()).dt.days  # type: ignore
+                        df_reg['LogPreco'] = np.log(df_reg[ativo])
+                        
+                        slope, intercept = np.polyfit(df_reg['Dias'], df_reg['LogPreco'], 1)
+                        df_reg['Regressao'] = np.exp(slope * df_reg['Dias'] + intercept)
+                        
+                        self.ax.plot(df_reg['Data'], df_reg['Regressao'], 
+                                    color=period_colors[periodo], linestyle='--', linewidth=2, 
+                                    label=f'Cotação {periodo}a')
+                        
+                    except Exception as reg_error:
+                        print(f"Erro na regressão {periodo}a: {reg_error}")
+            
+            if self.show_maximas.get():
+                df_ativo['Maximo'] = df_ativo[ativo].cummax()
+                self.ax.plot(df_ativo['Data'], df_ativo['Maximo'], color='#ff7f0e', 
+                            linestyle='--', alpha=0.7, label='Máximas')
+            
+            if self.show_drawdown.get():
+                if 'Maximo' not in df_ativo.columns:
+                    df_ativo['Maximo'] = df_ativo[ativo].cummax()
+                df_ativo['Drawdown'] = df_ativo[ativo] / df_ativo['Maximo'] - 1
+                self.ax.fill_between(df_ativo['Data'], df_ativo[ativo], df_ativo['Maximo'], 
+                                    where=(df_ativo[ativo] < df_ativo['Maximo']),
+                                    facecolor='red', alpha=0.3, label='Drawdown')
+            
+            self.ax.set_title(f"Cotação de {ativo} ({min_data.date()} a {max_data.date()})", fontsize=12)
+            self.ax.set_xlabel("Data")
+            self.ax.set_ylabel("Preço")
+            self.ax.set_xlim(min_data, max_data)
+            # type: ignore
+            self.figure.autofmt_xdate()
+            self.ax.grid(True, linestyle='--', alpha=0.7)
+            self.ax.legend(loc='upper left', bbox_to_anchor=(1, 1))
+            self.figure.tight_layout(rect=(0, 0, 0.85, 1))
+            
+            self.canvas.draw()
+            update_id = self.after(100, self.check_plot_update)
+            self.after_ids.append(update_id)
+            
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao plotar ativo: {str(e)}")
+    
+    def plot_melao_history(self):
+        """Calcula em segundo plano a série histórica do Índice Melão do ativo selecionado"""
+        if self.df_cotacoes is None or self.asset_var.get() == "":
+            return
+        
+        ativo = self.asset_var.get()
+        periodos = [p for p in [10, 8, 5, 3, 2, 1] if self.period_vars[p].get()]
+        if not periodos:
+            messagebox.showerror("Erro", "Selecione ao menos um período")
+            return
+        df_cotacoes = self.df_cotacoes
+        inflacao = dict(self.inflacao)
+        anos = self.calculation_config['anos_historico']
+        
+        def history_job(job):
+            # Cache próprio, ligado só a df_cotacoes: o do app pode estar em uso pelo cálculo
+            # dos índices e ser trocado por uma atualização das cotações durante este job
+            series_cache = engine.SeriesCache()
+            historicos = {}
+            for periodo in periodos:
+                job.check_cancelled()
+                historicos[periodo] = engine.melao_history(df_cotacoes, ativo, periodo, inflacao, anos,
+                                                           series_cache)
+            return ativo, historicos
+        
+        def on_error(error):
+            if isinstance(error, JobCancelled):
+                self.update_status("Histórico do Índice Melão cancelado.")
+                return
+            messagebox.showerror("Erro", f"Erro ao calcular o histórico do Índice Melão: {str(error)}")
+        
+        if self.jobs.submit('history', history_job, on_done=self.on_history_done, on_error=on_error) is None:
+            self.update_status("Histórico do Índice Melão já em andamento...")
+            return
+        self.update_status(f"Calculando histórico do Índice Melão de {ativo}...")
+    
+    def on_history_done(self, resultado):
+        """Plota a série histórica do Índice Melão, uma linha por período"""
+        ativo, historicos = resultado
+        period_colors = {10: 'red', 8: 'gray', 5: 'purple', 3: 'cyan', 2: 'orange', 1: 'green'}
+        try:
+            self.ax.clear()
+            for periodo, historico in historicos.items():
+                self.ax.plot(historico['Data'], historico['indice_melao'], color=period_colors[periodo],
+                             linewidth=1.5, label=f'Melão {periodo}a')
+            self.ax.axhline(0, color='white', linewidth=0.8, alpha=0.5)
+            self.ax.set_title(f"Índice Melão de {ativo} nos últimos {self.calculation_config['anos_historico']} anos",
+                              fontsize=12)
+            self.ax.set_xlabel("Data")
+            self.ax.set_ylabel("Índice Melão")
+            self.figure.autofmt_xdate()
+            self.ax.grid(True, linestyle='--', alpha=0.7)
+            self.ax.legend(loc='upper left', bbox_to_anchor=(1, 1))
+            self.figure.tight_layout(rect=(0, 0, 0.85, 1))
+            self.canvas.draw()
+            self.update_status(f"Histórico do Índice Melão de {ativo} concluído.")
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao plotar o histórico: {str(e)}")
+    
+    def show_correlations(self):
+        """Calcula (ou reaproveita) a matriz de correlações e mostra os extremos do ativo selecionado"""
+        if self.df_cotacoes is None or self.asset_var.get() == "":
+            return
+        
+        ativo = self.asset_var.get()
+        periodos = [p for p in [10, 8, 5, 3, 2, 1] if self.period_vars[p].get()]
+        if not periodos:
+            messagebox.showerror("Erro", "Selecione ao menos um período")
+            return
+        df_cotacoes = self.df_cotacoes
+        
+        def correlation_job(job):
+            return ativo, periodos, self.correlation_cache.get(df_cotacoes)
+        
+        def on_error(error):
+            messagebox.showerror("Erro", f"Erro ao calcular as correlações: {str(error)}")
+        
+        if self.jobs.submit('correlation', correlation_job, on_done=self.on_correlations_done,
+                            on_error=on_error) is None:
+            self.update_status("Cálculo das correlações já em andamento...")
+            return
+        self.update_status("Calculando correlações entre os ativos...")
+    
+    def on_correlations_done(self, resultado):
+        """Janela com os ativos mais e menos correlacionados em cada período selecionado"""
+        ativo, periodos, matriz = resultado
+        quantidade = 5
+        
+        janela = ctk.CTkToplevel(self)
+        janela.title(f"Correlações de {ativo} ({matriz.data_final.date()})")
+        janela.geometry("560x500")
+        janela.transient(self)
+        
+        colunas = ("Período", "Grupo", "Ativo", "Correlação")
+        tree = ttk.Treeview(janela, columns=colunas, show="headings")
+        for coluna in colunas:
+            tree.heading(coluna, text=coluna)
+            tree.column(coluna, width=120, anchor="center")
+        scrollbar = ttk.Scrollbar(janela, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True, padx=(10, 0), pady=10)
+        scrollbar.pack(side="right", fill="y", padx=(0, 10), pady=10)
+        
+        for periodo in periodos:
+            grupos = (("Mais correlacionados", matriz.most_correlated(ativo, periodo, quantidade)),
+                      ("Menos correlacionados", matriz.least_correlated(ativo, periodo, quantidade)))
+            for grupo, ranking in grupos:
+                for outro, correlacao in ranking:
+                    tree.insert("", "end", values=(f"{periodo} anos", grupo, outro, f"{correlacao:.4f}"))
+                if not ranking:
+                    tree.insert("", "end", values=(f"{periodo} anos", grupo, "N/A", "N/A"))
+        self.update_status(f"Correlações de {ativo} calculadas.")
+    
+    def check_plot_update(self):
+        if hasattr(self, 'canvas') and self.winfo_exists():
+            try:
+                self.canvas.draw()
+            except tk.TclError:
+                pass
+    
+    def calculate_indexes(self):
+        """Inicia o cálculo dos índices em segundo plano"""
+        if self.df_cotacoes is None:
+            return
+        if self.jobs.is_running('calculate'):
+            self.update_status("Cálculo dos índices já em andamento...")
+            return
+        
+        self.show_progress(0)
+        self.btn_calculate.configure(state="disabled")
+        self.btn_export.configure(state="disabled")
+        self.update_status("Calculando índices...")
+        
+        # Triagem sem Hurst: o DFA (o indicador mais caro) não é executado
+        indicadores = self.calculation_config['indicadores']
+        if not self.calcular_hurst.get():
+            indicadores = [nome for nome in (indicadores or engine.INDICADORES) if nome != 'hurst_dfa']
+        
+        # Cálculo incremental só sobre as cotações do banco e sem o DFA (que não tem forma incremental)
+        incremental = (self.calculation_config['incremental'] and self.cotacoes_do_banco
+                       and indicadores is not None and 'hurst_dfa' not in indicadores)
+        
+        # O job trabalha sobre o DataFrame atual, mesmo que uma atualização o substitua
+        df_cotacoes = self.df_cotacoes
+        self.jobs.submit(
+            'calculate',
+            lambda job: self.calculate_indexes_job(job, df_cotacoes, indicadores, incremental),
+            on_progress=self.on_calculate_progress,
+            on_done=self.on_calculate_done,
+            on_error=self.on_calculate_error
+        )
+    
+    def calculate_indexes_job(self, job, df_cotacoes, indicadores=None, incremental=False):
+        """Calcula os índices de todos os ativos (thread de trabalho)"""
+        qualidade_config = dict(self.qualidade_config)
+        data_final = str(df_cotacoes['Data'].max().date())
+        config_hash = engine.quality_config_hash(qualidade_config)
+        estados = None
+        descartes = self.descartes_incrementais
+        try:
+            # Vereditos de qualidade salvos em execuções anteriores
+            try:
+                self.quality_cache.load(load_quality_verdicts(self.db.connection(), data_final, config_hash))
+            except Exception as e:
+                print(f"Erro ao ler vereditos de qualidade salvos: {str(e)}")
+            
+            # Estados do cálculo incremental (janelas da data final anterior)
+            if incremental:
+                try:
+                    estados = {(ativo, periodo): engine.WindowState.from_dict(estado)
+                               for ativo, periodo, estado in load_incremental_states(self.db.connection())}
+                except Exception as e:
+                    print(f"Erro ao ler estados incrementais: {str(e)}")
+                    estados = {}
+            
+            resumo = engine.calculate_indexes(
+                df_cotacoes,
+                dict(self.inflacao),
+                qualidade_config,
+                progress_callback=job.progress,
+                cancel_check=job.check_cancelled,
+                max_workers=self.calculation_config['max_workers'],
+                chunk_size=self.calculation_config['chunk_size'],
+                quality_cache=self.quality_cache,
+                series_cache=self.series_cache,
+                indicadores=indicadores,
+                estados=estados
+            )
+            
+            try:
+                with self.db.transaction() as conn:
+                    save_quality_verdicts(conn, self.quality_cache.pending_rows(), data_final)
+                    # Estados descartados durante o cálculo (cotações retroativas) não são regravados
+                    if estados is not None and descartes == self.descartes_incrementais:
+                        save_incremental_states(conn, [(ativo, periodo, estado.to_dict())
+                                                       for (ativo, periodo), estado in estados.items()])
+            except Exception as e:
+                print(f"Erro ao salvar vereditos de qualidade e estados incrementais: {str(e)}")
+        finally:
+            self.db.release_thread_connection()
+        
+        resumo['resultados'] = engine.ResultTable(resumo['resultados'])
+        return resumo
+    
+    def on_calculate_progress(self, ativos_processados, total_ativos, ativo):
+        """Atualiza o progresso do cálculo dos índices"""
+        self.update_status(f"Calculando {ativo} ({ativos_processados}/{total_ativos})...")
+        if self.progress_bar is not None:
+            self.progress_bar.set(ativos_processados/total_ativos)
+    
+    def on_calculate_done(self, resumo):
+        """Exibe os resultados do cálculo dos índices"""
+        self.btn_calculate.configure(state="normal")
+        self.hide_progress()
+        
+        resultados = resumo['resultados']
+        self.current_results = resultados
+        self.ordenacao = None
+        self.update_table(np.arange(len(resultados)), recriar=True)
+        self.btn_export.configure(state="normal")
+        
+        # Mostrar estatísticas de qualidade dos dados
+        status_msg = f"Cálculos concluídos! {resumo['ativos_aprovados']} ativos aprovados, {resumo['ativos_rejeitados']} rejeitados"
+        if resumo['ativos_rejeitados'] > 0:
+            status_msg += f" - {len(resultados)} resultados válidos"
+        self.update_status(status_msg)
+    
+    def on_calculate_error(self, error):
+        """Trata falha ou cancelamento do cálculo dos índices"""
+        self.btn_calculate.configure(state="normal")
+        if self.current_results:
+            self.btn_export.configure(state="normal")
+        self.hide_progress()
+        
+        if isinstance(error, JobCancelled):
+            self.update_status("Cálculo dos índices cancelado.")
+            return
+        messagebox.showerror("Erro", f"Erro nos cálculos: {str(error)}")
+        self.update_status("Erro ao calcular.")
+
+    def update_table(self, indices, recriar=False):
+        """Exibe as linhas de current_results indicadas em indices, nessa ordem (recriar após um novo cálculo)"""
+        self.linhas_visiveis = np.asarray(indices, dtype=np.int64)
+        # iid de cada item é o índice da linha em current_results
+        self.results_view.set_rows(self.linhas_visiveis, recriar)
+
+    def sort_by_column(self, col, reverse):
+        # Ordenação numérica sobre a coluna de current_results (N/A sempre no fim)
+        campo = engine.result_fields()[engine.result_titles().index(col)]
+        self.ordenacao = (campo, reverse)
+        self.update_table(self.current_results.sort(self.linhas_visiveis, campo, reverse))
+        # Alternar ordem para o próximo clique
+        self.tree.heading(col, command=lambda: self.sort_by_column(col, not reverse))
+
+    def agendar_filtros(self, event=None):
+        """Reagenda a filtragem para ATRASO_FILTRO_MS após a última tecla"""
+        if self.filtro_agendado is not None:
+            self.after_cancel(self.filtro_agendado)
+        self.filtro_agendado = self.after(ATRASO_FILTRO_MS, self.aplicar_filtros)
+    
+    def aplicar_filtros(self):
+        """Aplica os filtros selecionados na tabela"""
+        if self.filtro_agendado is not None:
+            self.after_cancel(self.filtro_agendado)
+            self.filtro_agendado = None
+        if not self.current_results:
+            return
+            
+        try:
+            # Obter valores dos filtros
+            filtros = {
+                'melao_min': self.get_float_value(self.filtro_melao_min.get()),
+                'melao_max': self.get_float_value(self.filtro_melao_max.get()),
+                'hurst_min': self.get_float_value(self.filtro_hurst_min.get()),
+                'hurst_max': self.get_float_value(self.filtro_hurst_max.get()),
+                'rent_min': self.get_float_value(self.filtro_rent_min.get()),
+                'rent_max': self.get_float_value(self.filtro_rent_max.get()),
+                'mdd_min': self.get_float_value(self.filtro_mdd_min.get()),
+                'mdd_max': self.get_float_value(self.filtro_mdd_max.get()),
+                'ativo': self.filtro_ativo.get().strip().lower(),
+                'periodos': [p for p, var in self.filtro_periodos.items() if var.get()]
+            }
+            
+            # Filtrar resultados (mantendo a última ordenação pelo cabeçalho)
+            indices_filtrados = np.flatnonzero(self.mascara_filtros(filtros))
+            if self.ordenacao is not None:
+                indices_filtrados = self.current_results.sort(indices_filtrados, *self.ordenacao)
+            
+            # Atualizar tabela
+            self.update_table(indices_filtrados)
+            
+            # Atualizar contador
+            total = len(self.current_results)
+            filtrados = len(indices_filtrados)
+            self.result_count_label.configure(
+                text=f"Mostrando {filtrados} de {total} resultados"
+            )
+            
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao aplicar filtros: {str(e)}")
+    
+    def get_float_value(self, value):
+        """Converte string para float, retorna None se inválido"""
+        if not value or value.strip() == '':
+            return None
+        try:
+            return float(value.replace(',', '.'))
+        except ValueError:
+            return None
+    
+    def mascara_filtros(self, filtros):
+        """Máscara das linhas de current_results que passam pelos filtros aplicados"""
+        limites = {campo: (filtros[f'{chave}_min'], filtros[f'{chave}_max']) for chave, campo in FILTROS_NUMERICOS}
+        return self.current_results.filter_mask(limites, filtros['ativo'], filtros['periodos'])
+    
+    def limpar_filtros(self):
+        """Limpa todos os filtros e mostra todos os resultados"""
+        # Limpar campos
+        self.filtro_melao_min.delete(0, 'end')
+        self.filtro_melao_max.delete(0, 'end')
+        self.filtro_hurst_min.delete(0, 'end')
+        self.filtro_hurst_max.delete(0, 'end')
+        self.filtro_rent_min.delete(0, 'end')
+        self.filtro_rent_max.delete(0, 'end')
+        self.filtro_mdd_min.delete(0, 'end')
+        self.filtro_mdd_max.delete(0, 'end')
+        self.filtro_ativo.delete(0, 'end')
+        
+        # Marcar todos os períodos
+        for var in self.filtro_periodos.values():
+            var.set(True)
+        
+        # Mostrar todos os resultados
+        indices = np.arange(len(self.current_results))
+        if self.ordenacao is not None:
+            indices = self.current_results.sort(indices, *self.ordenacao)
+        self.update_table(indices)
+        total = len(self.current_results)
+        self.result_count_label.configure(text=f"Mostrando {total} de {total} resultados")
+    
+    def exportar_resultados_filtrados(self):
+        """Exporta apenas os resultados filtrados"""
+        if not self.current_results:
+            messagebox.showerror("Erro", "Nenhum resultado para exportar")
+            return
+        
+        try:
+            # Linhas filtradas atuais, na ordem exibida
+            indices = self.linhas_visiveis
+            
+            if not len(indices):
+                messagebox.showerror("Erro", "Nenhum resultado filtrado para exportar")
+                return
+            
+            file_path = ctk.filedialog.asksaveasfilename(
+                defaultextension=".xlsx",
+                filetypes=[("Excel files", "*.xlsx")]
+            )
+            
+            if file_path:
+                self.start_export_job(indices, file_path,
+                                      f"Resultados filtrados exportados para {os.path.basename(file_path)}")
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao exportar resultados filtrados: {str(e)}")
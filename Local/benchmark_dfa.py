@@ -0,0 +1,77 @@
+"""
+Compara o DFA vetorizado (dfa.py) com nolds.dfa em tempo e resultado.
+
+Uso:
+    python benchmark_dfa.py [quantidade_de_series] [tamanho]
+
+Gera séries de retornos sintéticas (ruído gaussiano e um passeio com memória), mede o
+tempo de nolds.dfa série a série e o de dfa.dfa_batch com todas as séries de uma vez,
+e mostra a maior diferença absoluta entre os expoentes. O nolds é só a referência desta
+comparação e não faz parte de requirements.txt (pip install nolds para usá-la).
+"""
+import sys
+import time
+import warnings
+
+import numpy as np
+
+import dfa
+
+
+def gerar_series(quantidade, tamanho, seed=0):
+    """Séries de retornos diários sintéticas, metade ruído branco e metade com memória"""
+    rng = np.random.default_rng(seed)
+    series = []
+    for i in range(quantidade):
+        ruido = rng.normal(0, 0.03, tamanho)
+        if i % 2:
+            # Média móvel exponencial do ruído: introduz persistência (H > 0.5)
+            for j in range(1, tamanho):
+                ruido[j] += 0.5 * ruido[j - 1]
+        series.append(ruido)
+    return series
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    tamanho = int(sys.argv[2]) if len(sys.argv) > 2 else 3650
+
+    try:
+        import nolds
+    except Exception as e:
+        print(f"nolds indisponível ({str(e)}): medindo só a versão vetorizada")
+        nolds = None
+
+    series = gerar_series(quantidade, tamanho)
+    print(f"{quantidade} séries de {tamanho} pontos, escalas {dfa.dfa_nvals(tamanho)}")
+
+    inicio = time.perf_counter()
+    vetorizado = dfa.dfa_batch(series)
+    tempo_vetorizado = time.perf_counter() - inicio
+    print(f"dfa.dfa_batch: {tempo_vetorizado:.3f}s ({quantidade / tempo_vetorizado:.1f} séries/s)")
+
+    inicio = time.perf_counter()
+    individual = np.array([dfa.dfa(s) for s in series])
+    tempo_individual = time.perf_counter() - inicio
+    print(f"dfa.dfa (uma série por chamada): {tempo_individual:.3f}s")
+
+    if nolds is None:
+        return
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        inicio = time.perf_counter()
+        referencia = np.array([nolds.dfa(s, fit_exp='poly') for s in series])
+        tempo_nolds = time.perf_counter() - inicio
+        padrao = np.array([nolds.dfa(s) for s in series])
+
+    print(f"nolds.dfa: {tempo_nolds:.3f}s | aceleração: {tempo_nolds / tempo_vetorizado:.1f}x (lote), "
+          f"{tempo_nolds / tempo_individual:.1f}x (individual)")
+    print(f"Maior diferença vs nolds.dfa(fit_exp='poly'): {np.max(np.abs(vetorizado - referencia)):.2e} "
+          f"(tolerância 1e-8)")
+    print(f"Maior diferença vs nolds.dfa() padrão: {np.max(np.abs(vetorizado - padrao)):.2e} "
+          f"(RANSAC, se scikit-learn estiver instalado)")
+
+
+if __name__ == "__main__":
+    main()
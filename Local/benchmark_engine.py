@@ -0,0 +1,90 @@
+"""
+Compara o cálculo dos índices serial e distribuído em processos (engine.calculate_indexes).
+
+Uso:
+    python benchmark_engine.py [quantidade_de_ativos] [dias] [processos]
+
+Gera uma matriz de preços sintética, mede o cálculo serial e o paralelo (forçado com
+paralelo=True), confere que os resultados são iguais e estima a partir de quantos ativos
+a distribuição compensa: a sobrecarga fixa do paralelo (tempo total menos o cálculo
+dividido entre os processos) contra o custo serial por ativo. A sobrecarga medida por
+processo é a referência de engine.SOBRECARGA_PROCESSO_S.
+"""
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import engine
+
+INFLACAO = {10: 0.6, 8: 0.5, 5: 0.3, 3: 0.2, 2: 0.1, 1: 0.05}
+
+
+def gerar_cotacoes(quantidade, dias, seed=0):
+    """Matriz de preços sintética no formato de df_cotacoes (BTCUSD + passeios aleatórios)"""
+    rng = np.random.default_rng(seed)
+    datas = pd.date_range(end=pd.Timestamp.today().normalize(), periods=dias, freq='D')
+    colunas = {'Data': datas}
+    for i in range(quantidade):
+        codigo = 'BTCUSD' if i == 0 else f'SIN{i:04d}USD'
+        colunas[codigo] = 10.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.03, dias)))
+    return pd.DataFrame(colunas)
+
+
+def medir(df_cotacoes, **opcoes):
+    """(segundos, resumo) de uma execução de calculate_indexes sem a saída detalhada"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        resumo = engine.calculate_indexes(df_cotacoes, INFLACAO, verbose=False, **opcoes)
+    return time.perf_counter() - inicio, resumo
+
+
+def resultados_iguais(a, b):
+    """Mesmas linhas (ativo, período) e valores iguais até o arredondamento (o Hurst em lote
+    empilha séries diferentes em série e nos processos)"""
+    if [linha[:2] for linha in a] != [linha[:2] for linha in b]:
+        return False
+    valores_a = np.array([linha[2:] for linha in a], dtype=np.float64)
+    valores_b = np.array([linha[2:] for linha in b], dtype=np.float64)
+    return bool(np.allclose(valores_a, valores_b, rtol=1e-12, atol=1e-12, equal_nan=True))
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    dias = int(sys.argv[2]) if len(sys.argv) > 2 else 3650
+    processos = int(sys.argv[3]) if len(sys.argv) > 3 else (os.cpu_count() or 1)
+
+    df_cotacoes = gerar_cotacoes(quantidade, dias)
+    print(f"{quantidade} ativos x {dias} dias, {processos} processos ({os.cpu_count()} CPUs)")
+
+    tempo_serial, serial = medir(df_cotacoes, paralelo=False)
+    aprovados = serial['ativos_aprovados']
+    custo_ativo = tempo_serial / max(aprovados, 1)
+    print(f"Serial: {tempo_serial:.2f}s ({custo_ativo * 1000:.1f} ms por ativo)")
+
+    if processos < 2:
+        print("Um único processo: nada a comparar")
+        return
+
+    tempo_paralelo, paralelo = medir(df_cotacoes, max_workers=processos, paralelo=True)
+    calculo = sum(tempo for _, tempo in paralelo['workers'].values()) / processos
+    sobrecarga = max(tempo_paralelo - calculo, 0.0)
+    print(f"Paralelo: {tempo_paralelo:.2f}s (cálculo ~{calculo:.2f}s por processo, "
+          f"sobrecarga ~{sobrecarga:.2f}s) | aceleração: {tempo_serial / tempo_paralelo:.2f}x")
+    print(f"Resultados iguais: {resultados_iguais(serial['resultados'], paralelo['resultados'])}")
+
+    # Serial: n * custo; paralelo: sobrecarga + n * custo / processos
+    equilibrio = sobrecarga / (custo_ativo * (1 - 1 / processos))
+    nucleos = min(processos, os.cpu_count() or 1)
+    print(f"Sobrecarga por processo: ~{sobrecarga / -(-processos // nucleos):.2f}s "
+          f"(engine.SOBRECARGA_PROCESSO_S = {engine.SOBRECARGA_PROCESSO_S})")
+    print(f"Equilíbrio estimado: ~{equilibrio:.0f} ativos aprovados | decisão automática para "
+          f"{aprovados} ativos: {'paralelo' if engine.parallel_pays_off(aprovados, custo_ativo, processos) else 'serial'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,697 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import repeat
+
+import numpy as np
+import pandas as pd
+
+# Pragmas aplicados a toda conexão aberta pelo gerenciador
+PRAGMAS = {
+    'journal_mode': 'WAL',        # Leituras da interface não bloqueiam a escrita da atualização
+    'synchronous': 'NORMAL',      # Seguro com WAL e bem mais rápido que FULL
+    'cache_size': -65536,         # 64 MB de cache de páginas (valor negativo = KB)
+    'mmap_size': 268435456,       # 256 MB mapeados em memória para leitura
+    'temp_store': 'MEMORY',
+}
+
+# Versão do esquema do banco (guardada em metadados.schema_version)
+# 1: cotacoes(ativo_id, data TEXT ISO) em tabela com rowid
+# 2: cotacoes(ativo_id, dia INTEGER) WITHOUT ROWID, dia = dias desde 1970-01-01
+SCHEMA_VERSION = 2
+
+DIA_ZERO = date(1970, 1, 1)
+
+
+def day_to_date(dia):
+    """Converte o número do dia (dias desde 1970-01-01) em date"""
+    return DIA_ZERO + timedelta(days=int(dia))
+
+
+def date_to_day(valor):
+    """Converte uma date em número do dia (dias desde 1970-01-01)"""
+    return (valor - DIA_ZERO).days
+
+
+def get_schema_version(conn):
+    """Lê a versão do esquema gravada em metadados (1 para bancos antigos)"""
+    row = conn.execute("SELECT valor FROM metadados WHERE chave = 'schema_version'").fetchone()
+    return int(row[0]) if row else 1
+
+
+def get_data_version(conn):
+    """Lê o contador de alterações das cotações (metadados.versao_cotacoes)"""
+    row = conn.execute("SELECT valor FROM metadados WHERE chave = 'versao_cotacoes'").fetchone()
+    return int(row[0]) if row else 0
+
+
+def bump_data_version(conn):
+    """Incrementa o contador de alterações das cotações (dentro da transação corrente)"""
+    conn.execute(
+        "INSERT OR REPLACE INTO metadados (chave, valor) VALUES ('versao_cotacoes', ?)",
+        (str(get_data_version(conn) + 1),)
+    )
+
+
+def ensure_cotacoes_schema(conn):
+    """
+    Cria a tabela cotacoes no esquema atual, migrando bancos antigos uma única vez.
+
+    A migração converte a data ISO em número do dia e reescreve a tabela como
+    WITHOUT ROWID agrupada por (ativo_id, dia); em seguida o arquivo é compactado.
+    Renomear, criar, copiar e apagar acontecem em uma única transação (BEGIN IMMEDIATE):
+    se o processo for interrompido, o banco volta ao esquema antigo e a migração é
+    refeita na próxima abertura. Uma cotacoes_v1 deixada por versões anteriores, que
+    migravam em passos separados, tem a cópia retomada. Requer a tabela metadados já criada.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        colunas = [row[1] for row in conn.execute("PRAGMA table_info(cotacoes)")]
+        migrar = 'data' in colunas and get_schema_version(conn) < SCHEMA_VERSION
+        retomar = not migrar and conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cotacoes_v1'").fetchone() is not None
+
+        if migrar:
+            print("Migrando tabela de cotações para o esquema com dias inteiros...")
+            inicio = time.perf_counter()
+            conn.execute("ALTER TABLE cotacoes RENAME TO cotacoes_v1")
+        elif retomar:
+            print("Retomando migração interrompida da tabela de cotações...")
+            inicio = time.perf_counter()
+
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cotacoes (
+                ativo_id INTEGER NOT NULL,
+                dia INTEGER NOT NULL,
+                preco REAL NOT NULL,
+                PRIMARY KEY (ativo_id, dia),
+                FOREIGN KEY (ativo_id) REFERENCES ativos(id)
+            ) WITHOUT ROWID
+        ''')
+
+        if migrar or retomar:
+            conn.execute('''
+                INSERT OR IGNORE INTO cotacoes (ativo_id, dia, preco)
+                SELECT ativo_id, CAST(julianday(data) - 2440587.5 AS INTEGER), preco
+                FROM cotacoes_v1
+                WHERE julianday(data) IS NOT NULL
+                ORDER BY ativo_id, data
+            ''')
+            conn.execute("DROP TABLE cotacoes_v1")
+            bump_data_version(conn)
+
+        conn.execute(
+            "INSERT OR REPLACE INTO metadados (chave, valor) VALUES ('schema_version', ?)",
+            (str(SCHEMA_VERSION),)
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if migrar or retomar:
+        # Recuperar o espaço da tabela antiga
+        conn.execute("VACUUM")
+        print(f"Migração concluída em {time.perf_counter() - inicio:.1f}s")
+
+
+class ConnectionManager:
+    """
+    Gerencia as conexões SQLite da aplicação.
+
+    Cada thread recebe uma conexão persistente própria (a da thread da interface é a
+    conexão principal do app), aberta uma única vez com WAL e os pragmas acima. Como
+    as conexões não são fechadas a cada operação, o cache de statements do sqlite3
+    reaproveita as consultas já preparadas.
+    """
+
+    def __init__(self, db_file, timeout=30.0, cached_statements=256):
+        self.db_file = db_file
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = {}
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_file,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        for pragma, value in PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        return conn
+
+    def connection(self):
+        """Retorna a conexão da thread atual, abrindo-a na primeira chamada"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._prune_dead_threads()
+                self._connections[threading.get_ident()] = (threading.current_thread(), conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Executa um bloco em uma transação na conexão da thread atual"""
+        conn = self.connection()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def release_thread_connection(self):
+        """Fecha a conexão da thread atual (usado ao final de jobs em segundo plano)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+        conn.close()
+
+    def _prune_dead_threads(self):
+        for ident, (thread, conn) in list(self._connections.items()):
+            if not thread.is_alive():
+                conn.close()
+                del self._connections[ident]
+
+    def close_all(self):
+        """Fecha todas as conexões abertas"""
+        with self._lock:
+            for thread, conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+class AssetRegistry:
+    """
+    Cadastro em memória dos ativos (tabela ativos) e do resumo das suas cotações.
+
+    Carregado uma única vez do banco, guarda código→id, id→código, nome, primeira e
+    última data e quantidade de cotações de cada ativo. As gravações atualizam o
+    resumo no lugar, evitando uma consulta por ativo a cada atualização.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ids = {}
+        self.codigos = {}
+        self.nomes = {}
+        self.primeira_data = {}
+        self.ultima_data = {}
+        self.linhas = {}
+
+    def load(self, conn, with_summary=True):
+        """
+        Carrega os ativos e o resumo das cotações a partir do banco.
+
+        Com with_summary=False só o cadastro é lido; o resumo pode então ser obtido
+        da matriz de preços já carregada (load_summary_from_matrix).
+        """
+        cursor = conn.cursor()
+        cursor.execute('SELECT id, codigo, nome FROM ativos')
+        ativos = cursor.fetchall()
+        resumo = []
+        if with_summary:
+            cursor.execute('''
+                SELECT ativo_id, MIN(dia), MAX(dia), COUNT(*)
+                FROM cotacoes
+                GROUP BY ativo_id
+            ''')
+            resumo = cursor.fetchall()
+
+        with self._lock:
+            self.ids = {codigo: ativo_id for ativo_id, codigo, _ in ativos}
+            self.codigos = {ativo_id: codigo for ativo_id, codigo, _ in ativos}
+            self.nomes = {codigo: nome for _, codigo, nome in ativos}
+            self.primeira_data.clear()
+            self.ultima_data.clear()
+            self.linhas.clear()
+            for ativo_id, primeira, ultima, linhas in resumo:
+                codigo = self.codigos.get(ativo_id)
+                if codigo is None:
+                    continue
+                self.primeira_data[codigo] = _parse_date(primeira)
+                self.ultima_data[codigo] = _parse_date(ultima)
+                self.linhas[codigo] = linhas
+
+    def load_summary_from_matrix(self, df_cotacoes):
+        """Recalcula primeira/última data e quantidade de cotações a partir da matriz de preços"""
+        primeira, ultima, linhas = {}, {}, {}
+        if df_cotacoes is not None and len(df_cotacoes):
+            datas = df_cotacoes['Data'].to_numpy(dtype='datetime64[D]')
+            valores = df_cotacoes.drop(columns='Data')
+            presentes = valores.notna().to_numpy()
+            contagens = presentes.sum(axis=0)
+            indices_primeiro = presentes.argmax(axis=0)
+            indices_ultimo = len(presentes) - 1 - presentes[::-1].argmax(axis=0)
+            for j, codigo in enumerate(valores.columns):
+                if contagens[j] == 0:
+                    continue
+                primeira[codigo] = datas[indices_primeiro[j]].item()
+                ultima[codigo] = datas[indices_ultimo[j]].item()
+                linhas[codigo] = int(contagens[j])
+        with self._lock:
+            self.primeira_data = primeira
+            self.ultima_data = ultima
+            self.linhas = linhas
+
+    def get_id(self, codigo):
+        return self.ids.get(codigo)
+
+    def get_codigo(self, ativo_id):
+        return self.codigos.get(ativo_id)
+
+    def get_nome(self, codigo):
+        return self.nomes.get(codigo)
+
+    def last_date(self, codigo):
+        with self._lock:
+            return self.ultima_data.get(codigo)
+
+    def first_date(self, codigo):
+        with self._lock:
+            return self.primeira_data.get(codigo)
+
+    def last_dates(self, codigos):
+        """Últimas datas de vários ativos ({codigo: date ou None})"""
+        with self._lock:
+            return {codigo: self.ultima_data.get(codigo) for codigo in codigos}
+
+    def row_counts(self):
+        with self._lock:
+            return dict(self.linhas)
+
+    def record_insert(self, codigo, primeira, ultima, linhas_inseridas):
+        """Atualiza o resumo do ativo após a gravação de novas cotações"""
+        if not linhas_inseridas:
+            return
+        primeira = _parse_date(primeira)
+        ultima = _parse_date(ultima)
+        with self._lock:
+            atual = self.primeira_data.get(codigo)
+            self.primeira_data[codigo] = primeira if atual is None else min(atual, primeira)
+            atual = self.ultima_data.get(codigo)
+            self.ultima_data[codigo] = ultima if atual is None else max(atual, ultima)
+            self.linhas[codigo] = self.linhas.get(codigo, 0) + linhas_inseridas
+
+
+class QuoteWriter:
+    """
+    Gravação vetorizada de cotações na tabela cotacoes.
+
+    Os DataFrames recebidos em add() ficam em um buffer e são gravados em lote: a
+    validação e a formatação são feitas coluna a coluna com NumPy/pandas e as linhas
+    seguem para executemany em blocos grandes, com uma transação por lote de ativos.
+    Deve ser usado por uma única thread (a que escreve no banco).
+    """
+
+    INSERT_SQL = '''
+        INSERT OR IGNORE INTO cotacoes (ativo_id, dia, preco)
+        VALUES (?, ?, ?)
+    '''
+
+    def __init__(self, db, registry, batch_symbols=50, batch_rows=200000, chunk_size=50000):
+        self.db = db
+        self.registry = registry
+        self.batch_symbols = batch_symbols
+        self.batch_rows = batch_rows
+        self.chunk_size = chunk_size
+        self._buffer = []
+        self._buffer_rows = 0
+        # Cotações gravadas nesta sessão [(ativo, dias datetime64[D], preços)], para mesclar em memória
+        self.novas_cotacoes = []
+        self.linhas = 0
+        self.tempo = 0.0
+
+    @staticmethod
+    def prepare_rows(df_data, ativo):
+        """
+        Valida e formata um DataFrame ['Data', <ativo>] de forma vetorizada.
+
+        Descarta datas inválidas e preços não numéricos, não finitos ou <= 0. Datas
+        repetidas mantêm a primeira cotação, como o INSERT OR IGNORE no banco.
+        Retorna (datas datetime64[D] ordenadas, preços float64) como arrays NumPy.
+        """
+        datas = pd.to_datetime(df_data['Data'], errors='coerce').to_numpy(dtype='datetime64[D]')
+        precos = pd.to_numeric(df_data[ativo], errors='coerce').to_numpy(dtype=np.float64)
+        validos = ~np.isnat(datas) & np.isfinite(precos) & (precos > 0)
+        datas, primeiras = np.unique(datas[validos], return_index=True)
+        return datas, precos[validos][primeiras]
+
+    def add(self, ativo, df_data):
+        """Adiciona as cotações de um ativo ao buffer, gravando quando o lote enche"""
+        self._buffer.append((ativo, df_data))
+        self._buffer_rows += len(df_data)
+        if len(self._buffer) >= self.batch_symbols or self._buffer_rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        """Grava o conteúdo do buffer"""
+        if not self._buffer:
+            return 0
+        itens, self._buffer, self._buffer_rows = self._buffer, [], 0
+        try:
+            return self.write(itens)
+        except Exception as e:
+            if len(itens) == 1:
+                print(f"Erro ao salvar dados no banco: {str(e)}")
+                return 0
+            # Lote com falha: gravar ativo a ativo para não perder os demais
+            print(f"Erro ao salvar lote de {len(itens)} ativos, gravando individualmente: {str(e)}")
+            total = 0
+            for item in itens:
+                try:
+                    total += self.write([item])
+                except Exception as e_item:
+                    print(f"Erro ao salvar dados de {item[0]} no banco: {str(e_item)}")
+            return total
+
+    def write(self, itens):
+        """Grava [(ativo, df)] em uma única transação; retorna as linhas inseridas"""
+        inicio = time.perf_counter()
+        inseridas_total = 0
+        resumos = []
+        with self.db.transaction() as conn:
+            cursor = conn.cursor()
+            for ativo, df_data in itens:
+                ativo_id = self.registry.get_id(ativo)
+                if not ativo_id:
+                    print(f"Ativo {ativo} não encontrado na tabela de ativos")
+                    continue
+
+                datas, precos = self.prepare_rows(df_data, ativo)
+                if len(datas) == 0:
+                    print(f"Nenhum dado válido encontrado para {ativo}")
+                    continue
+
+                # Dias já gravados seriam ignorados pelo banco: ficam fora do INSERT e
+                # de novas_cotacoes, que assim contém só as linhas realmente inseridas
+                dias = datas.astype(np.int64)
+                existentes = np.fromiter(
+                    (row[0] for row in cursor.execute(
+                        "SELECT dia FROM cotacoes WHERE ativo_id = ? AND dia BETWEEN ? AND ?",
+                        (ativo_id, int(dias[0]), int(dias[-1])))),
+                    dtype=np.int64)
+                novas = ~np.isin(dias, existentes)
+
+                inseridas = 0
+                dias_novos, precos_novos = dias[novas], precos[novas]
+                for inicio_bloco in range(0, len(dias_novos), self.chunk_size):
+                    fim_bloco = inicio_bloco + self.chunk_size
+                    cursor.executemany(self.INSERT_SQL, zip(
+                        repeat(ativo_id),
+                        dias_novos[inicio_bloco:fim_bloco].tolist(),
+                        precos_novos[inicio_bloco:fim_bloco].tolist()
+                    ))
+                    inseridas += max(cursor.rowcount, 0)
+
+                resumos.append((ativo, datas, precos, novas, inseridas))
+                inseridas_total += inseridas
+                print(f"Dados salvos para {ativo} (ID: {ativo_id}): {len(datas)} registros válidos")
+
+            if inseridas_total:
+                # Invalida o snapshot da matriz de preços
+                bump_data_version(conn)
+
+        # Atualizar o resumo dos ativos em memória só após o commit
+        for ativo, datas, precos, novas, inseridas in resumos:
+            primeira = int(datas[0].astype(np.int64))
+            ultima = int(datas[-1].astype(np.int64))
+            self.registry.record_insert(ativo, primeira, ultima, inseridas)
+            if inseridas:
+                self.novas_cotacoes.append((ativo, datas[novas], precos[novas]))
+
+        self.linhas += inseridas_total
+        self.tempo += time.perf_counter() - inicio
+        return inseridas_total
+
+    @property
+    def rows_per_second(self):
+        return self.linhas / self.tempo if self.tempo > 0 else 0.0
+
+    def close(self):
+        """Grava o que restou no buffer e exibe a taxa de gravação"""
+        self.flush()
+        if self.linhas:
+            print(f"Gravação: {self.linhas} linhas em {self.tempo:.2f}s ({self.rows_per_second:,.0f} linhas/s)")
+
+
+def load_price_matrix(conn, registry):
+    """
+    Carrega todas as cotações no formato largo (coluna 'Data' + uma coluna por ativo).
+
+    O eixo de datas é montado diretamente a partir dos números de dia e a matriz é
+    preenchida com NumPy, sem pd.to_datetime sobre texto nem pivot. As colunas seguem
+    a ordem alfabética dos códigos. Retorna None se não houver cotações.
+    """
+    df_db = pd.read_sql_query('SELECT ativo_id, dia, preco FROM cotacoes', conn)
+    if df_db.empty:
+        return None
+
+    dias, linhas = np.unique(df_db['dia'].to_numpy(dtype=np.int64), return_inverse=True)
+    ids, colunas = np.unique(df_db['ativo_id'].to_numpy(dtype=np.int64), return_inverse=True)
+
+    matriz = np.full((len(dias), len(ids)), np.nan)
+    matriz[linhas, colunas] = df_db['preco'].to_numpy(dtype=np.float64)
+
+    codigos = [registry.get_codigo(int(ativo_id)) or str(ativo_id) for ativo_id in ids]
+    ordem = sorted(range(len(codigos)), key=codigos.__getitem__)
+
+    df_cotacoes = pd.DataFrame(matriz[:, ordem], columns=[codigos[i] for i in ordem])
+    df_cotacoes.insert(0, 'Data', pd.to_datetime(dias, unit='D'))
+    return df_cotacoes
+
+
+def merge_new_quotes(df_cotacoes, novas_cotacoes):
+    """
+    Mescla cotações recém-gravadas na matriz de preços já carregada.
+
+    novas_cotacoes é uma lista [(ativo, dias datetime64[D], preços)]. O eixo de datas e
+    as colunas só são estendidos quando aparecem datas ou ativos novos; células já
+    preenchidas não são alteradas (mesma regra do INSERT OR IGNORE no banco).
+    Retorna (df_cotacoes, ativos_novos).
+    """
+    novas_cotacoes = [item for item in novas_cotacoes if len(item[1])]
+    if not novas_cotacoes:
+        return df_cotacoes, []
+
+    dias_atuais = df_cotacoes['Data'].to_numpy(dtype='datetime64[D]')
+    colunas_atuais = [c for c in df_cotacoes.columns if c != 'Data']
+    valores = df_cotacoes[colunas_atuais].to_numpy(dtype=np.float64)
+
+    dias_recebidos = np.unique(np.concatenate([dias for _, dias, _ in novas_cotacoes]))
+    dias_novos = np.setdiff1d(dias_recebidos, dias_atuais)
+    ativos_novos = sorted({ativo for ativo, _, _ in novas_cotacoes} - set(colunas_atuais))
+
+    if len(dias_novos) or ativos_novos:
+        eixo = np.union1d(dias_atuais, dias_novos)
+        colunas = sorted(colunas_atuais + ativos_novos)
+        posicao = {codigo: j for j, codigo in enumerate(colunas)}
+        matriz = np.full((len(eixo), len(colunas)), np.nan)
+        matriz[np.ix_(np.searchsorted(eixo, dias_atuais), [posicao[c] for c in colunas_atuais])] = valores
+    else:
+        # Só preenchimento de células vazias: sem alterar eixo nem colunas
+        eixo = dias_atuais
+        colunas = colunas_atuais
+        posicao = {codigo: j for j, codigo in enumerate(colunas)}
+        matriz = np.array(valores)
+
+    for ativo, dias, precos in novas_cotacoes:
+        # Dias repetidos mantêm a primeira cotação, como o INSERT OR IGNORE no banco
+        linhas, primeiras = np.unique(np.searchsorted(eixo, dias), return_index=True)
+        precos = precos[primeiras]
+        coluna = posicao[ativo]
+        vazias = np.isnan(matriz[linhas, coluna])
+        matriz[linhas[vazias], coluna] = precos[vazias]
+
+    df_merged = pd.DataFrame(matriz, columns=colunas)
+    df_merged.insert(0, 'Data', pd.to_datetime(eixo.astype(np.int64), unit='D'))
+    return df_merged, ativos_novos
+
+
+class PriceSnapshot:
+    """
+    Snapshot colunar em disco da matriz de preços (df_cotacoes).
+
+    Fica ao lado do banco: <base>.snapshot.npy guarda a matriz (primeira coluna com o
+    número do dia, demais com os preços) e <base>.snapshot.json guarda os códigos e a
+    versão das cotações (metadados.versao_cotacoes) de quando foi gerado. Na
+    inicialização o .npy é lido de uma vez (np.load simples, sem mapeamento em memória)
+    se a versão ainda for a atual.
+
+    Compromisso: a leitura continua proporcional ao tamanho do histórico (uma leitura
+    sequencial do arquivo, bem mais barata que a consulta ao SQLite e a pivotagem), em
+    troca de o arquivo não ficar aberto: um mapeamento impediria o os.replace de save()
+    no Windows e deixaria df_cotacoes dependente do arquivo em disco.
+    """
+
+    def __init__(self, db_file):
+        base = os.path.splitext(db_file)[0]
+        self.matrix_file = base + '.snapshot.npy'
+        self.meta_file = base + '.snapshot.json'
+
+    def load(self, versao):
+        """Retorna a matriz de preços se o snapshot corresponder à versão informada"""
+        try:
+            if not (os.path.exists(self.matrix_file) and os.path.exists(self.meta_file)):
+                return None
+            with open(self.meta_file, 'r') as f:
+                meta = json.load(f)
+            if meta.get('versao') != versao:
+                return None
+
+            matriz = np.load(self.matrix_file)
+            colunas = meta['colunas']
+            if matriz.ndim != 2 or matriz.shape[1] != len(colunas) + 1:
+                return None
+
+            # Os preços viram o bloco do DataFrame sem uma segunda cópia da matriz lida
+            df_cotacoes = pd.DataFrame(matriz[:, 1:], columns=colunas, copy=False)
+            df_cotacoes.insert(0, 'Data', pd.to_datetime(matriz[:, 0].astype(np.int64), unit='D'))
+            return df_cotacoes
+
+        except Exception as e:
+            print(f"Erro ao ler snapshot de cotações: {str(e)}")
+            return None
+
+    def save(self, df_cotacoes, versao):
+        """Grava o snapshot da matriz de preços para a versão informada"""
+        try:
+            dias = df_cotacoes['Data'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+            precos = df_cotacoes.drop(columns='Data').to_numpy(dtype=np.float64)
+            matriz = np.column_stack([dias.astype(np.float64), precos])
+            colunas = [str(c) for c in df_cotacoes.columns if c != 'Data']
+
+            # Gravar em arquivos temporários e substituir (o .json por último)
+            # (sufixo por thread: o job de atualização também grava o snapshot)
+            sufixo = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+            tmp_matrix = self.matrix_file + sufixo
+            with open(tmp_matrix, 'wb') as f:
+                np.save(f, matriz)
+            tmp_meta = self.meta_file + sufixo
+            with open(tmp_meta, 'w') as f:
+                json.dump({'versao': versao, 'colunas': colunas}, f)
+            os.replace(tmp_matrix, self.matrix_file)
+            os.replace(tmp_meta, self.meta_file)
+
+        except Exception as e:
+            print(f"Erro ao gravar snapshot de cotações: {str(e)}")
+
+
+def ensure_quality_cache_schema(conn):
+    """
+    Cria a tabela de vereditos de qualidade (cache persistente da verificação dos dados).
+
+    Por ser apenas um cache, uma tabela de formato antigo é descartada e recriada.
+    """
+    colunas = [row[1] for row in conn.execute("PRAGMA table_info(vereditos_qualidade)")]
+    if colunas and 'detalhes' not in colunas:
+        conn.execute("DROP TABLE vereditos_qualidade")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS vereditos_qualidade (
+            ativo TEXT NOT NULL,
+            data_final TEXT NOT NULL,
+            config_hash TEXT NOT NULL,
+            assinatura TEXT NOT NULL,
+            valido INTEGER NOT NULL,
+            mensagem TEXT NOT NULL,
+            detalhes TEXT NOT NULL,
+            PRIMARY KEY (ativo, data_final, config_hash)
+        ) WITHOUT ROWID
+    ''')
+    conn.commit()
+
+
+def load_quality_verdicts(conn, data_final, config_hash):
+    """
+    Lê os vereditos salvos para a data final e a configuração informadas.
+
+    Retorna linhas (ativo, data_final, config_hash, assinatura, veredito), com o veredito
+    como dicionário (critério que falhou e valores medidos).
+    """
+    rows = conn.execute(
+        "SELECT ativo, data_final, config_hash, assinatura, detalhes FROM vereditos_qualidade "
+        "WHERE data_final = ? AND config_hash = ?",
+        (data_final, config_hash)
+    ).fetchall()
+    return [(ativo, data, config, assinatura, json.loads(detalhes))
+            for ativo, data, config, assinatura, detalhes in rows]
+
+
+def save_quality_verdicts(conn, rows, data_final):
+    """
+    Grava vereditos novos e descarta os de outras datas finais.
+
+    Só a data final mais recente é útil na próxima execução, então a tabela fica
+    limitada a um veredito por ativo e configuração.
+    """
+    conn.execute("DELETE FROM vereditos_qualidade WHERE data_final <> ?", (data_final,))
+    conn.executemany(
+        "INSERT OR REPLACE INTO vereditos_qualidade "
+        "(ativo, data_final, config_hash, assinatura, valido, mensagem, detalhes) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [(ativo, data, config, assinatura, int(veredito['valido']), veredito['mensagem'], json.dumps(veredito))
+         for ativo, data, config, assinatura, veredito in rows]
+    )
+
+
+def ensure_incremental_state_schema(conn):
+    """Cria a tabela dos estados do cálculo incremental (um por ativo e período)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS estados_incrementais (
+            ativo TEXT NOT NULL,
+            periodo INTEGER NOT NULL,
+            estado TEXT NOT NULL,
+            PRIMARY KEY (ativo, periodo)
+        ) WITHOUT ROWID
+    ''')
+    conn.commit()
+
+
+def load_incremental_states(conn):
+    """Lê os estados incrementais salvos: linhas (ativo, período, estado como dicionário)"""
+    rows = conn.execute("SELECT ativo, periodo, estado FROM estados_incrementais").fetchall()
+    return [(ativo, periodo, json.loads(estado)) for ativo, periodo, estado in rows]
+
+
+def save_incremental_states(conn, rows):
+    """Substitui os estados incrementais salvos por rows [(ativo, período, estado como dicionário)]"""
+    conn.execute("DELETE FROM estados_incrementais")
+    conn.executemany(
+        "INSERT INTO estados_incrementais (ativo, periodo, estado) VALUES (?, ?, ?)",
+        [(ativo, periodo, json.dumps(estado)) for ativo, periodo, estado in rows]
+    )
+
+
+def delete_incremental_states(conn, ativos=None):
+    """Descarta os estados incrementais dos ativos informados (ou de todos)"""
+    if ativos is None:
+        conn.execute("DELETE FROM estados_incrementais")
+    else:
+        conn.executemany("DELETE FROM estados_incrementais WHERE ativo = ?", [(ativo,) for ativo in ativos])
+
+
+def _parse_date(valor):
+    """Converte datas do banco (número do dia ou texto ISO) para date"""
+    if valor is None or isinstance(valor, date):
+        return valor
+    if isinstance(valor, (int, np.integer)):
+        return day_to_date(valor)
+    return datetime.strptime(valor, '%Y-%m-%d').date()
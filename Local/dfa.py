@@ -0,0 +1,114 @@
+"""
+Detrended Fluctuation Analysis (DFA) vetorizada em NumPy.
+
+Reproduz nolds.dfa com os parâmetros padrão (janelas sobrepostas, tendência linear,
+ajuste final por mínimos quadrados), mas calcula todas as janelas de uma escala de
+uma vez: o perfil integrado é reorganizado em uma matriz (séries x janelas x pontos)
+e a reta de cada janela sai da solução fechada dos mínimos quadrados.
+Várias séries do mesmo tamanho são processadas juntas.
+
+Tolerância: diferença absoluta até 1e-8 em relação a nolds.dfa(series, fit_exp='poly'),
+que é o comportamento de nolds sem scikit-learn instalado. Com scikit-learn, nolds usa
+RANSAC no ajuste final e os resultados podem diferir (veja benchmark_dfa.py).
+"""
+import numpy as np
+
+# Máximo de séries empilhadas por vez (limita a memória das matrizes de janelas). Com
+# 8 a 16 séries a pilha ainda cabe no cache; com 64 séries de 10 anos o lote fica mais
+# lento que as séries uma a uma (benchmark_dfa.py)
+MAX_SERIES_POR_LOTE = 16
+
+
+def logarithmic_n(min_n, max_n, factor):
+    """min_n, min_n*factor, min_n*factor², ... < max_n, arredondados para baixo e sem repetição"""
+    max_i = int(np.floor(np.log(1.0 * max_n / min_n) / np.log(factor)))
+    ns = [min_n]
+    for i in range(max_i + 1):
+        n = int(np.floor(min_n * (factor ** i)))
+        if n > ns[-1]:
+            ns.append(n)
+    return ns
+
+
+def dfa_nvals(total_n):
+    """Tamanhos de janela padrão de nolds.dfa para uma série de total_n pontos"""
+    if total_n > 70:
+        return logarithmic_n(4, 0.1 * total_n, 1.2)
+    if total_n > 10:
+        return [4, 5, 6, 7, 8, 9]
+    return [total_n - 2, total_n - 1]
+
+
+def fluctuations(walks, n):
+    """
+    Flutuação F(n) de cada perfil integrado (linhas de walks) para janelas de n pontos.
+
+    As janelas avançam n//2 pontos (sobreposição de 50%). Em cada janela a reta é
+    ajustada pela forma fechada slope = Σ(x-x̄)(d-d̄) / Σ(x-x̄)².
+    """
+    total_n = walks.shape[1]
+    inicios = np.arange(0, total_n - n, n // 2)
+    segmentos = walks[:, inicios[:, None] + np.arange(n)]  # (séries, janelas, n)
+
+    x = np.arange(n) - (n - 1) / 2.0
+    centrados = segmentos - segmentos.mean(axis=2, keepdims=True)
+    slopes = centrados @ x / np.dot(x, x)
+    residuos = centrados - slopes[..., None] * x
+
+    flucs = np.einsum('ijk,ijk->ij', residuos, residuos) / n
+    return np.sqrt(flucs.mean(axis=1))
+
+
+def fit_exponents(nvals, flucs):
+    """Inclinação de log F(n) contra log n para cada linha de flucs (F = 0 é descartado)"""
+    log_n = np.log(np.asarray(nvals, dtype=np.float64))
+    expoentes = np.full(flucs.shape[0], np.nan)
+
+    validas = np.all(flucs > 0, axis=1)
+    if validas.any():
+        log_f = np.log(flucs[validas])
+        x = log_n - log_n.mean()
+        expoentes[validas] = (log_f - log_f.mean(axis=1, keepdims=True)) @ x / np.dot(x, x)
+
+    # Linhas com flutuação nula em alguma escala: ajuste só com as escalas restantes
+    for i in np.flatnonzero(~validas):
+        nao_nulas = flucs[i] > 0
+        if nao_nulas.sum() >= 2:
+            expoentes[i] = np.polyfit(log_n[nao_nulas], np.log(flucs[i, nao_nulas]), 1)[0]
+    return expoentes
+
+
+def dfa_batch(series_list, nvals=None):
+    """
+    Expoente DFA de cada série da lista; retorna um array na mesma ordem.
+
+    Séries de mesmo tamanho são empilhadas e processadas juntas. nvals (tamanhos de
+    janela) segue o padrão de nolds quando não informado.
+    """
+    series_list = [np.asarray(s, dtype=np.float64) for s in series_list]
+    expoentes = np.full(len(series_list), np.nan)
+
+    por_tamanho = {}
+    for i, s in enumerate(series_list):
+        por_tamanho.setdefault(len(s), []).append(i)
+
+    for total_n, indices in por_tamanho.items():
+        escalas = list(nvals) if nvals is not None else dfa_nvals(total_n)
+        if len(escalas) < 2:
+            raise ValueError("São necessários ao menos dois tamanhos de janela (nvals)")
+        if min(escalas) < 2 or max(escalas) >= total_n:
+            raise ValueError(f"nvals inválidos para uma série de {total_n} pontos: {escalas}")
+
+        for inicio in range(0, len(indices), MAX_SERIES_POR_LOTE):
+            lote = indices[inicio:inicio + MAX_SERIES_POR_LOTE]
+            dados = np.vstack([series_list[i] for i in lote])
+            # Perfil integrado (soma acumulada dos desvios em relação à média)
+            walks = np.cumsum(dados - dados.mean(axis=1, keepdims=True), axis=1)
+            flucs = np.column_stack([fluctuations(walks, n) for n in escalas])
+            expoentes[lote] = fit_exponents(escalas, flucs)
+    return expoentes
+
+
+def dfa(series, nvals=None):
+    """Expoente DFA de uma única série"""
+    return dfa_batch([series], nvals)[0]
@@ -0,0 +1,298 @@
+import threading
+import time
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import pandas as pd
+
+# Tamanho estimado de uma linha da API, usado quando nenhuma linha foi recebida no run
+BYTES_POR_LINHA_ESTIMADO = 120
+
+
+class RateLimiter:
+    """Limita a taxa de requisições (requisições por segundo) entre várias threads"""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1.0 / requests_per_second if requests_per_second and requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        """Bloqueia até que a próxima requisição seja permitida"""
+        if self.interval <= 0:
+            return
+        with self._lock:
+            agora = time.monotonic()
+            slot = max(self._next_slot, agora)
+            self._next_slot = slot + self.interval
+        espera = slot - agora
+        if espera > 0:
+            time.sleep(espera)
+
+
+class DownloadEngine:
+    """
+    Motor de download concorrente das cotações da tabela QDL/BITFINEX.
+
+    As requisições são feitas por um pool limitado de threads, respeitando o limite
+    de requisições por segundo. Os resultados voltam para a thread que chamou run(),
+    que é a única a chamar o writer (e portanto a única a escrever no banco).
+    """
+
+    def __init__(self, get_table=None, max_workers=8, requests_per_second=5.0, datatable='QDL/BITFINEX',
+                 full_history=False, batch_size=0, rejected_filter_errors=None, retryable_errors=None,
+                 retries=2, retry_delay=1.0):
+        if get_table is None:
+            import nasdaqdatalink
+            import requests
+            from nasdaqdatalink.errors.data_link_error import (
+                InvalidRequestError, LimitExceededError, InternalServerError, ServiceUnavailableError)
+            get_table = nasdaqdatalink.get_table
+            if rejected_filter_errors is None:
+                # HTTP 400: a API recusou a consulta (filtro de data não suportado)
+                rejected_filter_errors = (InvalidRequestError,)
+            if retryable_errors is None:
+                retryable_errors = (LimitExceededError, InternalServerError, ServiceUnavailableError,
+                                    requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        self.get_table = get_table
+        self.max_workers = max(1, int(max_workers))
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.datatable = datatable
+        # Modo histórico completo: ignora o filtro de data no servidor
+        self.full_history = full_history
+        # Quantidade de códigos por requisição (0 ou 1 desativa o modo em lote)
+        self.batch_size = max(0, int(batch_size))
+        # Erros em que a API recusa o filtro de data (única situação que baixa o histórico completo)
+        self.rejected_filter_errors = tuple(rejected_filter_errors or ())
+        # Erros transitórios: a consulta filtrada é repetida até retries vezes
+        self.retryable_errors = tuple(retryable_errors or ())
+        self.retries = max(0, int(retries))
+        self.retry_delay = retry_delay
+
+    def request_table(self, **kwargs):
+        """Faz uma chamada à API respeitando o limite de requisições"""
+        self.rate_limiter.acquire()
+        return self.get_table(self.datatable, paginate=True, **kwargs)
+
+    @staticmethod
+    def normalize_frame(df_raw, crypto_code):
+        """Converte o retorno da API para o formato ['Data', <código>] ordenado por data"""
+        # Verificar se a coluna de data existe
+        date_column = 'date' if 'date' in df_raw.columns else 'Date'
+
+        # Selecionar colunas relevantes
+        df_crypto = df_raw[[date_column, 'mid']].copy()
+        df_crypto.columns = ['Data', crypto_code]
+
+        # Converter datas e ordenar
+        df_crypto['Data'] = pd.to_datetime(df_crypto['Data'])
+        df_crypto.sort_values('Data', inplace=True)
+        return df_crypto
+
+    def request_since(self, code, last_date=None):
+        """
+        Requisita um código (ou lista de códigos) a partir do dia seguinte a last_date.
+
+        No modo incremental o limite inferior de data é enviado à API (date.gte), de modo
+        que só as barras novas são transferidas. O histórico completo só é baixado no modo
+        full_history, sem last_date, ou quando a API recusa o próprio filtro de data; erros
+        transitórios repetem a consulta filtrada e os demais são propagados.
+        Retorna (df_raw, filtrado_no_servidor).
+        """
+        if self.full_history or not last_date:
+            return self.request_table(code=code), False
+
+        filtro = {'gte': (last_date + timedelta(days=1)).strftime('%Y-%m-%d')}
+        for tentativa in range(self.retries + 1):
+            try:
+                return self.request_table(code=code, date=filtro), True
+            except self.rejected_filter_errors as e:
+                print(f"API recusou o filtro de data para {code}, buscando histórico completo: {str(e)}")
+                return self.request_table(code=code), False
+            except self.retryable_errors as e:
+                if tentativa == self.retries:
+                    raise
+                espera = self.retry_delay * 2 ** tentativa
+                print(f"Falha temporária em {code}, nova tentativa em {espera:.1f}s: {str(e)}")
+                time.sleep(espera)
+
+    def download_symbol(self, crypto_code, last_date=None):
+        """
+        Busca as cotações de um ativo posteriores a last_date.
+
+        Retorna (df, linhas_recebidas, bytes_recebidos, filtrado_no_servidor).
+        """
+        df_raw, filtrado = self.request_since(crypto_code, last_date)
+
+        linhas_recebidas = len(df_raw)
+        bytes_recebidos = int(df_raw.memory_usage(index=True, deep=True).sum())
+        df_crypto = self.normalize_frame(df_raw, crypto_code)
+
+        # Filtrar apenas dados mais recentes que o último salvo (se houver dados salvos)
+        if last_date:
+            df_crypto = df_crypto[df_crypto['Data'].dt.date > last_date]
+        return df_crypto, linhas_recebidas, bytes_recebidos, filtrado
+
+    def download_batch(self, codes, last_dates):
+        """
+        Busca vários códigos em uma única requisição e separa o resultado por 'code'.
+
+        O limite de data enviado à API é o menor entre os códigos do lote (nenhum, se
+        algum código ainda não tiver dados salvos); cada fatia é depois filtrada pela
+        sua própria última data. Retorna ({codigo: df}, linhas_recebidas,
+        bytes_recebidos, filtrado_no_servidor).
+        """
+        datas = [last_dates.get(code) for code in codes]
+        last_date = None if any(d is None for d in datas) else min(datas)
+        df_raw, filtrado = self.request_since(list(codes), last_date)
+
+        linhas_recebidas = len(df_raw)
+        bytes_recebidos = int(df_raw.memory_usage(index=True, deep=True).sum())
+        if df_raw.empty:
+            return {}, linhas_recebidas, bytes_recebidos, filtrado
+        if 'code' not in df_raw.columns:
+            raise ValueError("Resposta em lote sem a coluna 'code'")
+
+        resultados = {}
+        solicitados = set(codes)
+        for code, df_code in df_raw.groupby('code', sort=False):
+            if code not in solicitados:
+                continue
+            df_crypto = self.normalize_frame(df_code, code)
+            if last_dates.get(code):
+                df_crypto = df_crypto[df_crypto['Data'].dt.date > last_dates[code]]
+            resultados[code] = df_crypto
+        return resultados, linhas_recebidas, bytes_recebidos, filtrado
+
+    def make_batches(self, codes, last_dates):
+        """Divide os códigos em lotes, agrupando códigos com últimas datas próximas"""
+        ordenados = sorted(codes, key=lambda c: (last_dates.get(c) is not None, last_dates.get(c) or 0))
+        return [ordenados[i:i + self.batch_size] for i in range(0, len(ordenados), self.batch_size)]
+
+    def fetch_symbol(self, crypto_code, last_date=None):
+        """Busca as cotações de um ativo, mantendo apenas datas posteriores a last_date"""
+        return self.download_symbol(crypto_code, last_date)[0]
+
+    def run(self, codes, writer, last_dates=None, progress_callback=None, known_rows=None, cancel_event=None):
+        """
+        Baixa todos os códigos em paralelo e entrega cada resultado ao writer.
+
+        Com batch_size > 1 os códigos são pedidos em lotes; um lote que falha é refeito com
+        uma requisição por código, assim como os códigos ausentes de uma resposta sem
+        filtro de data. Se cancel_event
+        for sinalizado, as requisições ainda não iniciadas são descartadas.
+
+        writer(codigo, df) e progress_callback(concluidos, total, codigo) são sempre
+        chamados na thread que executa run(). known_rows ({codigo: linhas já salvas})
+        é usado para estimar quantas linhas e bytes o filtro de data deixou de transferir.
+        Retorna um dicionário com estatísticas.
+        """
+        last_dates = last_dates or {}
+        known_rows = known_rows or {}
+        total = len(codes)
+        stats = {'total': total, 'sucesso': 0, 'falhas': 0, 'linhas': 0, 'erros': {}, 'requisicoes': 0,
+                 'cancelado': False,
+                 'linhas_recebidas': 0, 'bytes_recebidos': 0,
+                 'linhas_economizadas': 0, 'bytes_economizados': 0}
+        inicio = time.monotonic()
+
+        concluidos = 0
+
+        def entregar(code, df_crypto):
+            nonlocal concluidos
+            if df_crypto is not None and not df_crypto.empty:
+                writer(code, df_crypto)
+                stats['linhas'] += len(df_crypto)
+            stats['sucesso'] += 1
+            concluidos += 1
+            if progress_callback is not None:
+                progress_callback(concluidos, total, code)
+
+        def registrar_falha(code, erro):
+            nonlocal concluidos
+            # Continua mesmo se uma falhar
+            print(f"Erro em {code}: {str(erro)}")
+            stats['falhas'] += 1
+            stats['erros'][code] = str(erro)
+            concluidos += 1
+            if progress_callback is not None:
+                progress_callback(concluidos, total, code)
+
+        def contabilizar(codes_requisitados, linhas_recebidas, bytes_recebidos, filtrado):
+            stats['requisicoes'] += 1
+            stats['linhas_recebidas'] += linhas_recebidas
+            stats['bytes_recebidos'] += bytes_recebidos
+            if filtrado:
+                # Linhas já salvas que o histórico completo teria trazido de novo
+                stats['linhas_economizadas'] += sum(known_rows.get(c, 0) for c in codes_requisitados)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pendentes = {}
+
+            def enviar_individual(code):
+                future = executor.submit(self.download_symbol, code, last_dates.get(code))
+                pendentes[future] = ('individual', [code])
+
+            if self.batch_size > 1:
+                for lote in self.make_batches(codes, last_dates):
+                    pendentes[executor.submit(self.download_batch, lote, last_dates)] = ('lote', lote)
+            else:
+                for code in codes:
+                    enviar_individual(code)
+
+            while pendentes:
+                if cancel_event is not None and cancel_event.is_set():
+                    for future in pendentes:
+                        future.cancel()
+                    stats['cancelado'] = True
+                    print("Download cancelado")
+                    break
+                finalizados, _ = wait(pendentes, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in finalizados:
+                    tipo, lote = pendentes.pop(future)
+                    try:
+                        resultado = future.result()
+                    except Exception as e:
+                        if tipo == 'lote':
+                            # Lote com falha: refazer código a código
+                            print(f"Lote de {len(lote)} códigos falhou, buscando individualmente: {str(e)}")
+                            for code in lote:
+                                enviar_individual(code)
+                        else:
+                            registrar_falha(lote[0], e)
+                        continue
+
+                    if tipo == 'individual':
+                        df_crypto, linhas_recebidas, bytes_recebidos, filtrado = resultado
+                        contabilizar(lote, linhas_recebidas, bytes_recebidos, filtrado)
+                        entregar(lote[0], df_crypto)
+                        continue
+
+                    frames, linhas_recebidas, bytes_recebidos, filtrado = resultado
+                    contabilizar(lote, linhas_recebidas, bytes_recebidos, filtrado)
+                    # Sem filtro de data, todo código pedido deve vir na resposta: os ausentes
+                    # (lote vazio, código descartado pela API ou inválido) são refeitos um a um.
+                    # Com filtro de data, ausente significa apenas que não há barras novas
+                    if not filtrado:
+                        ausentes = [code for code in lote if code not in frames]
+                        if ausentes:
+                            print(f"Lote de {len(lote)} códigos sem dados de {len(ausentes)}, "
+                                  f"buscando individualmente")
+                        for code in ausentes:
+                            enviar_individual(code)
+                        lote = [code for code in lote if code in frames]
+                    for code in lote:
+                        entregar(code, frames.get(code))
+
+        stats['tempo'] = time.monotonic() - inicio
+        if stats['linhas_recebidas']:
+            bytes_por_linha = stats['bytes_recebidos'] / stats['linhas_recebidas']
+        else:
+            bytes_por_linha = BYTES_POR_LINHA_ESTIMADO
+        stats['bytes_economizados'] = int(stats['linhas_economizadas'] * bytes_por_linha)
+        print(f"Download concluído: {stats['sucesso']}/{total} ativos, {stats['linhas']} linhas "
+              f"em {stats['tempo']:.1f}s ({self.max_workers} workers, {stats['requisicoes']} requisições)")
+        print(f"Recebido: {stats['linhas_recebidas']} linhas ({stats['bytes_recebidos'] / 1024:.1f} KB) | "
+              f"Economizado pelo filtro de data: ~{stats['linhas_economizadas']} linhas "
+              f"(~{stats['bytes_economizados'] / 1024:.1f} KB)")
+        return stats
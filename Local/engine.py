@@ -0,0 +1,1965 @@
+"""
+Motor de cálculo dos indicadores (Índice Melão, Sharpe, MDD, Hurst, Mayer, correlação).
+
+Módulo sem dependência de interface gráfica: recebe a matriz de preços no formato de
+df_cotacoes (coluna 'Data' + uma coluna por ativo) e devolve resultados numéricos.
+Pode ser usado pelo aplicativo, por jobs em lote, processos de trabalho e benchmarks.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import timedelta
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+import dfa
+
+PERIODOS = [10, 8, 5, 3, 2, 1]
+
+TAXA_LIVRE_RISCO = 0.10  # 10% ao ano
+
+QUALIDADE_PADRAO = {
+    'max_dias_atraso': 7,           # Máximo de dias de atraso permitido
+    'min_cobertura_ultimo_ano': 0.8, # Mínimo 80% de cobertura no último ano
+    'max_lacuna_consecutiva': 10,    # Máximo de dias consecutivos sem dados
+    'min_dias_disponiveis': 200,     # Mínimo de dias disponíveis no último ano
+    'max_outliers_percent': 0.05     # Máximo 5% de outliers permitidos
+}
+
+# Campos que identificam cada linha de resultado (os demais vêm do registro de indicadores)
+CAMPOS_FIXOS = ('ativo', 'periodo')
+
+
+def calculate_hurst_dfa(series):
+    """Calcula o expoente de Hurst usando Detrended Fluctuation Analysis (DFA) vetorizada"""
+    try:
+        return dfa.dfa(series)
+    except Exception as e:
+        print(f"Erro no cálculo DFA: {str(e)}")
+        return np.nan
+
+
+def calculate_hurst_dfa_batch(series_list):
+    """Expoentes de Hurst de várias séries em uma chamada a dfa.dfa_batch (mesmo tamanho = mesmo lote)"""
+    try:
+        return dfa.dfa_batch(series_list)
+    except Exception as e:
+        print(f"Erro no cálculo DFA em lote, calculando série a série: {str(e)}")
+        return np.array([calculate_hurst_dfa(s) for s in series_list])
+
+
+def calculate_mayer_multiple(precos):
+    """Calcula o Mayer Multiple (preço atual / média móvel de 200 dias)"""
+    try:
+        # Garantir que temos dados suficientes
+        if len(precos) < 200:
+            return float('nan')
+
+        # Média móvel de 200 dias no último ponto = média dos últimos 200 preços
+        ultima_ma200 = np.mean(precos[-200:])
+
+        # Calcular Mayer Multiple
+        return precos[-1] / ultima_ma200
+
+    except Exception as e:
+        print(f"Erro no cálculo do Mayer Multiple: {str(e)}")
+        return float('nan')
+
+
+def calculate_btc_correlation(log_precos, btc):
+    """
+    Calcula a correlação de Pearson entre os retornos de um ativo e os do BTCUSD.
+
+    log_precos é o log dos preços do ativo na janela e btc é o par (máscara dos dias com
+    cotação do BTCUSD, retornos do BTCUSD nesses dias) de SeriesView.btc_window().
+    """
+    try:
+        mascara, retornos_btc = btc
+
+        # Verificar se temos dados suficientes (mínimo 30 pontos para correlação confiável)
+        if mascara.sum() < 30 or len(retornos_btc) < 30:
+            return float('nan')
+
+        # Retornos do ativo nos mesmos dias (o BTCUSD não é preenchido)
+        retornos_ativo = np.diff(log_precos[mascara])
+
+        # Calcular correlação de Pearson entre os retornos
+        with np.errstate(invalid='ignore', divide='ignore'):
+            correlation = np.corrcoef(retornos_ativo, retornos_btc)[0, 1]
+
+        return correlation if not np.isnan(correlation) else float('nan')
+
+    except Exception as e:
+        print(f"Erro no cálculo da correlação BTCUSD: {str(e)}")
+        return float('nan')
+
+
+# Critérios da verificação de qualidade, na ordem em que são avaliados
+CRITERIOS_QUALIDADE = (
+    'atraso',            # 1. Dados atualizados até max_dias_atraso dias antes de data_final
+    'sem_dados',         #    Alguma cotação no último ano
+    'cobertura',         # 2. Cobertura do último ano (dias disponíveis / 252 dias úteis)
+    'lacuna',            # 3. Maior intervalo entre cotações consecutivas
+    'consistencia',      # 4. Ao menos 30 cotações para a análise de consistência
+    'outliers',          #    Fração de preços a mais de 5 desvios padrão da média
+    'dias_disponiveis',  # 5. Mínimo absoluto de dias com cotação
+)
+
+# Colunas da tabela de vereditos (além do índice com o código do ativo)
+COLUNAS_VEREDITO = ('valido', 'criterio', 'mensagem', 'dias_atraso', 'dias_disponiveis', 'cobertura',
+                    'max_lacuna', 'outliers')
+
+DIAS_UTEIS_ANO = 252
+
+
+def screen_quality_matrix(matriz, eixo, qualidade_config):
+    """
+    Verifica a qualidade dos dados do último ano de todas as colunas de uma vez.
+
+    matriz é (datas x ativos) no eixo de datas de eixo. Os cinco critérios são medidos
+    com operações sobre o array 2-D inteiro; retorna uma lista de vereditos (dicionários
+    com as chaves de COLUNAS_VEREDITO), um por coluna, ou None para colunas sem cotações.
+    """
+    fim = eixo.fim
+    inicio = eixo.inicio_ultimo_ano
+    validos = ~np.isnan(matriz[:fim])
+    tem_dados = validos.any(axis=0)
+
+    # Critério 1: dias entre a última cotação do ativo e data_final
+    ultimo = fim - 1 - np.argmax(validos[::-1], axis=0)
+    dias_atraso = eixo.dias[fim - 1] - eixo.dias[ultimo]
+
+    # Critério 2: cobertura no último ano
+    validos_ano = validos[inicio:]
+    dias_ano = eixo.dias[inicio:fim]
+    dias_disponiveis = validos_ano.sum(axis=0)
+    cobertura = dias_disponiveis / DIAS_UTEIS_ANO
+
+    # Critério 3: maior intervalo entre cotações consecutivas (dia da cotação válida anterior por linha)
+    sem_anterior = np.iinfo(np.int64).min
+    marcados = np.where(validos_ano, dias_ano[:, None], sem_anterior)
+    anterior = np.maximum.accumulate(marcados, axis=0)
+    if len(dias_ano) > 1:
+        intervalos = np.where(validos_ano[1:] & (anterior[:-1] != sem_anterior),
+                              dias_ano[1:, None] - anterior[:-1], 0)
+        max_lacuna = intervalos.max(axis=0)
+    else:
+        max_lacuna = np.zeros(matriz.shape[1], dtype=np.int64)
+
+    # Critério 4: preços a mais de 5 desvios padrão da média (desvio amostral)
+    precos_ano = matriz[inicio:fim]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.where(validos_ano, precos_ano, 0.0).sum(axis=0) / dias_disponiveis
+        desvios = np.where(validos_ano, precos_ano - media, 0.0)
+        std = np.sqrt((desvios * desvios).sum(axis=0) / (dias_disponiveis - 1))
+        outliers = ((precos_ano < media - 5*std) | (precos_ano > media + 5*std)).sum(axis=0)
+
+    vereditos = []
+    for j in range(matriz.shape[1]):
+        if not tem_dados[j]:
+            vereditos.append(None)
+            continue
+        atraso = int(dias_atraso[j])
+        disponiveis = int(dias_disponiveis[j])
+        lacuna = int(max_lacuna[j])
+        anomalos = int(outliers[j])
+
+        if atraso > qualidade_config['max_dias_atraso']:
+            criterio, mensagem = 'atraso', f"Dados desatualizados: {atraso} dias de atraso"
+        elif disponiveis == 0:
+            criterio, mensagem = 'sem_dados', "Sem dados no último ano"
+        elif cobertura[j] < qualidade_config['min_cobertura_ultimo_ano']:
+            criterio, mensagem = 'cobertura', (f"Cobertura insuficiente: {cobertura[j]:.1%} "
+                                               f"({disponiveis}/{DIAS_UTEIS_ANO} dias)")
+        elif lacuna > 5 and lacuna > qualidade_config['max_lacuna_consecutiva']:
+            criterio, mensagem = 'lacuna', f"Lacuna muito grande: {float(lacuna)} dias consecutivos sem dados"
+        elif disponiveis < 30:
+            criterio, mensagem = 'consistencia', "Dados insuficientes para análise de consistência"
+        elif anomalos > disponiveis * qualidade_config['max_outliers_percent']:
+            criterio, mensagem = 'outliers', f"Muitos valores anômalos: {anomalos} outliers detectados"
+        elif disponiveis < qualidade_config['min_dias_disponiveis']:
+            criterio, mensagem = 'dias_disponiveis', f"Dados insuficientes: apenas {disponiveis} dias disponíveis"
+        else:
+            criterio, mensagem = '', (f"Dados válidos: {cobertura[j]:.1%} de cobertura, {disponiveis} dias, "
+                                      f"{atraso} dias de atraso")
+
+        vereditos.append({
+            'valido': criterio == '',
+            'criterio': criterio,
+            'mensagem': mensagem,
+            'dias_atraso': atraso,
+            'dias_disponiveis': disponiveis,
+            'cobertura': float(cobertura[j]),
+            'max_lacuna': lacuna,
+            'outliers': anomalos
+        })
+    return vereditos
+
+
+class PeriodAxis:
+    """
+    Eixo de datas ordenado da matriz de preços e os deslocamentos dos períodos.
+
+    Os índices de início de cada período são calculados uma vez por execução (searchsorted),
+    de modo que cada (ativo, período) trabalha sobre uma fatia da coluna do ativo, sem cópia.
+    """
+
+    def __init__(self, df_cotacoes):
+        self.datas = df_cotacoes['Data'].to_numpy()
+        self.dias = self.datas.astype('datetime64[D]').astype(np.int64)
+        self.data_final = df_cotacoes['Data'].max()
+        self.fim = int(self.datas.searchsorted(np.datetime64(self.data_final), side='right'))
+        self.inicio_ultimo_ano = int(self.datas.searchsorted(
+            np.datetime64(self.data_final - timedelta(days=365)), side='left'))
+        self.inicios = {}
+        for periodo in PERIODOS:
+            data_inicio = self.data_final - timedelta(days=periodo*365)
+            self.inicios[periodo] = (data_inicio, int(self.datas.searchsorted(np.datetime64(data_inicio), side='left')))
+
+    @staticmethod
+    def sort_frame(df_cotacoes):
+        """Garante a coluna 'Data' em ordem crescente (copia só se estiver fora de ordem)"""
+        if df_cotacoes['Data'].is_monotonic_increasing:
+            return df_cotacoes
+        return df_cotacoes.sort_values('Data', kind='stable', ignore_index=True)
+
+    @staticmethod
+    def column(df_cotacoes, ativo):
+        """Coluna de preços de um ativo como array float64 (visão, quando possível)"""
+        return df_cotacoes[ativo].to_numpy(dtype=np.float64)
+
+
+class AssetSeries:
+    """
+    Intermediários de um ativo, calculados uma única vez e lidos por todos os indicadores.
+
+    preenchidos é a coluna com ffill(), log_precos o seu logaritmo e retornos o retorno
+    logarítmico diário (retornos[i] = log_precos[i] - log_precos[i-1]). As janelas seguem
+    ffill().bfill() da fatia: se começam em uma lacuna, os primeiros pontos recebem o
+    primeiro preço válido da janela (e têm retorno nulo).
+    """
+
+    def __init__(self, precos, fim):
+        self.fim = fim
+        self.preenchidos = forward_fill(precos[:fim])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.log_precos = np.log(self.preenchidos)
+        self.retornos = np.diff(self.log_precos, prepend=np.nan)
+
+        # Primeiro índice com preço válido a partir de cada posição (fim = nenhum)
+        indices = np.where(np.isnan(precos[:fim]), fim, np.arange(fim))
+        self.proximo_valido = np.minimum.accumulate(indices[::-1])[::-1]
+
+    def first_valid(self, inicio):
+        """Índice do primeiro preço válido da janela que começa em inicio (ou None)"""
+        if inicio >= self.fim:
+            return None
+        primeiro = int(self.proximo_valido[inicio])
+        return primeiro if primeiro < self.fim else None
+
+    def _window_of(self, valores, inicio):
+        # Fatia [inicio:fim] sem cópia; só uma janela que começa em lacuna é copiada e completada
+        primeiro = self.first_valid(inicio)
+        if primeiro is None:
+            return None
+        if primeiro == inicio:
+            return valores[inicio:self.fim]
+        resultado = valores[inicio:self.fim].copy()
+        resultado[:primeiro - inicio] = valores[primeiro]
+        return resultado
+
+    def window(self, inicio):
+        """Preços da janela [inicio:fim] com ffill().bfill()"""
+        return self._window_of(self.preenchidos, inicio)
+
+    def window_log(self, inicio):
+        """Log dos preços da janela [inicio:fim]"""
+        return self._window_of(self.log_precos, inicio)
+
+    def window_returns(self, inicio):
+        """Retornos logarítmicos diários da janela (um a menos que a quantidade de preços)"""
+        primeiro = self.first_valid(inicio)
+        if primeiro is None:
+            return None
+        if primeiro == inicio:
+            return self.retornos[inicio + 1:self.fim]
+        resultado = self.retornos[inicio + 1:self.fim].copy()
+        resultado[:primeiro - inicio] = 0.0
+        return resultado
+
+
+class SeriesView:
+    """
+    Intermediários de uma versão da matriz de preços, como lidos por uma execução.
+
+    Devolvida por SeriesCache.bind(): guarda a matriz, o eixo e os dicionários da versão
+    vigente no momento do bind. Trocas de versão no cache (replace_frame, invalidate,
+    bind com outra matriz) criam dicionários novos, de modo que uma execução em
+    andamento continua lendo intermediários coerentes com a sua matriz e o seu eixo.
+    """
+
+    def __init__(self, df_cotacoes, eixo, series, btc, lock):
+        self.df_cotacoes = df_cotacoes
+        self.eixo = eixo
+        self._series = series
+        self._btc = btc
+        self._lock = lock
+
+    def series(self, ativo):
+        """Intermediários do ativo, calculados na primeira consulta"""
+        with self._lock:
+            serie = self._series.get(ativo)
+        if serie is None:
+            serie = AssetSeries(PeriodAxis.column(self.df_cotacoes, ativo), self.eixo.fim)
+            with self._lock:
+                serie = self._series.setdefault(ativo, serie)
+        return serie
+
+    def btc_window(self, inicio):
+        """(máscara dos dias com cotação do BTCUSD, retornos do BTCUSD nesses dias) na janela, ou None"""
+        with self._lock:
+            if inicio in self._btc:
+                return self._btc[inicio]
+        if 'BTCUSD' not in self.df_cotacoes.columns:
+            janela = None
+        else:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                log_btc = np.log(PeriodAxis.column(self.df_cotacoes, 'BTCUSD')[inicio:self.eixo.fim])
+            mascara = ~np.isnan(log_btc)
+            janela = (mascara, np.diff(log_btc[mascara]))
+        with self._lock:
+            return self._btc.setdefault(inicio, janela)
+
+
+class SeriesCache:
+    """
+    Cache dos intermediários por ativo (AssetSeries) e dos retornos do BTCUSD por janela.
+
+    Os retornos do BTCUSD de cada período são calculados uma vez por execução e lidos na
+    correlação de todos os ativos. O cache vale para uma matriz de preços: bind() com
+    outra matriz descarta tudo, a não ser que quem alterou as cotações tenha informado
+    antes, por replace_frame(), quais ativos mudaram. invalidate() descarta entradas.
+
+    Pode ser compartilhado entre threads: bind() devolve uma SeriesView presa à versão
+    atual, e as trocas de versão nunca alteram os dicionários de uma view já entregue.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._df = None
+        self._dias = None
+        self._series = {}
+        self._btc = {}
+
+    def bind(self, df_cotacoes, eixo):
+        """
+        Associa o cache à matriz usada na execução (descartando o conteúdo se for outra)
+        e devolve a SeriesView que a execução deve usar até o fim.
+        """
+        with self._lock:
+            if df_cotacoes is not self._df:
+                self._series, self._btc = {}, {}
+                self._df = df_cotacoes
+                self._dias = eixo.dias
+            return SeriesView(df_cotacoes, eixo, self._series, self._btc, self._lock)
+
+    def replace_frame(self, df_novo, ativos_alterados):
+        """
+        Passa o cache para uma nova versão da matriz, descartando só os ativos alterados.
+
+        Se o eixo de datas mudou (datas novas), todos os deslocamentos mudam e o cache é
+        esvaziado.
+        """
+        dias_novos = df_novo['Data'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+        with self._lock:
+            if self._df is None:
+                return
+            if self._dias is None or not np.array_equal(dias_novos, self._dias):
+                self._series, self._btc = {}, {}
+                return
+            self._discard(ativos_alterados)
+            self._df = df_novo
+
+    def invalidate(self, ativos=None):
+        """Descarta os intermediários dos ativos informados (ou de todos)"""
+        with self._lock:
+            if ativos is None:
+                self._series, self._btc = {}, {}
+            else:
+                self._discard(ativos)
+
+    def _discard(self, ativos):
+        # Dicionários novos: as views entregues antes continuam com os antigos
+        ativos = set(ativos)
+        self._series = {ativo: serie for ativo, serie in self._series.items() if ativo not in ativos}
+        self._btc = {} if 'BTCUSD' in ativos else dict(self._btc)
+
+
+class NestedWindows:
+    """
+    Janelas aninhadas de um ativo: todas terminam em data_final e começam em pontos diferentes.
+
+    Guarda as somas acumuladas de x (dias), y (log do preço), x², xy, y² e dos retornos ao
+    quadrado, calculadas uma única vez por ativo a partir dos intermediários (AssetSeries);
+    a regressão log-linear (slope, intercepto, R²) e a média/desvio dos retornos de
+    qualquer janela saem em O(1) dessas somas.
+    """
+
+    def __init__(self, dias, serie):
+        fim = serie.fim
+        self.fim = fim
+        self.dias = dias
+        self.first_valid = serie.first_valid
+
+        # Referência no último ponto: mantém os termos pequenos e as somas estáveis
+        ultimo = fim - 1
+        self.dia_ref = dias[ultimo]
+        self.log_ref = serie.log_precos[ultimo] if fim > 0 else 0.0
+        x = (dias[:fim] - self.dia_ref).astype(np.float64)
+        y = serie.log_precos - self.log_ref
+        y[~np.isfinite(y)] = 0.0  # antes do primeiro preço: nunca entra em uma janela
+        retornos = np.where(np.isfinite(serie.retornos), serie.retornos, 0.0)
+        self.y = y
+
+        def acumulada(valores):
+            return np.concatenate(([0.0], np.cumsum(valores)))
+
+        self.soma_x = acumulada(x)
+        self.soma_xx = acumulada(x * x)
+        self.soma_y = acumulada(y)
+        self.soma_yy = acumulada(y * y)
+        self.soma_xy = acumulada(x * y)
+        self.soma_rr = acumulada(retornos * retornos)
+
+    def regression(self, inicio):
+        """Regressão de log(preço) contra os dias da janela: (slope, intercepto, R²) ou None"""
+        primeiro = self.first_valid(inicio)
+        n = self.fim - inicio
+        if primeiro is None or n < 2:
+            return None
+
+        # Somas da janela: trecho com preço próprio + lacuna inicial com o primeiro preço válido
+        lacuna = primeiro - inicio
+        y_lacuna = self.y[primeiro]
+        sx = self.soma_x[self.fim] - self.soma_x[inicio]
+        sxx = self.soma_xx[self.fim] - self.soma_xx[inicio]
+        sy = self.soma_y[self.fim] - self.soma_y[primeiro] + lacuna * y_lacuna
+        syy = self.soma_yy[self.fim] - self.soma_yy[primeiro] + lacuna * y_lacuna * y_lacuna
+        sxy = (self.soma_xy[self.fim] - self.soma_xy[primeiro]
+               + y_lacuna * (self.soma_x[primeiro] - self.soma_x[inicio]))
+
+        return regression_from_sums(n, sx, sxx, sy, syy, sxy, self.dia_ref - self.dias[inicio], self.log_ref)
+
+    def sharpe(self, inicio):
+        """Índice de Sharpe anualizado a partir dos retornos logarítmicos diários da janela"""
+        primeiro = self.first_valid(inicio)
+        m = self.fim - inicio - 1  # quantidade de retornos
+        if primeiro is None or m < 1:
+            return 0
+
+        # Retornos da lacuna inicial são nulos; a soma dos demais é telescópica
+        soma_r = self.y[self.fim - 1] - self.y[primeiro]
+        soma_rr = self.soma_rr[self.fim] - self.soma_rr[primeiro + 1]
+        media_retorno_diario = soma_r / m
+        media_quadrados = soma_rr / m
+        variancia = media_quadrados - media_retorno_diario * media_retorno_diario
+        return annualized_sharpe(media_retorno_diario, variancia, media_quadrados)
+
+
+def regression_from_sums(n, sx, sxx, sy, syy, sxy, desloc_x, desloc_y):
+    """
+    Regressão linear a partir das somas de x, x², y, y² e xy de n pontos: (slope, intercepto, R²) ou None.
+
+    x e y podem estar deslocados (referência no último ponto, por estabilidade); desloc_x
+    e desloc_y levam as médias de volta a dias desde o início da janela e ao log do preço.
+    """
+    sxx_c = sxx - sx * sx / n
+    sxy_c = sxy - sx * sy / n
+    syy_c = syy - sy * sy / n
+    if sxx_c <= 0:
+        return None
+
+    slope = sxy_c / sxx_c
+    # Intercepto com x em dias desde o início do período, como na regressão original
+    media_x = sx / n + desloc_x
+    media_y = sy / n + desloc_y
+    intercepto = media_y - slope * media_x
+    r_squared = (sxy_c * sxy_c) / (sxx_c * syy_c) if syy_c > 0 else 0
+    return slope, intercepto, min(r_squared, 1.0)
+
+
+def annualized_sharpe(media_retorno_diario, variancia, media_quadrados):
+    """Índice de Sharpe anualizado a partir da média e da variância dos retornos diários"""
+    # Variância no nível do erro de arredondamento (ex.: um único retorno) equivale a zero
+    std_retorno_diario = np.sqrt(variancia) if variancia > 1e-12 * media_quadrados else 0
+    # Ajustar para anual
+    if std_retorno_diario > 0:
+        return ((media_retorno_diario * 252) - TAXA_LIVRE_RISCO) / (std_retorno_diario * np.sqrt(252))
+    return 0
+
+
+def forward_fill(valores):
+    """ffill de um array 1-D (NaN iniciais permanecem NaN)"""
+    indices = np.where(np.isnan(valores), 0, np.arange(len(valores)))
+    np.maximum.accumulate(indices, out=indices)
+    return valores[indices]
+
+
+class ResultColumn:
+    """
+    Coluna de resultado: título na tabela/exportação e formatação do valor numérico
+    (valor * escala com casas decimais; casas None exibe o valor como texto + sufixo).
+    """
+
+    def __init__(self, campo, titulo, casas, escala=1, sufixo=''):
+        self.campo = campo
+        self.titulo = titulo
+        self.casas = casas
+        self.escala = escala
+        self.sufixo = sufixo
+
+    def format(self, valor):
+        """Texto exibido para o valor (NaN aparece como N/A)"""
+        if self.casas is None:
+            return f"{valor}{self.sufixo}"
+        if valor is None or np.isnan(valor):
+            return "N/A"
+        return f"{valor * self.escala:.{self.casas}f}"
+
+
+class Indicator:
+    """
+    Indicador registrado: calcula uma ou mais colunas de resultado de uma janela (ativo, período).
+
+    entradas são os nomes do que a função recebe, na ordem: intermediários da janela
+    (PeriodContext.ENTRADAS) ou colunas de outros indicadores, que passam a ser dependências.
+    calcular devolve um valor por coluna (um único valor se houver só uma coluna).
+    """
+
+    def __init__(self, nome, entradas, colunas, calcular):
+        self.nome = nome
+        self.entradas = tuple(entradas)
+        self.colunas = tuple(colunas)
+        self.calcular = calcular
+
+
+# Registro dos indicadores, na ordem das colunas da tabela. Indicadores novos devem ser
+# registrados na importação de um módulo, para existirem também nos processos de trabalho.
+INDICADORES = {}
+COLUNAS = {
+    'ativo': ResultColumn('ativo', "Ativo", None),
+    'periodo': ResultColumn('periodo', "Período", None, sufixo=" anos"),
+}
+
+
+def register_indicator(nome, entradas, colunas, calcular):
+    """Registra um indicador; colunas é uma lista de ResultColumn"""
+    for coluna in colunas:
+        if coluna.campo in COLUNAS:
+            raise ValueError(f"Coluna de resultado já registrada: {coluna.campo}")
+    for coluna in colunas:
+        COLUNAS[coluna.campo] = coluna
+    INDICADORES[nome] = Indicator(nome, entradas, [coluna.campo for coluna in colunas], calcular)
+    return INDICADORES[nome]
+
+
+def result_fields():
+    """Campos de cada linha de resultado, na ordem das colunas da tabela"""
+    return CAMPOS_FIXOS + tuple(campo for indicador in INDICADORES.values() for campo in indicador.colunas)
+
+
+def result_titles():
+    """Títulos das colunas de resultado (tabela e exportação)"""
+    return [COLUNAS[campo].titulo for campo in result_fields()]
+
+
+class ResultTable:
+    """
+    Resultados em colunas: 'ativo' (texto), 'periodo' (inteiro) e um array float64 por
+    indicador, com NaN onde não há valor. Filtros, ordenação e exportação trabalham sobre
+    os números; o texto da tabela só é gerado na exibição (format_row).
+    """
+
+    def __init__(self, linhas=(), campos=None):
+        self.campos = tuple(campos) if campos is not None else result_fields()
+        linhas = list(linhas)
+        valores = list(zip(*linhas)) if linhas else [()] * len(self.campos)
+        self.colunas = {}
+        for campo, coluna in zip(self.campos, valores):
+            if campo == 'ativo':
+                self.colunas[campo] = np.array(coluna, dtype=object)
+            elif campo == 'periodo':
+                self.colunas[campo] = np.array(coluna, dtype=np.int64)
+            else:
+                self.colunas[campo] = np.array(coluna, dtype=np.float64)
+        self._distintos = None
+
+    def __len__(self):
+        return len(self.colunas[self.campos[0]]) if self.campos else 0
+
+    def display_values(self, campo):
+        """Valores numéricos na unidade exibida (percentuais já multiplicados por 100)"""
+        escala = COLUNAS[campo].escala
+        return self.colunas[campo] * escala if escala != 1 else self.colunas[campo]
+
+    def filter_mask(self, limites=None, texto_ativo='', periodos=None):
+        """
+        Máscara booleana das linhas que passam nos filtros, calculada sobre as colunas inteiras.
+
+        limites é {campo: (mínimo, máximo)} na unidade exibida (None = sem limite; valores
+        N/A não são filtrados), texto_ativo um trecho do nome do ativo (sem diferenciar
+        maiúsculas) e periodos os períodos aceitos (None = todos).
+        """
+        mascara = np.ones(len(self), dtype=bool)
+        for campo, (minimo, maximo) in (limites or {}).items():
+            valores = self.display_values(campo)
+            if minimo is not None:
+                mascara &= ~(valores < minimo)
+            if maximo is not None:
+                mascara &= ~(valores > maximo)
+        if texto_ativo:
+            # O trecho é procurado uma vez por ativo distinto, não uma vez por linha
+            nomes, posicoes = self._ativos_distintos()
+            contem = np.array([texto_ativo.lower() in nome for nome in nomes], dtype=bool)
+            mascara &= contem[posicoes]
+        if periodos is not None:
+            mascara &= np.isin(self.colunas['periodo'], list(periodos))
+        return mascara
+
+    def _ativos_distintos(self):
+        """Nomes distintos dos ativos (em minúsculas) e a posição de cada linha entre eles"""
+        if self._distintos is None:
+            nomes, posicoes = np.unique(self.colunas['ativo'].astype(str), return_inverse=True)
+            self._distintos = ([nome.lower() for nome in nomes], posicoes)
+        return self._distintos
+
+    def format_row(self, indice):
+        """Textos de uma linha para a tabela"""
+        return [COLUNAS[campo].format(self.colunas[campo][indice]) for campo in self.campos]
+
+    def sort(self, indices, campo, decrescente=False):
+        """Reordena os índices de linha pelo campo (ordem estável; NaN sempre no fim)"""
+        indices = np.asarray(indices, dtype=np.int64)
+        valores = self.colunas[campo][indices]
+        if valores.dtype == object:
+            ordem = np.argsort(valores, kind='stable')
+            return indices[ordem[::-1] if decrescente else ordem]
+        if valores.dtype.kind == 'f':
+            com_valor = ~np.isnan(valores)
+            validos, valores = indices[com_valor], valores[com_valor]
+            ordem = np.argsort(-valores if decrescente else valores, kind='stable')
+            return np.concatenate([validos[ordem], indices[~com_valor]])
+        return indices[np.argsort(-valores if decrescente else valores, kind='stable')]
+
+    def to_frame(self, indices=None):
+        """DataFrame numérico para exportação: títulos da tabela, valores na unidade exibida e arredondados"""
+        dados = {}
+        for campo in self.campos:
+            coluna = COLUNAS[campo]
+            valores = self.colunas[campo] if indices is None else self.colunas[campo][indices]
+            if coluna.casas is not None:
+                valores = np.round(valores * coluna.escala, coluna.casas)
+            dados[coluna.titulo] = valores
+        return pd.DataFrame(dados)
+
+
+def plan_indicators(nomes=None):
+    """
+    Indicadores a executar, em ordem de dependência: os pedidos (todos, se nomes for None)
+    e os que calculam as colunas de que eles dependem.
+    """
+    produtor = {campo: indicador for indicador in INDICADORES.values() for campo in indicador.colunas}
+    pedidos = list(INDICADORES) if nomes is None else list(nomes)
+    plano, visitando = [], set()
+
+    def visitar(nome):
+        if nome not in INDICADORES:
+            raise ValueError(f"Indicador desconhecido: {nome}")
+        indicador = INDICADORES[nome]
+        if indicador in plano:
+            return
+        if nome in visitando:
+            raise ValueError(f"Dependência circular entre indicadores: {nome}")
+        visitando.add(nome)
+        for entrada in indicador.entradas:
+            if entrada in produtor:
+                visitar(produtor[entrada].nome)
+            elif entrada not in PeriodContext.ENTRADAS:
+                raise ValueError(f"Entrada desconhecida do indicador {nome}: {entrada}")
+        visitando.discard(nome)
+        plano.append(indicador)
+
+    for nome in pedidos:
+        visitar(nome)
+    return plano
+
+
+class PeriodContext:
+    """
+    Intermediários de uma janela (ativo, período), calculados uma única vez na primeira
+    vez que algum indicador os pede. Os intermediários do ativo (AssetSeries, NestedWindows)
+    também só são montados quando algum indicador precisa deles.
+    """
+
+    ENTRADAS = ('ativo', 'periodo', 'inicio', 'inflacao_acumulada', 'precos', 'log_precos', 'retornos',
+                'regressao', 'janelas', 'btc')
+
+    def __init__(self, ativo, periodo, inicio, series_cache, inflacao, serie=None, janelas=None):
+        self.valores = {
+            'ativo': ativo,
+            'periodo': periodo,
+            'inicio': inicio,
+            'inflacao_acumulada': inflacao[periodo],
+        }
+        self.serie = serie
+        self.janelas = janelas
+        self.series_cache = series_cache
+
+    def get(self, nome):
+        if nome not in self.valores:
+            inicio = self.valores['inicio']
+            if self.serie is None and nome in ('precos', 'log_precos', 'retornos', 'regressao', 'janelas'):
+                self.serie = self.series_cache.series(self.valores['ativo'])
+            if self.janelas is None and nome in ('regressao', 'janelas'):
+                self.janelas = NestedWindows(self.series_cache.eixo.dias, self.serie)
+            if nome == 'precos':
+                valor = self.serie.window(inicio)
+            elif nome == 'log_precos':
+                valor = self.serie.window_log(inicio)
+            elif nome == 'retornos':
+                valor = self.serie.window_returns(inicio)
+            elif nome == 'regressao':
+                valor = self.janelas.regression(inicio)
+            elif nome == 'janelas':
+                valor = self.janelas
+            elif nome == 'btc':
+                valor = None if self.valores['ativo'] == 'BTCUSD' else self.series_cache.btc_window(inicio)
+            else:
+                raise KeyError(nome)
+            self.valores[nome] = valor
+        return self.valores[nome]
+
+
+def _annual_return(slope):
+    # Rentabilidade anual média a partir do coeficiente da regressão log-linear
+    return np.exp(slope * 365) - 1
+
+
+def _max_drawdown(prices):
+    maximo = np.maximum.accumulate(prices)
+    drawdown = (prices / maximo) - 1
+    return abs(drawdown.min())
+
+
+def _annual_inflation(infl_acumulada, periodo):
+    # Converter inflação acumulada para anual média
+    return ((1 + infl_acumulada) ** (1 / periodo)) - 1
+
+
+def _melao_index(rentabilidade_anual, inflacao_anual, mdd_star, periodo):
+    numerador = np.log(1 + rentabilidade_anual) - np.log(1 + inflacao_anual)
+    denominador = np.log(1 + mdd_star) / np.sqrt(periodo)
+    if denominador == 0:
+        return 0
+    return numerador / denominador
+
+
+def _hurst_input(prices, returns):
+    # Mínimo de 100 pontos para um DFA confiável
+    if prices is None or returns is None or len(prices) <= 100:
+        return None
+    returns = returns[np.isfinite(returns)]  # Remover NaNs e infinitos
+    if len(returns) < 100:
+        return None
+    return returns
+
+
+def _hurst_from_returns(prices, returns):
+    entrada = _hurst_input(prices, returns)
+    return np.nan if entrada is None else calculate_hurst_dfa(entrada)
+
+
+def _btc_correlation(log_precos, btc):
+    if btc is None:
+        return float('nan')
+    return calculate_btc_correlation(log_precos, btc)
+
+
+register_indicator('rentabilidade_anual', ('slope',),
+                   [ResultColumn('rentabilidade_anual', "Rentabilidade Anual (%)", 2, 100)], _annual_return)
+register_indicator('mdd', ('precos',), [ResultColumn('mdd', "MDD (%)", 2, 100)], _max_drawdown)
+register_indicator('mdd_star', ('mdd',), [ResultColumn('mdd_star', "MDD*", 4)],
+                   lambda mdd_abs: mdd_abs / (1 - mdd_abs))
+register_indicator('indice_melao', ('rentabilidade_anual', 'inflacao_anual', 'mdd_star', 'periodo'),
+                   [ResultColumn('indice_melao', "Índice Melão", 4)], _melao_index)
+register_indicator('sharpe', ('janelas', 'inicio'), [ResultColumn('sharpe', "Índice de Sharpe", 4)],
+                   lambda janelas, inicio: janelas.sharpe(inicio))
+register_indicator('inflacao_anual', ('inflacao_acumulada', 'periodo'),
+                   [ResultColumn('inflacao_anual', "Inflação Anual (%)", 2, 100)], _annual_inflation)
+register_indicator('slope', ('regressao',), [ResultColumn('slope', "Slope", 6)], lambda regressao: regressao[0])
+register_indicator('r_squared', ('regressao',), [ResultColumn('r_squared', "R²", 4)],
+                   lambda regressao: regressao[2])
+register_indicator('hurst_dfa', ('precos', 'retornos'), [ResultColumn('hurst_dfa', "Hurst (DFA)", 4)],
+                   _hurst_from_returns)
+register_indicator('mayer_multiple', ('precos',), [ResultColumn('mayer_multiple', "Mayer Multiple", 4)],
+                   calculate_mayer_multiple)
+register_indicator('correlacao_btc', ('log_precos', 'btc'),
+                   [ResultColumn('correlacao_btc', "Correlação BTCUSD", 4)], _btc_correlation)
+
+
+def calculate_asset_periods(eixo, ativo, series_cache, inflacao, min_data_ativo, plano, hurst=None):
+    """
+    Calcula os indicadores do plano (plan_indicators) para cada período do ativo.
+
+    Retorna as linhas de resultado na ordem de result_fields(); colunas de indicadores
+    fora do plano ficam NaN. Uma janela sem regressão possível não gera linha. hurst
+    ({(ativo, período): valor}, de batch_hurst) traz o Hurst já calculado em lote.
+    """
+    resultados = []
+    campos = result_fields()
+    serie = series_cache.series(ativo)
+    janelas = NestedWindows(eixo.dias, serie)
+    for periodo in PERIODOS:
+        data_inicio, inicio = eixo.inicios[periodo]
+
+        if min_data_ativo > data_inicio:
+            continue
+
+        contexto = PeriodContext(ativo, periodo, inicio, series_cache, inflacao, serie, janelas)
+        if contexto.get('precos') is None or contexto.get('regressao') is None:
+            continue
+
+        prontos = None if hurst is None else {'hurst_dfa': hurst.get((ativo, periodo), np.nan)}
+        resultados.append(evaluate_indicators(plano, contexto, campos, prontos))
+    return resultados
+
+
+def evaluate_indicators(plano, contexto, campos, prontos=None):
+    """
+    Executa os indicadores do plano sobre uma janela e devolve a linha de resultado.
+
+    prontos são colunas já calculadas por outro meio (ex.: estado incremental); os
+    indicadores que as produzem não são executados.
+    """
+    ativo = contexto.get('ativo')
+    linha = dict.fromkeys(campos, np.nan)
+    linha['ativo'] = ativo
+    linha['periodo'] = contexto.get('periodo')
+    prontos = prontos or {}
+    linha.update(prontos)
+    for indicador in plano:
+        if all(coluna in prontos for coluna in indicador.colunas):
+            continue
+        argumentos = [linha[e] if e in linha else contexto.get(e) for e in indicador.entradas]
+        try:
+            valores = indicador.calcular(*argumentos)
+        except Exception as e:
+            print(f"Erro cálculo {indicador.nome} {ativo}: {str(e)}")
+            valores = (np.nan,) * len(indicador.colunas)
+        if len(indicador.colunas) == 1:
+            valores = (valores,)
+        linha.update(zip(indicador.colunas, valores))
+    return tuple(linha[campo] for campo in campos)
+
+
+# Colunas da série histórica do Índice Melão (melao_history)
+HISTORICO_CAMPOS = ('indice_melao', 'rentabilidade_anual', 'slope', 'r_squared', 'mdd', 'sharpe')
+
+
+def _drawdown_segment(a, b):
+    """Junta os resumos (máximo, mínimo, drawdown máximo) de dois trechos consecutivos a e b"""
+    cruzado = abs(b[1] / a[0] - 1) if b[1] < a[0] else 0.0
+    return max(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2], cruzado)
+
+
+def sliding_max_drawdown(valores, inicios, fins):
+    """
+    Drawdown máximo de valores[inicios[k]:fins[k]] para cada k, com janelas que só avançam.
+
+    Fila de duas pilhas com o resumo (máximo, mínimo, drawdown máximo) de cada trecho: as
+    linhas entram na pilha de trás e saem pela da frente, que é remontada de uma vez quando
+    esvazia; cada linha é movida no máximo duas vezes (tempo amortizado constante por dia).
+    """
+    valores = [float(v) for v in valores]
+    resultado = np.full(len(inicios), np.nan)
+    frente = []          # resumos do topo (linha mais antiga) até o fim da pilha da frente
+    tras = []            # linhas da pilha de trás
+    resumo_tras = None
+    inicio_fila = fim_fila = 0
+    for k, (inicio, fim) in enumerate(zip(inicios, fins)):
+        if inicio >= fim:
+            continue
+        if inicio >= fim_fila:
+            # Janela sem interseção com a anterior: recomeçar a fila
+            frente, tras, resumo_tras = [], [], None
+            inicio_fila = fim_fila = inicio
+        for i in range(fim_fila, fim):
+            item = (valores[i], valores[i], 0.0)
+            tras.append(valores[i])
+            resumo_tras = item if resumo_tras is None else _drawdown_segment(resumo_tras, item)
+        fim_fila = fim
+        while inicio_fila < inicio:
+            if not frente:
+                resumo = None
+                for valor in reversed(tras):
+                    item = (valor, valor, 0.0)
+                    resumo = item if resumo is None else _drawdown_segment(item, resumo)
+                    frente.append(resumo)
+                tras, resumo_tras = [], None
+            frente.pop()
+            inicio_fila += 1
+        if frente and resumo_tras is not None:
+            resultado[k] = _drawdown_segment(frente[-1], resumo_tras)[2]
+        else:
+            resultado[k] = (frente[-1] if frente else resumo_tras)[2]
+    return resultado
+
+
+def melao_history(df_cotacoes, ativo, periodo, inflacao, anos=3, series_cache=None):
+    """
+    Série histórica do Índice Melão de um ativo: para cada dia dos últimos `anos` anos,
+    os indicadores da janela de `periodo` anos que termina naquele dia.
+
+    Cada janela é a mesma do cálculo de calculate_indexes com data_final naquele dia.
+    Regressão e Sharpe de todas as janelas saem juntos das somas acumuladas do ativo
+    (NestedWindows) e o drawdown máximo de sliding_max_drawdown(), em tempo linear no
+    tamanho do histórico. Retorna um DataFrame com 'Data' e HISTORICO_CAMPOS; dias em que
+    o ativo ainda não tinha `periodo` anos de cotações ficam NaN.
+    """
+    df_cotacoes = PeriodAxis.sort_frame(df_cotacoes)
+    eixo = PeriodAxis(df_cotacoes)
+    if series_cache is None:
+        series_cache = SeriesCache()
+    series_cache = series_cache.bind(df_cotacoes, eixo)
+    serie = series_cache.series(ativo)
+    janelas = NestedWindows(eixo.dias, serie)
+
+    # Dias finais das janelas e o início de cada uma (searchsorted, como em PeriodAxis)
+    dias = eixo.dias[:eixo.fim]
+    primeiro_dia = int(dias[-1]) - anos * 365
+    finais = np.arange(int(dias.searchsorted(primeiro_dia)), eixo.fim)
+    fins = finais + 1
+    inicios = dias.searchsorted(dias[finais] - periodo * 365)
+
+    primeiro_ativo = serie.first_valid(0)
+    validas = np.zeros(len(finais), dtype=bool)
+    if primeiro_ativo is not None:
+        validas = (dias[primeiro_ativo] <= dias[finais] - periodo * 365) & (fins - inicios >= 2)
+    primeiros = np.where(validas, serie.proximo_valido[np.minimum(inicios, eixo.fim - 1)], 0)
+    validas &= primeiros < finais
+    s, e, p = inicios[validas], fins[validas], primeiros[validas]
+
+    # Regressão log-linear de cada janela (lacuna inicial com o primeiro preço válido)
+    n = (e - s).astype(np.float64)
+    lacuna = p - s
+    y_lacuna = janelas.y[p]
+    sx = janelas.soma_x[e] - janelas.soma_x[s]
+    sxx = janelas.soma_xx[e] - janelas.soma_xx[s]
+    sy = janelas.soma_y[e] - janelas.soma_y[p] + lacuna * y_lacuna
+    syy = janelas.soma_yy[e] - janelas.soma_yy[p] + lacuna * y_lacuna * y_lacuna
+    sxy = janelas.soma_xy[e] - janelas.soma_xy[p] + y_lacuna * (janelas.soma_x[p] - janelas.soma_x[s])
+    sxx_c = sxx - sx * sx / n
+    sxy_c = sxy - sx * sy / n
+    syy_c = syy - sy * sy / n
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slope = np.where(sxx_c > 0, sxy_c / sxx_c, np.nan)
+        r_squared = np.minimum(np.where(syy_c > 0, (sxy_c * sxy_c) / (sxx_c * syy_c), 0.0), 1.0)
+
+        # Sharpe: média e variância dos retornos a partir das somas (retornos da lacuna são nulos)
+        m = n - 1
+        media = (janelas.y[e - 1] - janelas.y[p]) / m
+        media_quadrados = (janelas.soma_rr[e] - janelas.soma_rr[p + 1]) / m
+        variancia = media_quadrados - media * media
+        desvio = np.where(variancia > 1e-12 * media_quadrados, np.sqrt(np.maximum(variancia, 0)), 0.0)
+        sharpe = np.where(desvio > 0, ((media * 252) - TAXA_LIVRE_RISCO) / (desvio * np.sqrt(252)), 0.0)
+
+    mdd = sliding_max_drawdown(serie.preenchidos, p, e)
+
+    # Índice Melão com as mesmas fórmulas dos indicadores registrados
+    rentabilidade_anual = _annual_return(slope)
+    inflacao_anual = _annual_inflation(inflacao[periodo], periodo)
+    mdd_star = mdd / (1 - mdd)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        numerador = np.log(1 + rentabilidade_anual) - np.log(1 + inflacao_anual)
+        denominador = np.log(1 + mdd_star) / np.sqrt(periodo)
+        indice_melao = np.where(denominador == 0, 0.0, numerador / denominador)
+
+    historico = pd.DataFrame({'Data': eixo.datas[finais]})
+    valores = {'indice_melao': indice_melao, 'rentabilidade_anual': rentabilidade_anual, 'slope': slope,
+               'r_squared': r_squared, 'mdd': mdd, 'sharpe': sharpe}
+    for campo in HISTORICO_CAMPOS:
+        coluna = np.full(len(finais), np.nan)
+        # Janela sem regressão possível não gera resultado (como em calculate_indexes)
+        coluna[validas] = np.where(np.isnan(slope), np.nan, valores[campo])
+        historico[campo] = coluna
+    return historico
+
+
+# Mínimo de retornos em comum para uma correlação (o mesmo de calculate_btc_correlation)
+MIN_OBSERVACOES_CORRELACAO = 30
+
+
+def return_matrix(log_precos):
+    """
+    Retornos logarítmicos de cada coluna desde a sua cotação anterior na janela.
+
+    Equivale a dropna().diff() coluna a coluna: as linhas sem cotação (e a primeira
+    cotação de cada coluna) ficam NaN.
+    """
+    linhas = np.arange(len(log_precos))[:, None]
+    validos = ~np.isnan(log_precos)
+    anterior = np.where(validos, linhas, -1)
+    np.maximum.accumulate(anterior, axis=0, out=anterior)
+
+    retornos = np.full(log_precos.shape, np.nan)
+    if len(log_precos) < 2:
+        return retornos
+    anterior = anterior[:-1]
+    colunas = np.broadcast_to(np.arange(log_precos.shape[1]), anterior.shape)
+    com_anterior = validos[1:] & (anterior >= 0)
+    retornos[1:][com_anterior] = (log_precos[1:][com_anterior]
+                                   - log_precos[anterior[com_anterior], colunas[com_anterior]])
+    return retornos
+
+
+def pairwise_correlation(retornos, min_observacoes=MIN_OBSERVACOES_CORRELACAO):
+    """
+    Correlação de Pearson entre todas as colunas com observações pareadas completas.
+
+    Cada par usa só as linhas em que as duas colunas têm retorno. Com a máscara M (1 onde
+    há retorno) e Z (retornos com 0 nas lacunas), as somas de todos os pares saem de
+    produtos de matrizes: n = MᵀM, Σx = ZᵀM, Σx² = (Z²)ᵀM e Σxy = ZᵀZ.
+    Retorna (correlações, quantidade de observações de cada par).
+    """
+    mascara = ~np.isnan(retornos)
+    # Centrar cada coluna na própria média reduz o cancelamento nas somas (a correlação não muda)
+    contagem = mascara.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        media = np.where(contagem > 0, np.nansum(retornos, axis=0) / np.maximum(contagem, 1), 0.0)
+    z = np.where(mascara, retornos - media, 0.0)
+    m = mascara.astype(np.float64)
+
+    n = m.T @ m
+    sx = z.T @ m           # sx[i, j]: soma dos retornos de i nas linhas em que j também tem retorno
+    sxx = (z * z).T @ m
+    sxy = z.T @ z
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariancia = sxy - sx * sx.T / n
+        variancia_i = sxx - sx * sx / n
+        variancia_j = variancia_i.T
+        correlacoes = covariancia / np.sqrt(variancia_i * variancia_j)
+    invalidas = (n < min_observacoes) | (variancia_i <= 0) | (variancia_j <= 0)
+    correlacoes[invalidas] = np.nan
+    np.clip(correlacoes, -1.0, 1.0, out=correlacoes)
+    return correlacoes, n.astype(np.int64)
+
+
+class CorrelationMatrix:
+    """
+    Correlações entre os retornos diários de todos os ativos, uma matriz por período.
+
+    most_correlated() e least_correlated() devolvem os ativos de maior e de menor
+    correlação (a mais negativa) com um ativo.
+    """
+
+    def __init__(self, data_final, ativos, correlacoes, observacoes):
+        self.data_final = data_final
+        self.ativos = list(ativos)
+        self.posicao = {ativo: i for i, ativo in enumerate(self.ativos)}
+        self.correlacoes = correlacoes    # {período: matriz ativos x ativos}
+        self.observacoes = observacoes    # {período: retornos em comum de cada par}
+
+    def frame(self, periodo):
+        """Matriz de correlações do período como DataFrame (ativos nas linhas e colunas)"""
+        return pd.DataFrame(self.correlacoes[periodo], index=self.ativos, columns=self.ativos)
+
+    def _ranking(self, ativo, periodo, quantidade, maiores):
+        linha = self.correlacoes[periodo][self.posicao[ativo]]
+        candidatos = [j for j in np.flatnonzero(~np.isnan(linha)) if self.ativos[j] != ativo]
+        candidatos.sort(key=lambda j: linha[j], reverse=maiores)
+        return [(self.ativos[j], float(linha[j])) for j in candidatos[:quantidade]]
+
+    def most_correlated(self, ativo, periodo, quantidade=5):
+        """[(ativo, correlação)] dos mais correlacionados com ativo no período"""
+        return self._ranking(ativo, periodo, quantidade, True)
+
+    def least_correlated(self, ativo, periodo, quantidade=5):
+        """[(ativo, correlação)] dos menos correlacionados (correlação mais baixa) com ativo no período"""
+        return self._ranking(ativo, periodo, quantidade, False)
+
+
+def correlation_matrix(df_cotacoes, ativos=None, periodos=PERIODOS, min_observacoes=MIN_OBSERVACOES_CORRELACAO):
+    """
+    Calcula a matriz de correlações dos retornos de todos os ativos (ou dos informados)
+    em cada período, com as janelas de calculate_indexes.
+
+    Os retornos de cada ativo são contados desde a cotação anterior (return_matrix) e cada
+    par usa os dias em que os dois têm retorno. Para ativos cotados todos os dias, a
+    coluna do BTCUSD coincide com a correlação da tabela de resultados.
+    """
+    df_cotacoes = PeriodAxis.sort_frame(df_cotacoes)
+    eixo = PeriodAxis(df_cotacoes)
+    ativos = list(df_cotacoes.columns[1:]) if ativos is None else list(ativos)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_precos = np.log(df_cotacoes[ativos].to_numpy(dtype=np.float64)[:eixo.fim])
+
+    correlacoes, observacoes = {}, {}
+    for periodo in periodos:
+        _, inicio = eixo.inicios[periodo]
+        correlacoes[periodo], observacoes[periodo] = pairwise_correlation(
+            return_matrix(log_precos[inicio:]), min_observacoes)
+    return CorrelationMatrix(eixo.data_final, ativos, correlacoes, observacoes)
+
+
+class CorrelationCache:
+    """
+    Guarda a última matriz de correlações, válida enquanto data_final e os ativos não mudarem.
+
+    Cada invalidate() avança a geração do cache: uma matriz calculada (fora do lock) a
+    partir de cotações anteriores à invalidação é devolvida a quem pediu, mas não é guardada.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._matriz = None
+        self._geracao = 0
+
+    def get(self, df_cotacoes, ativos=None):
+        """Matriz de correlações de df_cotacoes, recalculada só se data_final ou os ativos mudaram"""
+        data_final = df_cotacoes['Data'].max()
+        lista = list(df_cotacoes.columns[1:]) if ativos is None else list(ativos)
+        chave = (data_final, lista)
+        with self._lock:
+            geracao = self._geracao
+            if self._matriz is not None and self._matriz[:2] == (geracao, chave):
+                return self._matriz[2]
+
+        matriz = correlation_matrix(df_cotacoes, lista)
+        with self._lock:
+            if self._geracao == geracao:
+                self._matriz = (geracao, chave, matriz)
+        return matriz
+
+    def invalidate(self):
+        """Descarta a matriz guardada (cotações alteradas sem mudar data_final)"""
+        with self._lock:
+            self._geracao += 1
+            self._matriz = None
+
+
+def quality_config_hash(qualidade_config):
+    """Hash curto e estável da configuração de qualidade (parte da chave do cache de vereditos)"""
+    normalizada = {chave: float(valor) for chave, valor in qualidade_config.items()}
+    return hashlib.sha1(json.dumps(normalizada, sort_keys=True).encode()).hexdigest()[:16]
+
+
+class QualityVerdictCache:
+    """
+    Cache dos vereditos de qualidade, chaveado por (ativo, data_final, hash da configuração).
+
+    Cada entrada guarda também a assinatura dos dados que o veredito examinou (último ano
+    do ativo e a sua data mais recente): se as cotações mudarem sem alterar data_final, a
+    assinatura não confere e o ativo é verificado de novo. A persistência fica com quem
+    usa o cache (load() com as linhas salvas e pending_rows() com as novas).
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(ativo, data_final, config_hash):
+        return ativo, str(data_final.date()), config_hash
+
+    def load(self, rows):
+        """Carrega linhas (ativo, data_final, config_hash, assinatura, veredito)"""
+        for ativo, data_final, config_hash, assinatura, veredito in rows:
+            self._entries[(ativo, data_final, config_hash)] = (assinatura, veredito)
+
+    def get(self, chave, assinatura):
+        """Retorna o veredito (dicionário) se houver um para a mesma assinatura"""
+        entrada = self._entries.get(chave)
+        if entrada is not None and entrada[0] == assinatura:
+            self.hits += 1
+            return entrada[1]
+        self.misses += 1
+        return None
+
+    def put(self, chave, assinatura, veredito):
+        self._entries[chave] = (assinatura, veredito)
+        self._pending[chave] = (assinatura, veredito)
+
+    def pending_rows(self):
+        """Vereditos calculados desde a última chamada, no formato aceito por load()"""
+        rows = [chave + entrada for chave, entrada in self._pending.items()]
+        self._pending = {}
+        return rows
+
+
+def quality_signature(eixo, precos):
+    """Assinatura das cotações examinadas pela verificação de qualidade de um ativo"""
+    validos = np.flatnonzero(~np.isnan(precos[:eixo.fim]))
+    if len(validos) == 0:
+        return None
+    inicio = eixo.inicio_ultimo_ano
+    assinatura = hashlib.blake2b(digest_size=16)
+    assinatura.update(np.int64(eixo.dias[validos[-1]]).tobytes())
+    assinatura.update(eixo.dias[inicio:eixo.fim].tobytes())
+    assinatura.update(np.ascontiguousarray(precos[inicio:eixo.fim]).tobytes())
+    return assinatura.hexdigest()
+
+
+def screen_assets(df_cotacoes, ativos, eixo, qualidade_config, quality_cache=None):
+    """
+    Verifica a qualidade de todos os ativos, com o BTCUSD avaliado uma única vez.
+
+    Os vereditos em quality_cache são reaproveitados e os demais ativos passam juntos por
+    screen_quality_matrix. Retorna a tabela de vereditos (DataFrame indexado pelo ativo,
+    com as colunas de COLUNAS_VEREDITO e 'situacao'), onde situacao é None (ativo sem
+    cotações), 'rejeitado', 'btc' (aprovado, mas rejeitado pela qualidade do BTCUSD)
+    ou 'aprovado'.
+    """
+    config_hash = quality_config_hash(qualidade_config)
+    verificar = list(ativos)
+    if 'BTCUSD' in df_cotacoes.columns and 'BTCUSD' not in verificar:
+        verificar.append('BTCUSD')
+
+    vereditos = {}
+    pendentes = []
+    for ativo in verificar:
+        assinatura = None
+        if quality_cache is not None:
+            assinatura = quality_signature(eixo, PeriodAxis.column(df_cotacoes, ativo))
+            chave = QualityVerdictCache.key(ativo, eixo.data_final, config_hash)
+            if assinatura is None:
+                vereditos[ativo] = None
+                continue
+            veredito = quality_cache.get(chave, assinatura)
+            if veredito is not None:
+                vereditos[ativo] = veredito
+                continue
+        pendentes.append((ativo, assinatura))
+
+    if pendentes:
+        matriz = df_cotacoes[[ativo for ativo, _ in pendentes]].to_numpy(dtype=np.float64)
+        for (ativo, assinatura), veredito in zip(pendentes, screen_quality_matrix(matriz, eixo, qualidade_config)):
+            vereditos[ativo] = veredito
+            if quality_cache is not None and veredito is not None:
+                quality_cache.put(QualityVerdictCache.key(ativo, eixo.data_final, config_hash), assinatura, veredito)
+
+    # VERIFICAÇÃO ESPECÍFICA PARA BTCUSD (necessário para correlação), compartilhada por todos
+    veredito_btc = vereditos.get('BTCUSD')
+    if veredito_btc is None:
+        motivo_btc = "BTCUSD não disponível"
+    elif not veredito_btc['valido']:
+        motivo_btc = f"BTCUSD insuficiente: {veredito_btc['mensagem']}"
+    else:
+        motivo_btc = None
+
+    linhas = []
+    for ativo in ativos:
+        veredito = vereditos[ativo]
+        if veredito is None:
+            linha = {coluna: None for coluna in COLUNAS_VEREDITO}
+            linha.update(valido=False, criterio='sem_cotacoes', mensagem="", situacao=None)
+        else:
+            linha = dict(veredito)
+            if not veredito['valido']:
+                linha['situacao'] = 'rejeitado'
+            elif ativo != 'BTCUSD' and motivo_btc is not None:
+                linha.update(situacao='btc', mensagem=motivo_btc)
+            else:
+                linha['situacao'] = 'aprovado'
+        linhas.append(linha)
+    return pd.DataFrame(linhas, index=pd.Index(list(ativos), name='ativo'),
+                        columns=list(COLUNAS_VEREDITO) + ['situacao'])
+
+
+def compute_asset(df_cotacoes, ativo, eixo, inflacao, series_cache, plano, hurst=None):
+    """Calcula os períodos de um ativo já aprovado na verificação de qualidade"""
+    primeiro = series_cache.series(ativo).first_valid(0)
+    if primeiro is None:
+        return []
+    min_data_ativo = df_cotacoes['Data'].iloc[primeiro]
+    return calculate_asset_periods(eixo, ativo, series_cache, inflacao, min_data_ativo, plano, hurst)
+
+
+# Ativos cujas janelas têm o Hurst calculado juntas (batch_hurst) no cálculo em série
+BLOCO_HURST_ATIVOS = 16
+
+
+def batch_hurst(plano, eixo, ativos, series_cache):
+    """
+    Hurst (DFA) de todas as janelas (ativo, período) dos ativos em uma chamada a
+    calculate_hurst_dfa_batch: janelas do mesmo período de ativos com histórico completo
+    têm o mesmo tamanho e são empilhadas. Retorna {(ativo, período): valor}, ou None se
+    o plano não inclui o Hurst.
+    """
+    if not any(indicador.nome == 'hurst_dfa' for indicador in plano):
+        return None
+    chaves, entradas = [], []
+    for ativo in ativos:
+        serie = series_cache.series(ativo)
+        primeiro = serie.first_valid(0)
+        if primeiro is None:
+            continue
+        for periodo in PERIODOS:
+            data_inicio, inicio = eixo.inicios[periodo]
+            # Mesma regra de calculate_asset_periods: o ativo precisa cobrir o período
+            if eixo.dias[primeiro] > np.datetime64(data_inicio, 'D').astype(np.int64):
+                continue
+            entrada = _hurst_input(serie.window(inicio), serie.window_returns(inicio))
+            if entrada is not None:
+                chaves.append((ativo, periodo))
+                entradas.append(entrada)
+    return dict(zip(chaves, calculate_hurst_dfa_batch(entradas)))
+
+
+# Sobrecarga fixa de iniciar um processo de trabalho (interpretador, imports e cópia da
+# matriz de preços), medida com benchmark_engine.py em uma matriz de 3650 dias
+SOBRECARGA_PROCESSO_S = 0.6
+
+# Ativos aprovados calculados em série antes de decidir pelos processos: o tempo deles
+# mede o custo por ativo do plano de indicadores atual nesta máquina
+AMOSTRA_CUSTO_ATIVOS = 8
+
+
+def parallel_pays_off(restantes, custo_ativo, max_workers):
+    """
+    Indica se distribuir restantes ativos (custo_ativo segundos cada, em série) entre
+    max_workers processos compensa a sobrecarga de iniciá-los.
+
+    Os processos que excedem os núcleos da máquina não aceleram o cálculo e iniciam em
+    sequência; com um único núcleo o cálculo é sempre serial.
+    """
+    nucleos = min(max_workers, os.cpu_count() or 1)
+    if nucleos < 2:
+        return False
+    ganho = restantes * custo_ativo * (1 - 1 / nucleos)
+    sobrecarga = SOBRECARGA_PROCESSO_S * -(-max_workers // nucleos)
+    return ganho > sobrecarga
+
+# Estado de cada processo de trabalho, preenchido uma única vez por _init_worker
+_worker_estado = {}
+
+
+def _init_worker(df_cotacoes, inflacao, indicadores):
+    """Recebe a matriz de preços uma vez por processo (e não uma vez por tarefa)"""
+    _worker_estado['df_cotacoes'] = df_cotacoes
+    _worker_estado['eixo'] = PeriodAxis(df_cotacoes)
+    _worker_estado['inflacao'] = inflacao
+    _worker_estado['plano'] = plan_indicators(indicadores)
+    _worker_estado['series_cache'] = SeriesCache().bind(df_cotacoes, _worker_estado['eixo'])
+
+
+def _process_chunk(ativos):
+    """Processa um bloco de ativos no processo de trabalho; retorna (pid, tempo, saídas)"""
+    inicio = time.perf_counter()
+    hurst = batch_hurst(_worker_estado['plano'], _worker_estado['eixo'], ativos, _worker_estado['series_cache'])
+    saidas = [
+        (ativo, compute_asset(_worker_estado['df_cotacoes'], ativo, _worker_estado['eixo'],
+                              _worker_estado['inflacao'], _worker_estado['series_cache'],
+                              _worker_estado['plano'], hurst))
+        for ativo in ativos
+    ]
+    return os.getpid(), time.perf_counter() - inicio, saidas
+
+
+def _run_parallel(df_cotacoes, ativos, inflacao, indicadores, max_workers, chunk_size, progress_callback,
+                  cancel_check, total_ativos, processados):
+    """
+    Distribui os ativos aprovados em blocos por um ProcessPoolExecutor.
+
+    Retorna ({ativo: resultados}, {pid: [ativos, tempo]}); a ordem final é decidida por
+    quem chama, de modo que o resultado não depende do escalonamento.
+    """
+    blocos = [ativos[i:i + chunk_size] for i in range(0, len(ativos), chunk_size)]
+    saidas = {}
+    workers = {}
+
+    # 'spawn' evita fork de um processo com threads (a interface chama daqui de uma thread de job)
+    contexto = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=contexto, initializer=_init_worker,
+                             initargs=(df_cotacoes, inflacao, indicadores)) as executor:
+        pendentes = {executor.submit(_process_chunk, bloco) for bloco in blocos}
+        try:
+            while pendentes:
+                if cancel_check is not None:
+                    cancel_check()
+                finalizados, pendentes = wait(pendentes, timeout=0.5, return_when=FIRST_COMPLETED)
+                for future in finalizados:
+                    pid, tempo, saidas_bloco = future.result()
+                    estatistica = workers.setdefault(pid, [0, 0.0])
+                    estatistica[0] += len(saidas_bloco)
+                    estatistica[1] += tempo
+                    for ativo, resultados in saidas_bloco:
+                        saidas[ativo] = resultados
+                        processados += 1
+                        if progress_callback is not None:
+                            progress_callback(processados, total_ativos, ativo)
+        except BaseException:
+            # Cancelamento ou falha: descartar os blocos que ainda não começaram
+            for future in pendentes:
+                future.cancel()
+            raise
+    return saidas, workers
+
+
+# Atualizações incrementais seguidas antes de reconstruir o estado (limita o acúmulo de arredondamento)
+MAX_ATUALIZACOES_INCREMENTAIS = 365
+
+# Janela do Mayer Multiple (média móvel de 200 dias)
+JANELA_MAYER = 200
+
+
+def _ffill_at(precos, i):
+    """Último preço válido até a linha i (NaN se não houver)"""
+    while i >= 0 and np.isnan(precos[i]):
+        i -= 1
+    return precos[i] if i >= 0 else np.nan
+
+
+def _next_valid(valores, i, fim):
+    """Primeira linha em [i, fim) com valor válido (fim se não houver)"""
+    while i < fim and np.isnan(valores[i]):
+        i += 1
+    return i
+
+
+def _prev_valid(valores, i, inicio):
+    """Última linha em [inicio, i] com valor válido (inicio - 1 se não houver)"""
+    while i >= inicio and np.isnan(valores[i]):
+        i -= 1
+    return i
+
+
+class WindowState:
+    """
+    Estado incremental da janela de um (ativo, período) que termina em data_final.
+
+    Guarda as somas da regressão log-linear (x e y relativos a dia_ref/log_ref), média e
+    soma dos quadrados dos desvios dos retornos (Welford), a fila monotônica dos máximos
+    e o drawdown máximo com o dia do seu pico, a soma dos últimos 200 preços (Mayer) e os
+    co-momentos dos retornos do ativo e do BTCUSD. Quando data_final avança, advance()
+    desconta as linhas que saem pelo início e soma as que entram pelo fim, em tempo
+    proporcional às linhas alteradas e não ao tamanho da janela. Os valores de cada linha
+    seguem ffill().bfill() da janela, como no cálculo completo.
+    """
+
+    CAMPOS = ('periodo', 'dia_inicio_ativo', 'dia_inicio', 'dia_fim', 'dia_primeiro', 'linhas', 'dia_ref',
+              'log_ref', 'sx', 'sxx', 'sy', 'syy', 'sxy', 'retornos', 'media_retorno', 'm2_retorno', 'mdd',
+              'dia_pico', 'fila_maximos', 'soma_mayer', 'linhas_btc', 'pares_btc', 'sa', 'sb', 'saa', 'sbb',
+              'sab', 'atualizacoes')
+
+    def __init__(self, periodo, dia_inicio_ativo):
+        self.periodo = periodo
+        self.dia_inicio_ativo = dia_inicio_ativo
+        self.atualizacoes = 0
+
+    def to_dict(self):
+        return {campo: getattr(self, campo) for campo in self.CAMPOS}
+
+    @classmethod
+    def from_dict(cls, dados):
+        estado = cls(dados['periodo'], dados['dia_inicio_ativo'])
+        for campo in cls.CAMPOS:
+            setattr(estado, campo, dados[campo])
+        return estado
+
+    @classmethod
+    def build(cls, periodo, dias, serie, btc, inicio, fim):
+        """Monta o estado da janela [inicio:fim] a partir dos intermediários do ativo (ou None)"""
+        primeiro = serie.first_valid(inicio)
+        if primeiro is None or fim - inicio < 2:
+            return None
+        estado = cls(periodo, int(dias[serie.first_valid(0)]))
+        precos = serie.window(inicio)
+        log_precos = serie.window_log(inicio)
+        retornos = serie.window_returns(inicio)
+
+        estado.dia_inicio = int(dias[inicio])
+        estado.dia_fim = int(dias[fim - 1])
+        estado.dia_primeiro = int(dias[primeiro])
+        estado.linhas = fim - inicio
+        estado.dia_ref = int(dias[fim - 1])
+        estado.log_ref = float(log_precos[-1])
+
+        x = (dias[inicio:fim] - estado.dia_ref).astype(np.float64)
+        y = log_precos - estado.log_ref
+        estado.sx, estado.sxx = float(x.sum()), float((x * x).sum())
+        estado.sy, estado.syy, estado.sxy = float(y.sum()), float((y * y).sum()), float((x * y).sum())
+
+        estado.retornos = len(retornos)
+        estado.media_retorno = float(retornos.mean())
+        estado.m2_retorno = float(((retornos - estado.media_retorno) ** 2).sum())
+
+        # Drawdown máximo e o pico que o define (última ocorrência do máximo até o vale)
+        drawdown = precos / np.maximum.accumulate(precos) - 1
+        vale = int(np.argmin(drawdown))
+        estado.mdd = float(abs(drawdown[vale]))
+        pico = vale - int(np.argmax(precos[vale::-1]))
+        estado.dia_pico = int(dias[inicio + pico]) if estado.mdd > 0 else None
+
+        # Fila dos máximos: linhas maiores que todas as seguintes (a partir do primeiro preço válido)
+        trecho = precos[primeiro - inicio:]
+        maximo_seguinte = np.append(np.maximum.accumulate(trecho[::-1])[::-1][1:], -np.inf)
+        indices = np.flatnonzero(trecho > maximo_seguinte) + primeiro
+        estado.fila_maximos = [[int(dias[i]), float(precos[i - inicio])] for i in indices]
+
+        estado.soma_mayer = float(precos[-JANELA_MAYER:].sum()) if len(precos) >= JANELA_MAYER else None
+
+        estado.linhas_btc = estado.pares_btc = 0
+        estado.sa = estado.sb = estado.saa = estado.sbb = estado.sab = 0.0
+        if btc is not None:
+            mascara, retornos_btc = btc
+            retornos_ativo = np.diff(log_precos[mascara])
+            estado.linhas_btc = int(mascara.sum())
+            estado.pares_btc = len(retornos_btc)
+            estado.sa, estado.sb = float(retornos_ativo.sum()), float(retornos_btc.sum())
+            estado.saa = float((retornos_ativo * retornos_ativo).sum())
+            estado.sbb = float((retornos_btc * retornos_btc).sum())
+            estado.sab = float((retornos_ativo * retornos_btc).sum())
+        return estado
+
+    # --- Contribuições de linhas e pares -------------------------------------------------
+
+    def _regression_row(self, dia, log_preco, sinal):
+        x = float(dia - self.dia_ref)
+        y = log_preco - self.log_ref
+        self.linhas += sinal
+        self.sx += sinal * x
+        self.sxx += sinal * x * x
+        self.sy += sinal * y
+        self.syy += sinal * y * y
+        self.sxy += sinal * x * y
+
+    def _add_return(self, r):
+        # Welford: média e soma dos quadrados dos desvios, um retorno por vez
+        self.retornos += 1
+        delta = r - self.media_retorno
+        self.media_retorno += delta / self.retornos
+        self.m2_retorno += delta * (r - self.media_retorno)
+
+    def _remove_return(self, r):
+        if self.retornos <= 1:
+            self.retornos, self.media_retorno, self.m2_retorno = 0, 0.0, 0.0
+            return
+        media_anterior = self.media_retorno
+        self.retornos -= 1
+        self.media_retorno = (media_anterior * (self.retornos + 1) - r) / self.retornos
+        self.m2_retorno = max(self.m2_retorno - (r - media_anterior) * (r - self.media_retorno), 0.0)
+
+    def _btc_pair(self, a, b, sinal):
+        self.pares_btc += sinal
+        self.sa += sinal * a
+        self.sb += sinal * b
+        self.saa += sinal * a * a
+        self.sbb += sinal * b * b
+        self.sab += sinal * a * b
+
+    @staticmethod
+    def _log_value(precos, i, primeiro):
+        # Log do preço da linha i na janela cujo primeiro preço válido é primeiro (ffill().bfill())
+        valor = precos[primeiro] if i <= primeiro else _ffill_at(precos, i)
+        return float(np.log(valor))
+
+    def _rows(self, precos, dias, de, ate, inicio, primeiro, sinal):
+        """Soma (sinal=1) ou desconta (-1) as linhas [de, ate) da janela que começa em inicio"""
+        anterior = self._log_value(precos, de - 1, primeiro) if de > inicio else None
+        for i in range(de, ate):
+            log_preco = self._log_value(precos, i, primeiro)
+            self._regression_row(dias[i], log_preco, sinal)
+            if anterior is not None:
+                if sinal > 0:
+                    self._add_return(log_preco - anterior)
+                else:
+                    self._remove_return(log_preco - anterior)
+            anterior = log_preco
+
+    def _btc_pairs(self, precos, precos_btc, de, ate, fim, primeiro, sinal):
+        """Soma ou desconta os pares de retornos cujo primeiro dia com BTCUSD está em [de, ate)"""
+        i = _next_valid(precos_btc, de, ate)
+        while i < ate:
+            j = _next_valid(precos_btc, i + 1, fim)
+            if j >= fim:
+                break
+            self._btc_pair(self._log_value(precos, j, primeiro) - self._log_value(precos, i, primeiro),
+                           float(np.log(precos_btc[j]) - np.log(precos_btc[i])), sinal)
+            i = _next_valid(precos_btc, i + 1, ate)
+
+    # --- Avanço da janela ----------------------------------------------------------------
+
+    def advance(self, dias, precos, precos_btc, inicio, fim):
+        """
+        Leva o estado para a janela [inicio:fim]; retorna False se for preciso reconstruí-lo.
+
+        A janela anterior [a:b] precisa continuar no eixo de datas (cotações só acrescentadas
+        depois de data_final) e as duas janelas precisam se sobrepor além da lacuna inicial.
+        """
+        a = int(dias.searchsorted(self.dia_inicio))
+        b = int(dias.searchsorted(self.dia_fim, side='right'))
+        if b - a != self.linhas or a >= len(dias) or dias[a] != self.dia_inicio:
+            return False
+        if (inicio, fim) == (a, b):
+            return True
+        if inicio < a or fim < b or self.atualizacoes >= MAX_ATUALIZACOES_INCREMENTAIS:
+            return False
+        primeiro_anterior = int(dias.searchsorted(self.dia_primeiro))
+        primeiro = _next_valid(precos, inicio, fim)
+        if primeiro >= b - 1:
+            return False
+
+        # Linhas até o primeiro preço válido da nova janela mudam de valor (bfill) ou saem;
+        # as demais linhas da janela anterior continuam iguais
+        self._rows(precos, dias, a, primeiro + 1, a, primeiro_anterior, -1)
+        self._rows(precos, dias, inicio, primeiro + 1, inicio, primeiro, 1)
+        self._rows(precos, dias, b, fim, inicio, primeiro, 1)
+
+        self._advance_drawdown(dias, precos, b, fim, inicio, primeiro)
+        self._advance_mayer(precos, a, b, primeiro_anterior, inicio, fim, primeiro)
+
+        if precos_btc is not None:
+            self.linhas_btc -= int(np.count_nonzero(~np.isnan(precos_btc[a:inicio])))
+            self.linhas_btc += int(np.count_nonzero(~np.isnan(precos_btc[b:fim])))
+            self._btc_pairs(precos, precos_btc, a, primeiro, b, primeiro_anterior, -1)
+            self._btc_pairs(precos, precos_btc, inicio, primeiro, fim, primeiro, 1)
+            # Pares que terminam nas linhas novas e começam depois da lacuna inicial
+            for j in range(b, fim):
+                if np.isnan(precos_btc[j]):
+                    continue
+                i = _prev_valid(precos_btc, j - 1, inicio)
+                if i >= primeiro:
+                    self._btc_pair(self._log_value(precos, j, primeiro) - self._log_value(precos, i, primeiro),
+                                   float(np.log(precos_btc[j]) - np.log(precos_btc[i])), 1)
+
+        self.dia_inicio = int(dias[inicio])
+        self.dia_fim = int(dias[fim - 1])
+        self.dia_primeiro = int(dias[primeiro])
+        self.atualizacoes += 1
+        return True
+
+    def _advance_drawdown(self, dias, precos, b, fim, inicio, primeiro):
+        dia_primeiro = int(dias[primeiro])
+        if self.dia_pico is not None and self.dia_pico < dia_primeiro:
+            # O pico do drawdown máximo saiu da janela: recalcular sobre a janela inteira
+            valores = precos[inicio:fim].copy()
+            valores[:primeiro - inicio] = precos[primeiro]
+            valores = forward_fill(valores)
+            drawdown = valores / np.maximum.accumulate(valores) - 1
+            vale = int(np.argmin(drawdown))
+            self.mdd = float(abs(drawdown[vale]))
+            pico = vale - int(np.argmax(valores[vale::-1]))
+            self.dia_pico = int(dias[inicio + pico]) if self.mdd > 0 else None
+            trecho = valores[primeiro - inicio:]
+            maximo_seguinte = np.append(np.maximum.accumulate(trecho[::-1])[::-1][1:], -np.inf)
+            self.fila_maximos = [[int(dias[i + primeiro]), float(trecho[i])]
+                                 for i in np.flatnonzero(trecho > maximo_seguinte)]
+            return
+
+        # Máximos anteriores ao primeiro preço válido deixam de valer (a lacuna repete esse preço)
+        fila = [item for item in self.fila_maximos if item[0] >= dia_primeiro]
+        for i in range(b, fim):
+            valor = float(_ffill_at(precos, i))
+            while fila and fila[-1][1] <= valor:
+                fila.pop()
+            fila.append([int(dias[i]), valor])
+            drawdown = abs(valor / fila[0][1] - 1)
+            if drawdown > self.mdd:
+                self.mdd = drawdown
+                self.dia_pico = fila[0][0]
+        self.fila_maximos = fila
+
+    def _advance_mayer(self, precos, a, b, primeiro_anterior, inicio, fim, primeiro):
+        if fim - inicio < JANELA_MAYER:
+            self.soma_mayer = None
+            return
+        saida = b - JANELA_MAYER
+        if (self.soma_mayer is None or saida < primeiro_anterior or fim - JANELA_MAYER < primeiro
+                or fim - b >= JANELA_MAYER):
+            # Bloco dos 200 preços toca a lacuna inicial (ou é novo): somar diretamente
+            self.soma_mayer = float(sum(precos[primeiro] if i < primeiro else _ffill_at(precos, i)
+                                        for i in range(fim - JANELA_MAYER, fim)))
+            return
+        self.soma_mayer += float(sum(_ffill_at(precos, i) for i in range(b, fim)))
+        self.soma_mayer -= float(sum(_ffill_at(precos, i) for i in range(saida, fim - JANELA_MAYER)))
+
+    # --- Indicadores ---------------------------------------------------------------------
+
+    def regression(self, dias, inicio):
+        if self.linhas < 2:
+            return None
+        return regression_from_sums(self.linhas, self.sx, self.sxx, self.sy, self.syy, self.sxy,
+                                    self.dia_ref - dias[inicio], self.log_ref)
+
+    def sharpe(self):
+        if self.retornos < 1:
+            return 0
+        variancia = self.m2_retorno / self.retornos
+        return annualized_sharpe(self.media_retorno, variancia,
+                                 variancia + self.media_retorno * self.media_retorno)
+
+    def mayer_multiple(self, precos, fim):
+        if self.soma_mayer is None:
+            return float('nan')
+        return _ffill_at(precos, fim - 1) / (self.soma_mayer / JANELA_MAYER)
+
+    def btc_correlation(self):
+        # Mesmo mínimo de calculate_btc_correlation: 30 retornos em dias com as duas cotações
+        if self.linhas_btc < 30 or self.pares_btc < 30:
+            return float('nan')
+        n = self.pares_btc
+        covariancia = self.sab - self.sa * self.sb / n
+        variancia_a = self.saa - self.sa * self.sa / n
+        variancia_b = self.sbb - self.sb * self.sb / n
+        if variancia_a <= 0 or variancia_b <= 0:
+            return float('nan')
+        return float(np.clip(covariancia / np.sqrt(variancia_a * variancia_b), -1.0, 1.0))
+
+
+def compute_asset_incremental(df_cotacoes, ativo, eixo, inflacao, series_cache, plano, estados, contagem,
+                              hurst=None):
+    """
+    Calcula os períodos de um ativo a partir dos estados incrementais (WindowState).
+
+    estados é {(ativo, período): WindowState}, atualizado no lugar; contagem acumula os
+    estados 'reaproveitados', 'avancados' e 'reconstruidos'. MDD, Sharpe, Mayer e a
+    correlação saem do estado; os demais indicadores do plano são derivados deles ou,
+    sem forma incremental (ex.: Hurst), calculados sobre a janela ou trazidos de hurst
+    (batch_hurst).
+    """
+    precos = PeriodAxis.column(df_cotacoes, ativo)
+    precos_btc = None
+    if 'BTCUSD' in df_cotacoes.columns and ativo != 'BTCUSD':
+        precos_btc = PeriodAxis.column(df_cotacoes, 'BTCUSD')
+    nomes = {indicador.nome for indicador in plano}
+    campos = result_fields()
+    resultados = []
+    dia_inicio_ativo = None
+    for periodo in PERIODOS:
+        data_inicio, inicio = eixo.inicios[periodo]
+        chave = (ativo, periodo)
+        estado = estados.get(chave)
+
+        if estado is not None:
+            dia_inicio_ativo = estado.dia_inicio_ativo
+        elif dia_inicio_ativo is None:
+            validos = np.flatnonzero(~np.isnan(precos[:eixo.fim]))
+            if len(validos) == 0:
+                return resultados
+            dia_inicio_ativo = int(eixo.dias[validos[0]])
+        if dia_inicio_ativo > np.datetime64(data_inicio, 'D').astype(np.int64):
+            estados.pop(chave, None)
+            continue
+
+        dia_fim = estado.dia_fim if estado is not None else None
+        if estado is not None and estado.advance(eixo.dias, precos, precos_btc, inicio, eixo.fim):
+            contagem['avancados' if estado.dia_fim != dia_fim else 'reaproveitados'] += 1
+        else:
+            btc = series_cache.btc_window(inicio) if precos_btc is not None else None
+            estado = WindowState.build(periodo, eixo.dias, series_cache.series(ativo), btc, inicio, eixo.fim)
+            contagem['reconstruidos'] += 1
+        if estado is None:
+            estados.pop(chave, None)
+            continue
+        estados[chave] = estado
+
+        regressao = estado.regression(eixo.dias, inicio)
+        if regressao is None:
+            continue
+        contexto = PeriodContext(ativo, periodo, inicio, series_cache, inflacao)
+        contexto.valores['regressao'] = regressao
+        prontos = {
+            'mdd': estado.mdd,
+            'sharpe': estado.sharpe(),
+            'mayer_multiple': estado.mayer_multiple(precos, eixo.fim),
+            'correlacao_btc': estado.btc_correlation() if precos_btc is not None else float('nan'),
+        }
+        if hurst is not None:
+            prontos['hurst_dfa'] = hurst.get(chave, np.nan)
+        prontos = {campo: valor for campo, valor in prontos.items() if campo in nomes}
+        resultados.append(evaluate_indicators(plano, contexto, campos, prontos))
+    return resultados
+
+
+def calculate_indexes(df_cotacoes, inflacao, qualidade_config=None, progress_callback=None,
+                      cancel_check=None, verbose=True, max_workers=1, chunk_size=4, quality_cache=None,
+                      series_cache=None, indicadores=None, estados=None, paralelo=None):
+    """
+    Calcula os indicadores de todos os ativos da matriz de preços.
+
+    inflacao é {período: inflação acumulada}. progress_callback(processados, total, ativo)
+    é chamado a cada ativo e cancel_check() pode levantar uma exceção para interromper.
+    A verificação de qualidade roda antes, neste processo, reaproveitando os vereditos de
+    quality_cache (QualityVerdictCache) quando informado. Os intermediários (log dos preços,
+    retornos) vêm de series_cache (SeriesCache), que pode ser mantido entre execuções.
+    indicadores limita o cálculo aos indicadores registrados com esses nomes (e às suas
+    dependências); None calcula todos. Com estados ({(ativo, período): WindowState}, lido
+    do banco pelo chamador) o cálculo é incremental: cada janela parte do estado salvo e
+    só as linhas novas e as que saíram são processadas; os estados são atualizados no
+    lugar. Sem estados e com max_workers > 1, os primeiros AMOSTRA_CUSTO_ATIVOS ativos
+    aprovados são calculados em série para medir o custo por ativo; se a distribuição
+    compensar (parallel_pays_off), os demais são divididos em blocos de chunk_size e
+    calculados em processos separados, senão o cálculo continua em série. paralelo=True
+    distribui todos sem medir e paralelo=False nunca distribui. Os resultados seguem
+    sempre a ordem das colunas de df_cotacoes.
+    Retorna um dicionário com 'resultados' (tuplas na ordem de result_fields()), os
+    indicadores executados, contagens de aprovação, os motivos de rejeição e a vazão de
+    cada worker.
+    """
+    qualidade_config = qualidade_config or QUALIDADE_PADRAO
+    plano = plan_indicators(indicadores)
+    df_cotacoes = PeriodAxis.sort_frame(df_cotacoes)
+    ativos = list(df_cotacoes.columns[1:])
+    total_ativos = len(ativos)
+    eixo = PeriodAxis(df_cotacoes)
+    inicio = time.perf_counter()
+    if series_cache is None:
+        series_cache = SeriesCache()
+    series_cache = series_cache.bind(df_cotacoes, eixo)
+    if quality_cache is not None:
+        hits, misses = quality_cache.hits, quality_cache.misses
+
+    tabela_qualidade = screen_assets(df_cotacoes, ativos, eixo, qualidade_config, quality_cache)
+    situacoes = tabela_qualidade['situacao']
+    aprovados = [ativo for ativo in ativos if situacoes[ativo] == 'aprovado']
+    max_workers = max(1, min(int(max_workers), len(aprovados) or 1))
+
+    workers = {}
+    contagem = dict.fromkeys(('reaproveitados', 'avancados', 'reconstruidos'), 0)
+    if estados is not None:
+        # Estados de ativos que deixaram de ser aprovados não são mais úteis
+        conjunto_aprovados = set(aprovados)
+        for chave in [chave for chave in estados if chave[0] not in conjunto_aprovados]:
+            del estados[chave]
+        max_workers = 1
+    if paralelo is False:
+        max_workers = 1
+
+    # Em série, medindo o custo dos primeiros ativos; com processos disponíveis, a decisão
+    # de distribuir o restante é tomada uma vez, ao fim da amostra
+    saidas = {}
+    decidir = max_workers > 1
+    amostra = 0 if paralelo else AMOSTRA_CUSTO_ATIVOS
+    calculados, tempo_calculo = 0, 0.0
+    # Hurst calculado em lote para os próximos ativos aprovados (BLOCO_HURST_ATIVOS por vez)
+    hurst, bloco_hurst = None, set()
+    for posicao, ativo in enumerate(ativos):
+        if decidir and calculados >= amostra:
+            decidir = False
+            restantes = [outro for outro in ativos[posicao:] if situacoes[outro] == 'aprovado']
+            custo_ativo = tempo_calculo / calculados if calculados else 0.0
+            if restantes and (paralelo or parallel_pays_off(len(restantes), custo_ativo, max_workers)):
+                processados = total_ativos - len(restantes)
+                if progress_callback is not None and processados:
+                    progress_callback(processados, total_ativos, "")
+                saidas_processos, workers = _run_parallel(
+                    df_cotacoes, restantes, inflacao, [indicador.nome for indicador in plano],
+                    min(max_workers, len(restantes)), max(1, int(chunk_size)), progress_callback, cancel_check,
+                    total_ativos, processados)
+                saidas.update(saidas_processos)
+                break
+        if cancel_check is not None:
+            cancel_check()
+        if progress_callback is not None:
+            progress_callback(posicao + 1, total_ativos, ativo)
+        if situacoes[ativo] != 'aprovado':
+            continue
+        inicio_ativo = time.perf_counter()
+        if ativo not in bloco_hurst:
+            # Durante a amostra de custo o bloco não passa dela, para não inflar a medida
+            limite = max(1, amostra - calculados) if decidir else BLOCO_HURST_ATIVOS
+            bloco_hurst = set(islice((outro for outro in ativos[posicao:] if situacoes[outro] == 'aprovado'),
+                                     min(limite, BLOCO_HURST_ATIVOS)))
+            hurst = batch_hurst(plano, eixo, bloco_hurst, series_cache)
+        if estados is not None:
+            saidas[ativo] = compute_asset_incremental(df_cotacoes, ativo, eixo, inflacao, series_cache, plano,
+                                                      estados, contagem, hurst)
+        else:
+            saidas[ativo] = compute_asset(df_cotacoes, ativo, eixo, inflacao, series_cache, plano, hurst)
+        calculados += 1
+        tempo_calculo += time.perf_counter() - inicio_ativo
+
+    # Junção na ordem das colunas, independente da ordem de conclusão dos workers
+    resultados = []
+    for ativo in aprovados:
+        resultados.extend(saidas[ativo])
+
+    if verbose:
+        for ativo, situacao, mensagem in zip(ativos, situacoes, tabela_qualidade['mensagem']):
+            if situacao == 'aprovado':
+                print(f"Ativo {ativo} aprovado: {mensagem}")
+            elif situacao in ('rejeitado', 'btc'):
+                print(f"Ativo {ativo} rejeitado: {mensagem}")
+
+    # Ativos recusados só pelo BTCUSD passaram na própria verificação (contam nos dois grupos)
+    rejeitados = tabela_qualidade[situacoes.isin(['rejeitado', 'btc'])]
+    resumo = {
+        'resultados': resultados,
+        'indicadores': [indicador.nome for indicador in plano],
+        'total_ativos': total_ativos,
+        'ativos_aprovados': int(situacoes.isin(['aprovado', 'btc']).sum()),
+        'ativos_rejeitados': len(rejeitados),
+        'motivos_rejeicao': dict(zip(rejeitados.index, rejeitados['mensagem'])),
+        'tabela_qualidade': tabela_qualidade,
+        'workers': workers,
+        'estados': contagem if estados is not None else None,
+        'tempo': time.perf_counter() - inicio
+    }
+    if verbose:
+        print_quality_summary(resumo)
+        if quality_cache is not None:
+            print(f"Vereditos de qualidade reaproveitados: {quality_cache.hits - hits} | "
+                  f"recalculados: {quality_cache.misses - misses}")
+        if estados is not None:
+            print(f"Estados incrementais: {contagem['reaproveitados']} reaproveitados | "
+                  f"{contagem['avancados']} avançados | {contagem['reconstruidos']} reconstruídos")
+        if workers:
+            print_worker_throughput(resumo)
+    return resumo
+
+
+def print_worker_throughput(resumo):
+    """Mostra quantos ativos cada processo de trabalho calculou e a sua vazão"""
+    print(f"\n=== DESEMPENHO DOS WORKERS ({len(resumo['workers'])} processos) ===")
+    tempo_ocupado = 0.0
+    for pid, (ativos, tempo) in sorted(resumo['workers'].items()):
+        tempo_ocupado += tempo
+        vazao = ativos / tempo if tempo > 0 else 0.0
+        print(f"  Worker {pid}: {ativos} ativos em {tempo:.1f}s ({vazao:.1f} ativos/s)")
+    if resumo['tempo'] > 0:
+        print(f"Tempo total: {resumo['tempo']:.1f}s | Aceleração efetiva: {tempo_ocupado / resumo['tempo']:.1f}x")
+    print("=" * 50)
+
+
+def print_quality_summary(resumo):
+    """Mostra o resumo da qualidade dos dados no console, a partir da tabela de vereditos"""
+    tabela = resumo['tabela_qualidade']
+    rejeitados = tabela[tabela['situacao'].isin(['rejeitado', 'btc'])]
+
+    print(f"\n=== RESUMO DA QUALIDADE DOS DADOS ===")
+    print(f"Total de ativos processados: {resumo['total_ativos']}")
+    print(f"Ativos aprovados: {resumo['ativos_aprovados']}")
+    print(f"Ativos rejeitados: {resumo['ativos_rejeitados']}")
+    print(f"Resultados válidos gerados: {len(resumo['resultados'])}")
+
+    if not rejeitados.empty:
+        print(f"\nRejeições por critério:")
+        criterios = rejeitados['criterio'].where(rejeitados['situacao'] != 'btc', 'btcusd')
+        for criterio, quantidade in criterios.value_counts().items():
+            print(f"  {criterio}: {quantidade}")
+
+        print(f"\nMotivos de rejeição:")
+        for ativo, linha in rejeitados.iterrows():
+            print(f"  {ativo}: {linha['mensagem']} [atraso {linha['dias_atraso']}d, "
+                  f"{linha['dias_disponiveis']} dias, cobertura {linha['cobertura']:.1%}, "
+                  f"lacuna {linha['max_lacuna']}d, {linha['outliers']} outliers]")
+    print("=" * 50)
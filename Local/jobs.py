@@ -0,0 +1,122 @@
+import queue
+import threading
+import traceback
+
+
+class JobCancelled(Exception):
+    """Levantada dentro de um job quando o cancelamento foi solicitado"""
+
+
+class Job:
+    """Tarefa executada em uma thread de trabalho, identificada pelo seu tipo (kind)"""
+
+    def __init__(self, kind, func, events, on_progress=None, on_done=None, on_error=None):
+        self.kind = kind
+        self.func = func
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self._events = events
+        self._cancel_event = threading.Event()
+        self.thread = None
+
+    @property
+    def cancel_event(self):
+        return self._cancel_event
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        """Solicita o cancelamento (o job verifica o pedido nos seus pontos de parada)"""
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        """Interrompe o job se o cancelamento foi solicitado"""
+        if self.cancelled:
+            raise JobCancelled(self.kind)
+
+    def progress(self, *args):
+        """Envia uma atualização de progresso para a thread da interface"""
+        self._events.put((self, 'progress', args))
+
+    def _run(self):
+        try:
+            result = self.func(self)
+            if self.cancelled:
+                raise JobCancelled(self.kind)
+            self._events.put((self, 'done', result))
+        except JobCancelled:
+            self._events.put((self, 'cancelled', None))
+        except Exception as e:
+            traceback.print_exc()
+            self._events.put((self, 'error', e))
+
+
+class JobRunner:
+    """
+    Executa jobs em threads de trabalho e entrega progresso/resultados à interface.
+
+    Só um job de cada tipo roda por vez. Os callbacks (on_progress, on_done, on_error)
+    são chamados apenas por poll(), que deve ser agendado no loop do Tk via after(),
+    de modo que nunca tocam nos widgets fora da thread principal.
+    """
+
+    def __init__(self):
+        self._events = queue.Queue()
+        self._jobs = {}
+
+    def is_running(self, kind):
+        return kind in self._jobs
+
+    def running_kinds(self):
+        return list(self._jobs)
+
+    def submit(self, kind, func, on_progress=None, on_done=None, on_error=None):
+        """Inicia func(job) em uma nova thread; retorna None se já houver um job desse tipo"""
+        if kind in self._jobs:
+            return None
+        job = Job(kind, func, self._events, on_progress, on_done, on_error)
+        self._jobs[kind] = job
+        job.thread = threading.Thread(target=job._run, name=f"job-{kind}", daemon=True)
+        job.thread.start()
+        return job
+
+    def cancel(self, kind=None):
+        """Cancela o job do tipo informado (ou todos, se kind for None)"""
+        jobs = list(self._jobs.values()) if kind is None else [self._jobs[kind]] if kind in self._jobs else []
+        for job in jobs:
+            job.cancel()
+
+    def poll(self, max_events=200):
+        """Processa os eventos pendentes na thread da interface"""
+        for _ in range(max_events):
+            try:
+                job, tipo, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+
+            if tipo == 'progress':
+                if job.on_progress is not None and not job.cancelled:
+                    self._call(job, job.on_progress, *payload)
+                continue
+
+            # Evento final: liberar o tipo para um novo job antes dos callbacks
+            if self._jobs.get(job.kind) is job:
+                del self._jobs[job.kind]
+            if tipo == 'done' and job.on_done is not None:
+                self._call(job, job.on_done, payload)
+            elif tipo == 'error' and job.on_error is not None:
+                self._call(job, job.on_error, payload)
+            elif tipo == 'cancelled' and job.on_error is not None:
+                self._call(job, job.on_error, JobCancelled(job.kind))
+
+    @staticmethod
+    def _call(job, callback, *args):
+        """Chama um callback; uma falha é registrada sem interromper a entrega dos demais eventos"""
+        try:
+            callback(*args)
+        except Exception:
+            print(f"Erro no callback do job {job.kind}:")
+            traceback.print_exc()
@@ -0,0 +1,105 @@
+"""
+Testes do DownloadEngine.run com uma API falsa (get_table injetado, sem rede).
+
+Uso:
+    python -m pytest test_downloader.py
+"""
+import threading
+import time
+import unittest
+
+import pandas as pd
+
+from downloader import DownloadEngine
+
+DATAS = ['2024-01-01', '2024-01-02', '2024-01-03']
+
+
+def resposta(codes):
+    """Tabela no formato da QDL/BITFINEX com três dias de cada código"""
+    linhas = [{'code': code, 'date': data, 'mid': float(i + 1)} for code in codes for i, data in enumerate(DATAS)]
+    return pd.DataFrame(linhas, columns=['code', 'date', 'mid'])
+
+
+class FakeApi:
+    """get_table falso: registra as chamadas e responde conforme as regras do teste"""
+
+    def __init__(self, ausentes_no_lote=(), falhas=(), espera=None):
+        self.ausentes_no_lote = set(ausentes_no_lote)
+        self.falhas = set(falhas)
+        self.espera = espera
+        self.chamadas = []
+        self._lock = threading.Lock()
+
+    def __call__(self, datatable, paginate=True, code=None, **kwargs):
+        codes = list(code) if isinstance(code, list) else [code]
+        with self._lock:
+            self.chamadas.append(codes)
+        if self.espera is not None:
+            self.espera(codes)
+        if self.falhas & set(codes):
+            raise RuntimeError(f"código inválido: {sorted(self.falhas & set(codes))}")
+        if len(codes) > 1:
+            codes = [c for c in codes if c not in self.ausentes_no_lote]
+        return resposta(codes)
+
+
+def executar(api, codes, cancel_event=None, progress_callback=None, **opcoes):
+    """Roda o motor com um writer que guarda os DataFrames recebidos"""
+    gravados = {}
+
+    def writer(code, df):
+        gravados[code] = df
+
+    engine = DownloadEngine(get_table=api, requests_per_second=0, **opcoes)
+    stats = engine.run(codes, writer, progress_callback=progress_callback, cancel_event=cancel_event)
+    return stats, gravados
+
+
+class DownloadEngineRunTest(unittest.TestCase):
+
+    def test_lote_parcial_refaz_ausentes_individualmente(self):
+        api = FakeApi(ausentes_no_lote={'BUSD'})
+        stats, gravados = executar(api, ['AUSD', 'BUSD', 'CUSD'], batch_size=3)
+
+        self.assertEqual(sorted(gravados), ['AUSD', 'BUSD', 'CUSD'])
+        self.assertEqual(api.chamadas[1:], [['BUSD']])
+        self.assertEqual((stats['sucesso'], stats['falhas'], stats['requisicoes']), (3, 0, 2))
+        self.assertEqual(stats['linhas'], 9)
+        self.assertEqual(list(gravados['BUSD'].columns), ['Data', 'BUSD'])
+
+    def test_codigo_com_falha_nao_interrompe_os_demais(self):
+        api = FakeApi(falhas={'BADUSD'})
+        stats, gravados = executar(api, ['AUSD', 'BADUSD', 'CUSD'], batch_size=3)
+
+        # O lote falha inteiro e é refeito código a código; só o inválido fica de fora
+        self.assertEqual(sorted(gravados), ['AUSD', 'CUSD'])
+        self.assertEqual((stats['sucesso'], stats['falhas']), (2, 1))
+        self.assertIn('BADUSD', stats['erros'])
+        self.assertEqual(len(api.chamadas), 4)
+
+    def test_cancelamento_descarta_requisicoes_pendentes(self):
+        cancel_event = threading.Event()
+
+        def espera(codes):
+            # Só o primeiro código responde logo; o seguinte ainda está em andamento no cancelamento
+            if codes != ['AUSD']:
+                cancel_event.wait(5)
+                time.sleep(0.2)
+
+        def progresso(concluidos, total, code):
+            cancel_event.set()
+
+        api = FakeApi(espera=espera)
+        stats, gravados = executar(api, ['AUSD', 'BUSD', 'CUSD', 'DUSD'], cancel_event=cancel_event,
+                                   progress_callback=progresso, max_workers=1)
+
+        self.assertTrue(stats['cancelado'])
+        self.assertEqual(list(gravados), ['AUSD'])
+        self.assertEqual(stats['sucesso'], 1)
+        # A requisição em andamento termina, as que não começaram são descartadas
+        self.assertEqual(api.chamadas, [['AUSD'], ['BUSD']])
+
+
+if __name__ == '__main__':
+    unittest.main()